@@ -1,5 +1,19 @@
-from src.sbvr.sbvrspecification import SBVRSpecification
-from src.mapping.sbvrtoowl import SBVRToOWL
+"""
+SBVR To OWL command line.
+
+Usage: python main.py -i rules.xml [more.xml ...] -o ontology.owl -p http://example.org/onto [options]
+       python main.py -i rules.xml -o ontology.owl --watch
+
+Without arguments, and with a terminal as input, the program asks for the input file, the
+output file and the prefix. The transformation modules are only imported when a transformation
+runs, so the help and argument errors are fast.
+"""
+import argparse
+import os
+import sys
+
+MEGABYTE = 1024 * 1024
+
 
 def print_help_Message():
     """
@@ -18,7 +32,7 @@ def print_help_Message():
     print("")
 
 def ask_output_filename():
-    """ 
+    """
     Parse the xml file indicated by the user and returns its tree object.
     """
     filename = raw_input("Enter OWL ontology filename (default: ontology.owl): ")
@@ -28,7 +42,7 @@ def ask_output_filename():
 
 
 def ask_input_filename():
-    """ 
+    """
     Parse the xml file indicated by the user and returns its tree object.
     """
     filename = raw_input("Enter SBVR specification filename (default: rules.xml): ")
@@ -37,26 +51,242 @@ def ask_input_filename():
     return filename
 
 def ask_prefix():
-    """ 
+    """
     Parse the xml file indicated by the user and returns its tree object.
     """
     return  raw_input("Enter ontology base url (default: ''): ")
 
-# Main steps
-print_help_Message()
-input_filename = ask_input_filename()
-output_filename = ask_output_filename()
-prefix = ask_prefix()
 
-sbvr_specification = SBVRSpecification()
-sbvr_specification.from_xml_file(input_filename)
+def build_argument_parser():
+    """
+    Returns the parser of the command line arguments. It must not import the transformation
+    modules, so the format and codec names are checked by the output options instead.
+    """
+    parser = argparse.ArgumentParser(
+        description = 'Transforms an SBVR specification (xml) into an OWL ontology.')
+    parser.add_argument('-i', '--input', nargs = '+', default = ['rules.xml'],
+                        help = 'the SBVR specification files, whose terms are transformed in '
+                               'order into a single ontology (default: rules.xml)')
+    parser.add_argument('-o', '--output', default = 'ontology.owl',
+                        help = 'the OWL ontology file, overwritten if it exists '
+                               '(default: ontology.owl)')
+    parser.add_argument('-p', '--prefix', default = '',
+                        help = "the ontology base url (default: '')")
+    parser.add_argument('-f', '--format', default = 'rdfxml',
+                        help = 'rdfxml, ntriples, turtle or binary (default: rdfxml)')
+    parser.add_argument('-q', '--quiet', action = 'store_true',
+                        help = 'do not print every transformed term')
+
+    modes = parser.add_argument_group('modes')
+    modes.add_argument('--compact', action = 'store_true',
+                       help = 'write rdf/xml without insignificant whitespace')
+    modes.add_argument('--canonical', action = 'store_true',
+                       help = 'sort the ontology, so equal ontologies are written byte for byte equal')
+    modes.add_argument('--reduced', action = 'store_true',
+                       help = 'remove the sub class axioms implied by other ones')
+    modes.add_argument('--normalized', action = 'store_true',
+                       help = 'rewrite the class expressions in a normal form')
+    modes.add_argument('--shared', action = 'store_true',
+                       help = 'write repeated rdf/xml expressions once, as named classes')
+    modes.add_argument('--processes', type = int, default = 1,
+                       help = 'the number of processes that render the output (default: 1)')
+    modes.add_argument('--shard-count', type = int,
+                       help = 'split the rdf/xml output in this number of hierarchy subtrees')
+    modes.add_argument('--shard-size', type = int,
+                       help = 'split the rdf/xml output in shards of about this number of bytes')
+    modes.add_argument('--compression',
+                       help = 'compress the output while it is written: gzip, bz2 or zstd')
+    modes.add_argument('--compression-level', type = int,
+                       help = 'the level of the compression: gzip -1 to 9, bz2 1 to 9, '
+                              'zstd 1 to 22 (default: 6, 9 and 3)')
+    modes.add_argument('--memory-budget', type = int, metavar = 'MB',
+                       help = 'spill the specification to disk over this resident memory')
+    modes.add_argument('--spill-directory',
+                       help = 'the directory to spill to (default: the temporary directory)')
+
+    watch = parser.add_argument_group('watch')
+    watch.add_argument('-w', '--watch', action = 'store_true',
+                       help = 'write the ontology again every time an input file is saved, '
+                              'until interrupted')
+    watch.add_argument('--interval', type = float, default = 0.5,
+                       help = 'the seconds between two polls of the input files (default: 0.5)')
+    watch.add_argument('--debounce', type = float, default = 0.2,
+                       help = 'the seconds the input files must stay unchanged before the '
+                              'ontology is written (default: 0.2)')
+
+    cache = parser.add_argument_group('cache')
+    cache.add_argument('--cache', metavar = 'DIRECTORY',
+                       help = 'serve the output from this cache of ontologies, shared by runs, '
+                              'when the input, prefix and options were already transformed')
+    cache.add_argument('--cache-size', type = int, default = 1024, metavar = 'MB',
+                       help = 'the size over which the least recently used ontologies are '
+                              'evicted from the cache (default: 1024)')
+
+    reports = parser.add_argument_group('reports')
+    reports.add_argument('--report', metavar = 'JSON',
+                         help = 'write the time, memory and counters of every stage to this file')
+    reports.add_argument('--summary', action = 'store_true',
+                         help = 'print a one line summary of the stages')
+    reports.add_argument('--profile-terms', type = int, metavar = 'N',
+                         help = 'print the N most expensive terms of every stage')
+    return parser
+
+
+def build_output_options(arguments):
+    """
+    Returns the output options of the given arguments. Raises a ValueError if an option, or
+    another numeric argument, is not valid.
+    """
+    from src.owl.owl_output_options import OWLOutputOptions
+
+    if arguments.interval <= 0:
+        raise ValueError('The interval must be more than 0 seconds: %s' % arguments.interval)
+    if arguments.debounce < 0:
+        raise ValueError('The debounce time can not be negative: %s' % arguments.debounce)
+    if arguments.cache_size < 0:
+        raise ValueError('The cache size can not be negative: %d' % arguments.cache_size)
+    if arguments.profile_terms is not None and arguments.profile_terms < 1:
+        raise ValueError('The number of profiled terms must be at least 1: %d'
+                         % arguments.profile_terms)
+
+    output_options = OWLOutputOptions()
+    output_options.set_format(arguments.format)
+    output_options.set_compact(arguments.compact)
+    output_options.set_canonical(arguments.canonical)
+    output_options.set_reduced(arguments.reduced)
+    output_options.set_normalized(arguments.normalized)
+    output_options.set_shared(arguments.shared)
+    output_options.set_processes(arguments.processes)
+    output_options.set_shard_count(arguments.shard_count)
+    output_options.set_shard_size(arguments.shard_size)
+    output_options.set_compression(arguments.compression, arguments.compression_level)
+    if arguments.memory_budget is not None:
+        output_options.set_memory_budget(arguments.memory_budget * MEGABYTE,
+                                         arguments.spill_directory)
+    elif arguments.spill_directory is not None:
+        raise ValueError('A spill directory needs a memory budget')
+    check_output_modes(output_options)
+    output_options.check_prefix(arguments.prefix)
+    return output_options
+
+
+def check_output_modes(output_options):
+    """
+    Raises a ValueError if an output mode is set for a format or an output that would ignore it.
+    """
+    from src.owl.owl_output_options import OWLOutputOptions
+
+    output_format = output_options.get_format()
+    if output_options.is_shared() and output_options.is_sharded():
+        raise ValueError('Shared expressions are not supported for sharded output')
+    if output_options.is_compact() and output_format != OWLOutputOptions.FORMAT_RDF_XML:
+        raise ValueError('Compact output is only supported for rdf/xml: %s' % output_format)
+    if output_options.get_processes() > 1 and \
+            output_format in (OWLOutputOptions.FORMAT_TURTLE, OWLOutputOptions.FORMAT_BINARY):
+        raise ValueError('Several processes are not supported for %s output' % output_format)
+
+
+def transform(input_filenames, output_filename, prefix, output_options=None, quiet=False,
+              instrumentation=None, term_profiler=None):
+    """
+    Parses the SBVR specifications in the input files and writes their OWL ontology to the
+    output file.
+    """
+    from src.sbvr.sbvrspecification import SBVRSpecification
+    from src.mapping.sbvrtoowl import SBVRToOWL
+
+    sbvr_specification = SBVRSpecification()
+    if output_options is not None and output_options.get_memory_budget() is not None:
+        sbvr_specification.set_memory_budget(output_options.get_memory_budget(),
+                                             output_options.get_spill_directory())
+    try:
+        for input_filename in input_filenames:
+            sbvr_specification.from_xml_file(input_filename, instrumentation, term_profiler)
+        sbvr_to_owl = SBVRToOWL(sbvr_specification, output_filename, prefix, output_options,
+                                instrumentation = instrumentation, term_profiler = term_profiler)
+        stdout = sys.stdout
+        if quiet:
+            sys.stdout = open(os.devnull, 'w')
+        try:
+            sbvr_to_owl.transform()
+        finally:
+            if quiet:
+                sys.stdout.close()
+                sys.stdout = stdout
+    finally:
+        sbvr_specification.close()
+
+
+def run_interactive():
+    print_help_Message()
+    input_filename = ask_input_filename()
+    output_filename = ask_output_filename()
+    prefix = ask_prefix()
+    transform([input_filename], output_filename, prefix)
+    return 0
+
+
+def main(argv=None):
+    """
+    Runs the command line with the given arguments (by default, those of the process) and
+    returns the exit status.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+        if not argv and sys.stdin.isatty():
+            return run_interactive()
 
+    parser = build_argument_parser()
+    arguments = parser.parse_args(argv)
+    try:
+        output_options = build_output_options(arguments)
+    except ValueError as error:
+        parser.error(str(error))
 
-sbvr_to_owl = SBVRToOWL(sbvr_specification, output_filename, prefix) 
+    if arguments.watch:
+        from src.mapping.sbvrwatcher import SBVRWatcher
+        SBVRWatcher(arguments.input, arguments.output, arguments.prefix, output_options,
+                    arguments.interval, arguments.debounce).watch()
+        return 0
 
-sbvr_to_owl.transform()
+    instrumentation = None
+    if arguments.report is not None or arguments.summary:
+        from src.utils.instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+    term_profiler = None
+    if arguments.profile_terms is not None:
+        from src.mapping.sbvrtermprofiler import SBVRTermProfiler
+        term_profiler = SBVRTermProfiler(arguments.profile_terms)
 
+    # the reports measure the transformation, so they are never served from the cache
+    cache = None
+    if arguments.cache is not None and instrumentation is None and term_profiler is None:
+        from src.owl.owl_output_cache import OWLOutputCache
+        if OWLOutputCache.is_cacheable(output_options):
+            cache = OWLOutputCache(arguments.cache, arguments.cache_size * MEGABYTE)
 
+    try:
+        if cache is not None:
+            key = cache.get_key(arguments.input, arguments.prefix, output_options)
+            if cache.fetch(key, arguments.output):
+                print('Served %s from the cache' % arguments.output)
+                return 0
+        transform(arguments.input, arguments.output, arguments.prefix, output_options,
+                  arguments.quiet, instrumentation, term_profiler)
+        if cache is not None:
+            cache.store(key, arguments.output)
+    except (IOError, OSError, ValueError) as error:
+        sys.stderr.write('sbvr-to-owl: error: %s\n' % error)
+        return 1
 
+    if arguments.report is not None:
+        instrumentation.write_report(arguments.report)
+    if arguments.summary:
+        print(instrumentation.get_summary())
+    if term_profiler is not None:
+        print(term_profiler.format_report())
+    return 0
 
 
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import heapq
+import time
+from src.owl.owl_specification import OWLSpecification
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.sbvrterm import SBVRTerm
+
+
+class SBVRTermProfiler:
+    """
+    Finds the most expensive terms of a transformation: the terms that took the longest to
+    parse, to map and to render, and the ones with the largest output. Only the N largest
+    measures of every kind are kept, in bounded heaps, so profiling takes O(N) memory whatever
+    the number of terms.
+
+    The terms are reported with the structural stats of their necessities and definitions
+    (operations, operands and range widths), which are only computed for the reported terms.
+    Render times and output sizes are measured on the rdf/xml output.
+    """
+    PARSE = 'parse'
+    MAP = 'map'
+    RENDER = 'render'
+    OUTPUT_BYTES = 'output_bytes'
+    MEASURES = (PARSE, MAP, RENDER, OUTPUT_BYTES)
+
+    DEFAULT_SIZE = 10
+
+    _size = None
+    _heaps = None
+    _recorded = 0
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        Initializes a profiler that keeps the given number of terms per measure.
+        """
+        self._size = size
+        self._heaps = dict((measure, []) for measure in self.MEASURES)
+        self._recorded = 0
+
+    def get_size(self):
+        return self._size
+
+    def record(self, measure, value, subject):
+        """
+        Records the given measure of a term, given as the SBVRTerm or the owl entity built from
+        it. It is kept if it is one of the largest of its measure.
+        """
+        heap = self._heaps[measure]
+        self._recorded += 1
+        # the count breaks ties, so subjects are never compared
+        entry = (value, -self._recorded, subject)
+        if len(heap) < self._size:
+            heapq.heappush(heap, entry)
+        elif value > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def render_owl(self, owl_entity, owl_templates):
+        """
+        Renders the given owl entity, recording its render time and output size.
+        """
+        start = time.time()
+        fragment = owl_entity.render_owl(owl_templates)
+        self.record(self.RENDER, time.time() - start, owl_entity)
+        self.record(self.OUTPUT_BYTES, len(fragment), owl_entity)
+        return fragment
+
+    def get_top_terms(self, measure):
+        """
+        Returns the kept terms of the given measure, largest first, as dicts with the name of
+        the term, the measure and its structural stats.
+        """
+        top_terms = []
+        for value, _, subject in sorted(self._heaps[measure], reverse = True):
+            top_term = {'name': self.get_name(subject), measure: value}
+            top_term.update(self.get_stats(subject))
+            top_terms.append(top_term)
+        return top_terms
+
+    def to_dict(self):
+        return dict((measure, self.get_top_terms(measure)) for measure in self.MEASURES)
+
+    def format_report(self):
+        """
+        Returns a text report with the kept terms of every measure.
+        """
+        lines = []
+        for measure in self.MEASURES:
+            top_terms = self.get_top_terms(measure)
+            if not top_terms:
+                continue
+            lines.append('Top %d terms by %s:' % (len(top_terms), measure))
+            for top_term in top_terms:
+                value = top_term[measure]
+                lines.append('  %-40s %12s  operations %d, operands %d, max operands %d, '
+                             'range concepts %d, max range width %d' % (
+                                 top_term['name'],
+                                 '%.6fs' % value if isinstance(value, float) else value,
+                                 top_term['operations'], top_term['operands'],
+                                 top_term['max_operands'], top_term['range_concepts'],
+                                 top_term['max_range_width']))
+        return '\n'.join(lines)
+
+    @staticmethod
+    def get_name(subject):
+        if isinstance(subject, SBVRTerm):
+            return subject.get_name()
+        if isinstance(subject, OWLSpecification.OWLClassSpecification):
+            return subject.get_classname()
+        return subject.get_name()
+
+    @staticmethod
+    def get_logical_operations(subject):
+        """
+        Returns the logical operations of the necessity and definition of the given term, or
+        of the class expressions of the given owl class.
+        """
+        if isinstance(subject, SBVRTerm):
+            return [logical_operation
+                    for logical_operation in (subject.get_necessity(), subject.get_definition())
+                    if isinstance(logical_operation, LogicalOperation)]
+        if isinstance(subject, OWLSpecification.OWLClassSpecification):
+            return subject.get_sub_class_of_expressions() + subject.get_equivalence_rules()
+        return []
+
+    @staticmethod
+    def get_stats(subject):
+        """
+        Returns the structural stats of the given term or owl entity: the number of logical
+        operations (nested ones included), of operands (rules and nested operations), the
+        operands of the widest operation, and the noun concepts of the ranges of its rules, in
+        total and in the widest range.
+        """
+        stats = {'operations': 0, 'operands': 0, 'max_operands': 0, 'range_concepts': 0,
+                 'max_range_width': 0}
+        for logical_operation in SBVRTermProfiler.get_logical_operations(subject):
+            for operation in logical_operation.iter_operations():
+                operand_count = len(operation.get_logical_operators())
+                stats['operations'] += 1
+                stats['operands'] += operand_count
+                stats['max_operands'] = max(stats['max_operands'], operand_count)
+            for rule in logical_operation.iter_rules():
+                rule_range = rule.get_rule_range()
+                if rule_range is None:
+                    continue
+                width = 1 if rule_range.is_noun_concept() else len(rule_range.get_range())
+                stats['range_concepts'] += width
+                stats['max_range_width'] = max(stats['max_range_width'], width)
+        return stats
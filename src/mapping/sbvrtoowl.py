@@ -1,40 +1,146 @@
+import time
 from src.owl.owl_file import *
 from src.owl.owl_specification import *
+from src.owl.owl_writer import OWLWriter
+from src.owl.owl_output_options import OWLOutputOptions
 
 class SBVRToOWL(OWLFile):
     """
-    This class represents the core of the transformation process.
+    This class represents the core of the transformation process. The serializers, the
+    compression and the instrumentation are only imported by the outputs that use them.
     """
     OWL_OBJECT_PROPERTY_TEMPLATE = '''<owl:ObjectProperty rdf:about="{prefix}#{op_name}">
                                         <rdfs:range rdf:resource="{prefix}#{op_range}"/>
                                         <rdfs:domain rdf:resource="{prefix}#{op_domain}"/>
                                       </owl:ObjectProperty>'''
-    
-    OWL_ONTOLOGY = '''<owl:Ontology rdf:about="{prefix}"/>'''
 
     _sbvr_specification = None
     _owl_specification = None
     _output_file = None
+    _filename = None
     _prefix = None
+    _output_options = None
+    _triple_store = None
+    _removed_sub_class_of_count = None
+    _instrumentation = None
+    _term_profiler = None
 
-    def __init__(self, sbvr_specification, filename, prefix):
+    def __init__(self, sbvr_specification, filename, prefix, output_options=None,
+                 instrumentation=None, term_profiler=None):
         """
-        Constructor.
+        Constructor. With an instrumentation, every stage of the transformation is recorded,
+        with the renders of the templates, and the bytes written to the output file and the
+        time spent writing them. Renders in worker processes are not counted. With a term
+        profiler, the map time of every term is recorded, and so are the render time and
+        output size of every rdf/xml entity, which are then rendered in this process.
         """
         self._sbvr_specification = sbvr_specification
-        self._output_file = open(filename, 'w')
+        self._filename = filename
         self._prefix = prefix
+        self._output_options = output_options if output_options is not None else OWLOutputOptions()
+        self._instrumentation = instrumentation
+        self._term_profiler = term_profiler
+        self.check_memory_budget()
+        self._output_options.check_prefix(prefix)
+        self._output_file = self.open_output_file(filename)
+        if instrumentation is not None:
+            from src.utils.instrumentation import Instrumentation
+            self._output_file = Instrumentation.InstrumentedFile(self._output_file, instrumentation)
+
+    def open_output_file(self, filename):
+        """
+        Opens the output file, in binary mode for the binary format, and compressing what is
+        written to it if the output options have a compression codec.
+        """
+        output_options = self._output_options
+        if output_options.get_compression() is not None:
+            if output_options.get_format() == OWLOutputOptions.FORMAT_BINARY or \
+                    output_options.is_sharded():
+                raise ValueError('Compression is not supported for binary or sharded output')
+            from src.owl.owl_compression import OWLCompression
+            return OWLCompression.open(filename, output_options.get_compression(),
+                                       output_options.get_compression_level())
+        return open(filename, 'wb' if output_options.get_format() == OWLOutputOptions.FORMAT_BINARY
+                    else 'w')
+
+    def check_memory_budget(self):
+        """
+        Raises a ValueError if the output options have a memory budget and an option that needs
+        the whole owl specification in memory: only plain, streamed rdf/xml can be written from
+        a specification spilled to disk.
+        """
+        output_options = self._output_options
+        if output_options.get_memory_budget() is None:
+            return
+        if output_options.get_format() != OWLOutputOptions.FORMAT_RDF_XML or \
+                output_options.is_reduced() or output_options.is_normalized() or \
+                output_options.is_canonical() or output_options.is_shared() or \
+                output_options.is_sharded() or (output_options.get_processes() or 1) > 1:
+            raise ValueError('A memory budget only supports rdf/xml output that is not reduced, '
+                             'normalized, canonical, shared, sharded or written by several processes')
+
+    def close(self):
+        """
+        Closes the output file, which completes it when it is compressed, and deletes what the
+        owl specification spilled to disk, if the output options have a memory budget.
+        """
+        self._output_file.close()
+        if self._output_options.get_memory_budget() is not None and \
+                self._owl_specification is not None:
+            self._owl_specification.close()
 
     def get_owl_specification(self):
         return self._owl_specification
 
+    def get_instrumentation(self):
+        return self._instrumentation
+
+    def get_term_profiler(self):
+        return self._term_profiler
+
+    def run_stage(self, name, function, get_items=None):
+        """
+        Calls the given function, recorded as the stage with the given name if there is an
+        instrumentation, and returns its result. The items of the stage are given by get_items,
+        which is called with the result.
+        """
+        if self._instrumentation is None:
+            return function()
+        with self._instrumentation.stage(name) as stage:
+            result = function()
+            if get_items is not None:
+                stage['items'] = get_items(result)
+        return result
+
+    def get_removed_sub_class_of_count(self):
+        """
+        Returns the number of implied sub class axioms removed from the output, or None if
+        the output is not reduced.
+        """
+        return self._removed_sub_class_of_count
+
+    def get_triple_store(self):
+        """
+        Returns the triple store of the owl specification, which is built the first time it is
+        requested and shared by the triple based serializers.
+        """
+        if self._triple_store is None:
+            from src.owl.owl_triple_store import OWLTripleStore
+            self._triple_store = OWLTripleStore.from_owl_specification(
+                self._owl_specification, self._prefix)
+        return self._triple_store
+
     def transform(self):
         """
         Core method that handles the transformation. It writes to the output file as
-        OWL expressions.
+        OWL expressions. The output file is closed even if the transformation fails.
         """
-        self.build_owl_specification()
-        self.write_ontology_to_owl_file()
+        try:
+            self.run_stage('map', self.build_owl_specification,
+                           lambda result: len(self._sbvr_specification.get_terms()))
+            self.write_ontology_to_owl_file()
+        finally:
+            self.close()
 
 
     def build_owl_specification(self):
@@ -42,17 +148,42 @@ class SBVRToOWL(OWLFile):
         Iterates over the SBVR specification and builds the corresponding owl_specification.
         """
         self._owl_specification = OWLSpecification(self._prefix)
+        self._owl_specification.set_instrumentation(self._instrumentation)
+        if self._output_options.get_memory_budget() is not None:
+            self._owl_specification.set_memory_budget(self._output_options.get_memory_budget(),
+                                                      self._output_options.get_spill_directory())
+        self._triple_store = None
+        term_profiler = self._term_profiler
         for sbvr_term in self._sbvr_specification.get_terms():
-            print("Transformation of: " + sbvr_term.get_name())
-            if sbvr_term.is_concept_type():
-                owl_class = self.build_owl_class_specification(sbvr_term)
-                self._owl_specification.add_class_specification(owl_class)
-            else:
-                owl_object_property = self.build_owl_object_or_data_property(sbvr_term)
-                self._owl_specification.add_object_property(owl_object_property)
+            if term_profiler is None:
+                self.add_owl_entity(sbvr_term)
+                continue
+            start = time.time()
+            self.add_owl_entity(sbvr_term)
+            term_profiler.record(term_profiler.MAP, time.time() - start, sbvr_term)
+
+    def add_owl_entity(self, sbvr_term):
+        """
+        Adds the owl class or property built from the given term to the owl specification.
+        """
+        print("Transformation of: " + sbvr_term.get_name())
+        if sbvr_term.is_concept_type():
+            self._owl_specification.add_class_specification(self.build_owl_entity(sbvr_term))
+        else:
+            self._owl_specification.add_object_property(self.build_owl_entity(sbvr_term))
 
+    @staticmethod
+    def build_owl_entity(sbvr_term):
+        """
+        Returns the owl class built from the given concept type term, or the owl object or data
+        property built from the given verb concept term.
+        """
+        if sbvr_term.is_concept_type():
+            return SBVRToOWL.build_owl_class_specification(sbvr_term)
+        return SBVRToOWL.build_owl_object_or_data_property(sbvr_term)
 
-    def build_owl_class_specification(self, sbvr_term):
+    @staticmethod
+    def build_owl_class_specification(sbvr_term):
         owl_class = OWLSpecification.OWLClassSpecification(sbvr_term.get_name())
 
         if sbvr_term.get_synonym() is not None:
@@ -69,7 +200,8 @@ class SBVRToOWL(OWLFile):
 
         return owl_class
 
-    def build_owl_object_or_data_property(self, sbvr_term):
+    @staticmethod
+    def build_owl_object_or_data_property(sbvr_term):
         if sbvr_term.is_verb_synonym():
             owl_object_property = OWLSpecification.OWLObjectPropertySpecification(
                 sbvr_term.get_name(), None, None)
@@ -88,21 +220,72 @@ class SBVRToOWL(OWLFile):
 
     def write_ontology_to_owl_file(self):
         """ 
-        Writes the owl specification to the given file.
+        Writes the owl specification to the given file, in the format of the output options.
+        Rdf/xml is streamed one fragment (or, with several processes, one batch of fragments)
+        at a time. The implied sub class axioms are removed first, if the output is reduced,
+        then the class expressions are normalized, if the output is normalized, and in canonical
+        mode the specification is sorted.
         """
-        owl_content = self.build_owl_content()
+        if self._output_options.is_reduced():
+            self._removed_sub_class_of_count = self.run_stage(
+                'reduce', self._owl_specification.reduce_sub_class_of,
+                lambda removed_count: removed_count)
+            self._triple_store = None
+            print("Removed implied sub class axioms: %d" % self._removed_sub_class_of_count)
+        if self._output_options.is_normalized():
+            self.run_stage('normalize', self._owl_specification.normalize)
+            self._triple_store = None
+        if self._output_options.is_canonical():
+            self.run_stage('canonicalize', self._owl_specification.canonicalize)
+        output_format = self._output_options.get_format()
+        if output_format in (OWLOutputOptions.FORMAT_NTRIPLES, OWLOutputOptions.FORMAT_TURTLE):
+            self.run_stage('triples', self.get_triple_store, len)
+        self.run_stage('write', self.write_owl_output, lambda result: len(
+            self._owl_specification.get_classes()) + len(self._owl_specification.get_object_properties()))
+
+    def write_owl_output(self):
+        """
+        Writes the owl specification to the output file, in the format of the output options.
+        """
+        output_format = self._output_options.get_format()
+        if output_format == OWLOutputOptions.FORMAT_NTRIPLES:
+            from src.owl.owl_ntriples import OWLNTriplesSerializer
+            OWLNTriplesSerializer(self._prefix).write_store(
+                self.get_triple_store(), self._output_file, self._output_options.get_processes())
+            self._output_file.flush()
+        elif output_format == OWLOutputOptions.FORMAT_TURTLE:
+            from src.owl.owl_turtle import OWLTurtleSerializer
+            OWLTurtleSerializer(self._prefix).write_store(self.get_triple_store(), self._output_file)
+            self._output_file.flush()
+        elif output_format == OWLOutputOptions.FORMAT_BINARY:
+            from src.owl.owl_binary import OWLBinaryWriter
+            OWLBinaryWriter().write(self._owl_specification, self._output_file)
+            self._output_file.flush()
+        elif self._output_options.is_sharded():
+            self.write_ontology_shards()
+        else:
+            compact = self._output_options.is_compact()
+            owl_writer = OWLWriter(self._output_file, compact = compact)
+            owl_writer.write_document(self._prefix, self._owl_specification.iter_owl_fragments(
+                compact, self._output_options.get_processes(),
+                shared = self._output_options.is_shared(), term_profiler = self._term_profiler))
+
+    def write_ontology_shards(self):
+        """
+        Writes the owl specification as rdf/xml shards next to the output file, split by
+        hierarchy subtree or by size, and the root ontology that imports them to the output file.
+        """
+        from src.owl.owl_shards import OWLShardWriter
+        shard_writer = OWLShardWriter(self._owl_specification, self._output_options.is_compact())
+        if self._output_options.get_shard_count() is not None:
+            shard_writer.write_by_subtree(self._filename, self._output_options.get_shard_count(),
+                                          self._output_options.get_processes(),
+                                          root_file = self._output_file)
+        else:
+            shard_writer.write_by_size(self._filename, self._output_options.get_shard_size(),
+                                       self._output_options.get_processes(),
+                                       root_file = self._output_file)
 
-        # header
-        self._output_file.write(self.XML_VERSION + '\n')
-        
-        # doctype
-        self._output_file.write(self.OWL_DOCTYPE + '\n')
-        
-        # rdf namespaces
-        rdf_content = self.OWL_RDF_NAMESPACES.format(owl_file_content = owl_content, 
-                                                     prefix = self._prefix)
-        self._output_file.write(rdf_content + '\n')
-        
     def build_owl_content(self):
         """
         Builds the owl content to write to the file.
@@ -0,0 +1,273 @@
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.owl.owl_output_options import OWLOutputOptions
+from src.owl.owl_templates import OWLTemplates
+from src.owl.owl_writer import OWLWriter
+from src.sbvr.sbvrspecification import SBVRSpecification
+
+
+class SBVRWatcher:
+    """
+    Watches one or more SBVR specification files and writes their ontology again every time
+    one of them is saved. The files are polled: a change is their modification time or size
+    changing, and the ontology is only written once the files have not changed for the debounce
+    time, so a burst of saves (or a file written in several steps) is written once.
+
+    Every term is rendered on its own in plain rdf/xml, so the owl fragment of every term is
+    kept, by the xml of the term, and only the terms added or changed since the last write are
+    parsed, mapped and rendered again; the files that did not change are not read. With output
+    options that need the whole specification (another format, or a reduced, normalized,
+    canonical, shared, sharded or compressed output), the ontology is transformed again from
+    scratch instead.
+
+    Every write is reported with the latency from the save (the last modification time of the
+    changed files) to the complete output, which is written to a temporary file that is then
+    renamed over the output file (but for sharded output, whose shards are named after it). A
+    write that fails, because a file can not be parsed or has a term that can not be mapped, or
+    the output can not be written, keeps the previous output. Its files stay pending, so the
+    write is tried again on every poll until it succeeds; the same failure is reported once.
+    """
+    DEFAULT_INTERVAL = 0.5
+    DEFAULT_DEBOUNCE = 0.2
+    TEMPORARY_SUFFIX = '.tmp'
+
+    _input_filenames = None
+    _output_filename = None
+    _prefix = None
+    _output_options = None
+    _interval = None
+    _debounce = None
+    _signatures = None
+    _pending = None
+    _changed_at = None
+    _failure = None
+    _file_fragments = None
+    _owl_templates = None
+    _reports = None
+
+    def __init__(self, input_filenames, output_filename, prefix, output_options=None,
+                 interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        """
+        Initializes a watcher of the given files, polled every interval seconds, whose terms
+        are written, in the order of the files, to the given output file.
+        """
+        self._input_filenames = list(input_filenames)
+        self._output_filename = output_filename
+        self._prefix = prefix
+        self._output_options = output_options if output_options is not None else OWLOutputOptions()
+        self._interval = interval
+        self._debounce = debounce
+        self._signatures = {}
+        self._pending = set()
+        self._changed_at = None
+        self._file_fragments = {}
+        self._owl_templates = OWLTemplates(prefix, self._output_options.is_compact())
+        self._reports = []
+
+    def get_reports(self):
+        return self._reports
+
+    def is_incremental(self):
+        """
+        Returns True if the output options allow writing the ontology from the kept fragments.
+        """
+        output_options = self._output_options
+        return output_options.get_format() == OWLOutputOptions.FORMAT_RDF_XML and \
+            not (output_options.is_reduced() or output_options.is_normalized() or
+                 output_options.is_canonical() or output_options.is_shared() or
+                 output_options.is_sharded() or output_options.get_compression() is not None)
+
+    @staticmethod
+    def get_signature(filename):
+        """
+        Returns the modification time and size of the given file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size)
+
+    def watch(self, max_writes=None, report_file=sys.stdout):
+        """
+        Writes the ontology, then polls the files and writes it again after every change, until
+        interrupted or until it has been written max_writes times. Every write is reported to
+        the given file.
+        """
+        for filename in self._input_filenames:
+            self._signatures[filename] = self.get_signature(filename)
+        if self.write_ontology(self._input_filenames, report_file) is None:
+            self._pending.update(self._input_filenames)
+            self._changed_at = time.time()
+        try:
+            while max_writes is None or len(self._reports) < max_writes:
+                time.sleep(self._interval)
+                self.check(report_file)
+        except KeyboardInterrupt:
+            pass
+
+    def check(self, report_file=None):
+        """
+        Polls the files once. Returns the report of the write if the files changed and then
+        stayed unchanged for the debounce time, else None. The files of a write that fails stay
+        pending, and are written again on the next poll.
+        """
+        now = time.time()
+        changed = [filename for filename in self._input_filenames
+                   if self.get_signature(filename) != self._signatures.get(filename)]
+        if changed:
+            for filename in changed:
+                self._signatures[filename] = self.get_signature(filename)
+            self._pending.update(changed)
+            self._changed_at = now
+            if self._debounce > 0:
+                return None
+        if not self._pending or now - self._changed_at < self._debounce:
+            return None
+        pending = [filename for filename in self._input_filenames if filename in self._pending]
+        report = self.write_ontology(pending, report_file)
+        if report is not None:
+            self._pending = set()
+        return report
+
+    def write_ontology(self, changed_filenames, report_file=None):
+        """
+        Writes the ontology after the given files changed, and returns the report of the
+        write, or None if a file could not be parsed (it may still be being saved) or mapped, or
+        the output could not be written, in which case the previous output is kept. A failure
+        is not reported again while the next writes fail the same way.
+        """
+        start = time.time()
+        saved_at = max([signature[0] for signature in
+                        [self._signatures.get(filename) for filename in changed_filenames]
+                        if signature is not None] or [start])
+        report = {'files': changed_filenames, 'terms': 0, 'rendered': 0, 'reused': 0}
+        try:
+            if self.is_incremental():
+                self.write_fragments(changed_filenames, report)
+            else:
+                self.transform(report)
+        except Exception as error:
+            # the watch goes on until the files are fixed
+            failure = '%s: %s' % (error.__class__.__name__, error)
+            if report_file is not None and failure != self._failure:
+                report_file.write('Not written, %s\n' % failure)
+                report_file.flush()
+            self._failure = failure
+            return None
+        self._failure = None
+        end = time.time()
+        report['write_seconds'] = end - start
+        report['latency_seconds'] = max(end - saved_at, 0)
+        self._reports.append(report)
+        if report_file is not None:
+            report_file.write(self.format_report(report) + '\n')
+            report_file.flush()
+        return report
+
+    def write_fragments(self, changed_filenames, report):
+        """
+        Renders the terms of the changed files that are not kept yet, and writes the fragments
+        of all the files: the properties and then the classes, as SBVRToOWL writes them.
+        """
+        file_fragments = {}
+        for filename in changed_filenames:
+            file_fragments[filename] = self.render_file(
+                filename, self._file_fragments.get(filename, []), report)
+        for filename in self._input_filenames:
+            if filename not in file_fragments:
+                file_fragments[filename] = self._file_fragments.get(filename, [])
+                report['terms'] += len(file_fragments[filename])
+        self._file_fragments = dict((filename, file_fragments[filename])
+                                    for filename in self._input_filenames)
+
+        fragments = [self._file_fragments[filename] for filename in self._input_filenames]
+        temporary_filename = self._output_filename + self.TEMPORARY_SUFFIX
+        try:
+            with open(temporary_filename, 'w') as output_file:
+                OWLWriter(output_file, compact = self._output_options.is_compact()).write_document(
+                    self._prefix,
+                    [fragment for is_class in (False, True) for file_fragments in fragments
+                     for term_xml, term_is_class, fragment in file_fragments
+                     if term_is_class == is_class])
+            os.rename(temporary_filename, self._output_filename)
+        finally:
+            self.remove_temporary_file(temporary_filename)
+
+    def render_file(self, filename, kept_fragments, report):
+        """
+        Returns the (term xml, is class, fragment) of every term of the given file, reusing
+        the given ones of the terms whose xml did not change.
+        """
+        sbvr_specification = SBVRSpecification()
+        kept_fragments = dict((term_xml, (is_class, fragment))
+                              for term_xml, is_class, fragment in kept_fragments)
+        file_fragments = []
+        root = None
+        depth = 0
+        for event, element in ET.iterparse(filename, events = ('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1 or element.tag != 'sbvr-term':
+                continue
+            element.tail = None
+            term_xml = ET.tostring(element)
+            report['terms'] += 1
+            kept = kept_fragments.get(term_xml)
+            if kept is not None:
+                report['reused'] += 1
+                file_fragments.append((term_xml, kept[0], kept[1]))
+            else:
+                sbvr_term = sbvr_specification.parse_sbvr_term(element)
+                fragment = SBVRToOWL.build_owl_entity(sbvr_term).render_owl(self._owl_templates)
+                report['rendered'] += 1
+                file_fragments.append((term_xml, sbvr_term.is_concept_type(), fragment))
+            # the parsed terms are removed from the tree
+            root.clear()
+        return file_fragments
+
+    def transform(self, report):
+        """
+        Transforms all the files again, into a single specification, and writes the ontology.
+        """
+        sbvr_specification = SBVRSpecification()
+        for filename in self._input_filenames:
+            sbvr_specification.from_xml_file(filename)
+        report['terms'] = report['rendered'] = len(sbvr_specification.get_terms())
+        if self._output_options.is_sharded():
+            output_filename = self._output_filename
+        else:
+            output_filename = self._output_filename + self.TEMPORARY_SUFFIX
+        stdout = sys.stdout
+        # the transformation prints every term
+        sys.stdout = StringIO()
+        try:
+            SBVRToOWL(sbvr_specification, output_filename, self._prefix,
+                      self._output_options).transform()
+            if output_filename != self._output_filename:
+                os.rename(output_filename, self._output_filename)
+        finally:
+            sys.stdout = stdout
+            if output_filename != self._output_filename:
+                self.remove_temporary_file(output_filename)
+
+    @staticmethod
+    def remove_temporary_file(temporary_filename):
+        """
+        Removes the temporary file of a write that failed, if any.
+        """
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+
+    def format_report(self, report):
+        return 'Wrote %s in %.3fs, %.3fs after the save of %s (%d terms: %d rendered, %d reused)' % (
+            self._output_filename, report['write_seconds'], report['latency_seconds'],
+            ', '.join(report['files']), report['terms'], report['rendered'], report['reused'])
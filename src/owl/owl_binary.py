@@ -0,0 +1,341 @@
+import mmap
+import struct
+import sys
+from array import array
+from src.owl.owl_specification import OWLSpecification
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.rule import Rule
+
+
+class OWLBinaryFormat:
+    """
+    Layout of the binary serialization of an OWLSpecification.
+
+    The file starts with a fixed header, followed by the entity records, the entity index,
+    the term table and the term index. Every string of the specification (names, verbs,
+    quantifications...) is stored once in the term table and referred to by its integer id.
+    An entity record is a sequence of little endian unsigned 32 bit integers. The indexes hold
+    the offset of every record and of every term (plus the end offset), so any entity or term
+    can be read on its own from a memory map.
+
+    Version 2 adds nested logical operations, so version 1 files are still read.
+    """
+    MAGIC = b'SBOWLBIN'
+    VERSION = 2
+    VERSIONS = (1, 2)
+    # magic, version, prefix term, term count, entity count, entity index offset, term index offset
+    HEADER = struct.Struct('<8sIIIIQQ')
+    OFFSET = struct.Struct('<Q')
+
+    NONE = 0xFFFFFFFF
+    # written in place of a rule before an operation nested in a conjunction or disjunction
+    NESTED_OPERATION = 0xFFFFFFFE
+
+    CLASS = 0
+    OBJECT_PROPERTY = 1
+    DATA_PROPERTY = 2
+
+    LOGICAL_OPERATION_TYPES = ['single-clause', 'conjunction', 'disjunction']
+
+    RANGE_NOUN_CONCEPT = 0
+    RANGE_CONJUNCTION = 1
+    RANGE_DISJUNCTION = 2
+
+    @staticmethod
+    def to_little_endian(integers):
+        if sys.byteorder != 'little':
+            integers.byteswap()
+        return integers
+
+
+class OWLBinaryWriter(OWLBinaryFormat):
+    """
+    Writes an OWLSpecification in the binary format.
+    """
+    _term_ids = None
+    _terms = None
+
+    def __init__(self):
+        self._term_ids = {}
+        self._terms = []
+
+    def write(self, owl_specification, output_file):
+        """
+        Writes the specification to the given file, which must support seek and tell.
+        """
+        start = output_file.tell()
+        output_file.write(b'\0' * self.HEADER.size)
+        prefix_id = self.term_id(owl_specification.get_prefix())
+
+        entity_offsets = []
+        entities = owl_specification.get_object_properties() + owl_specification.get_classes()
+        for entity in entities:
+            entity_offsets.append(output_file.tell() - start)
+            output_file.write(self.to_bytes(self.encode_entity(entity)))
+        entity_offsets.append(output_file.tell() - start)
+        entity_index_offset = self.write_index(output_file, entity_offsets, start)
+
+        term_offsets = []
+        for term in self._terms:
+            term_offsets.append(output_file.tell() - start)
+            output_file.write(term)
+        term_offsets.append(output_file.tell() - start)
+        term_index_offset = self.write_index(output_file, term_offsets, start)
+
+        end = output_file.tell()
+        output_file.seek(start)
+        output_file.write(self.HEADER.pack(self.MAGIC, self.VERSION, prefix_id, len(self._terms),
+                                           len(entities), entity_index_offset, term_index_offset))
+        output_file.seek(end)
+
+    def write_index(self, output_file, offsets, start):
+        index_offset = output_file.tell() - start
+        for offset in offsets:
+            output_file.write(self.OFFSET.pack(offset))
+        return index_offset
+
+    def to_bytes(self, integers):
+        integers = self.to_little_endian(array('I', integers))
+        return integers.tostring() if hasattr(integers, 'tostring') else integers.tobytes()
+
+    def term_id(self, term):
+        """
+        Returns the id of the given term in the term table, adding it if it is new.
+        None is encoded as NONE.
+        """
+        if term is None:
+            return self.NONE
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term.encode('utf-8') if not isinstance(term, bytes) else term)
+        return term_id
+
+    def encode_entity(self, entity):
+        if isinstance(entity, OWLSpecification.OWLClassSpecification):
+            return self.encode_class(entity)
+        if isinstance(entity, OWLSpecification.OWLDataPropertySpecification):
+            return [self.DATA_PROPERTY, self.term_id(entity.get_name()),
+                    self.term_id(entity.get_domain()), self.term_id(entity.get_range_xsd())]
+        return [self.OBJECT_PROPERTY, self.term_id(entity.get_name()),
+                self.term_id(entity.get_domain()), self.term_id(entity.get_range()),
+                self.term_id(entity.get_equivalent_to())]
+
+    def encode_class(self, owl_class):
+        integers = [self.CLASS, self.term_id(owl_class.get_classname())]
+        for terms in (owl_class.get_sub_class_of(), owl_class.get_synonym_equivalences()):
+            integers.append(len(terms))
+            integers.extend(self.term_id(term) for term in terms)
+        for logical_operations in (owl_class.get_equivalence_rules(),
+                                   owl_class.get_sub_class_of_expressions()):
+            integers.append(len(logical_operations))
+            for logical_operation in logical_operations:
+                self.encode_logical_operation(integers, logical_operation)
+        return integers
+
+    def encode_logical_operation(self, integers, logical_operation):
+        """
+        Encodes the type and the operators of an operation. Nested operations are encoded in
+        place, after NESTED_OPERATION, with an explicit stack, so any depth is supported.
+        """
+        stack = [logical_operation]
+        while stack:
+            operator = stack.pop()
+            if not isinstance(operator, LogicalOperation):
+                self.encode_rule(integers, operator)
+                continue
+            if operator is not logical_operation:
+                integers.append(self.NESTED_OPERATION)
+            if operator.is_conjunction():
+                integers.append(1)
+            elif operator.is_disjunction():
+                integers.append(2)
+            else:
+                integers.append(0)
+            integers.append(len(operator.get_logical_operators()))
+            stack.extend(reversed(operator.get_logical_operators()))
+
+    def encode_rule(self, integers, rule):
+        quantification = rule.get_quantification()
+        integers.append(self.term_id(rule.get_verb()))
+        integers.append(self.term_id(quantification.get_type()))
+        integers.append(self.term_id(quantification.get_value()))
+
+        rule_range = rule.get_rule_range()
+        if rule_range.is_noun_concept():
+            integers.extend([self.RANGE_NOUN_CONCEPT, 1, self.term_id(rule_range.get_range())])
+        else:
+            concepts = rule_range.get_range()
+            integers.append(self.RANGE_CONJUNCTION if rule_range.is_conjunction()
+                            else self.RANGE_DISJUNCTION)
+            integers.append(len(concepts))
+            integers.extend(self.term_id(concept) for concept in concepts)
+
+
+class OWLBinaryReader(OWLBinaryFormat):
+    """
+    Reads an OWLSpecification from the binary format through a memory map. Nothing is decoded
+    up front: terms and entities are decoded when they are requested, and terms are cached.
+    """
+    _file = None
+    _map = None
+    _prefix_id = None
+    _term_count = None
+    _entity_count = None
+    _entity_index_offset = None
+    _term_index_offset = None
+    _terms = None
+
+    def __init__(self, filename):
+        """
+        Opens and maps the given file, and reads its header.
+        """
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, version, self._prefix_id, self._term_count, self._entity_count, \
+            self._entity_index_offset, self._term_index_offset = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError('Not a binary owl specification: %s' % filename)
+        if version not in self.VERSIONS:
+            self.close()
+            raise ValueError('Unsupported binary owl specification version %d (supported: %s): %s'
+                             % (version, ', '.join(str(supported) for supported in self.VERSIONS),
+                                filename))
+        self._terms = {}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def get_prefix(self):
+        return self.get_term(self._prefix_id)
+
+    def get_term_count(self):
+        return self._term_count
+
+    def get_entity_count(self):
+        return self._entity_count
+
+    def get_term(self, term_id):
+        """
+        Returns the term with the given id, or None for NONE.
+        """
+        if term_id == self.NONE:
+            return None
+        term = self._terms.get(term_id)
+        if term is None:
+            start, end = self.get_offsets(self._term_index_offset, term_id)
+            term = self._map[start:end]
+            try:
+                term.decode('ascii')
+            except UnicodeDecodeError:
+                term = term.decode('utf-8')
+            self._terms[term_id] = term
+        return term
+
+    def get_offsets(self, index_offset, position):
+        offset = index_offset + position * self.OFFSET.size
+        return self.OFFSET.unpack_from(self._map, offset)[0], \
+            self.OFFSET.unpack_from(self._map, offset + self.OFFSET.size)[0]
+
+    def get_entity(self, position):
+        """
+        Decodes and returns the entity (class or property specification) at the given position.
+        """
+        start, end = self.get_offsets(self._entity_index_offset, position)
+        integers = array('I')
+        data = self._map[start:end]
+        if hasattr(integers, 'fromstring'):
+            integers.fromstring(data)
+        else:
+            integers.frombytes(data)
+        return self.decode_entity(iter(self.to_little_endian(integers)))
+
+    def iter_entities(self):
+        for position in range(self._entity_count):
+            yield self.get_entity(position)
+
+    def to_owl_specification(self):
+        """
+        Decodes the whole file into an OWLSpecification.
+        """
+        owl_specification = OWLSpecification(self.get_prefix())
+        for entity in self.iter_entities():
+            if isinstance(entity, OWLSpecification.OWLClassSpecification):
+                owl_specification.add_class_specification(entity)
+            else:
+                owl_specification.add_object_property(entity)
+        return owl_specification
+
+    def decode_entity(self, integers):
+        kind = next(integers)
+        if kind == self.CLASS:
+            return self.decode_class(integers)
+        if kind == self.DATA_PROPERTY:
+            return OWLSpecification.OWLDataPropertySpecification(
+                self.get_term(next(integers)), self.get_term(next(integers)),
+                self.get_term(next(integers)))
+        object_property = OWLSpecification.OWLObjectPropertySpecification(
+            self.get_term(next(integers)), self.get_term(next(integers)),
+            self.get_term(next(integers)))
+        equivalent_to = self.get_term(next(integers))
+        if equivalent_to is not None:
+            object_property.set_equivalent_to(equivalent_to)
+        return object_property
+
+    def decode_class(self, integers):
+        owl_class = OWLSpecification.OWLClassSpecification(self.get_term(next(integers)))
+        for _ in range(next(integers)):
+            owl_class.add_parent_class(self.get_term(next(integers)))
+        for _ in range(next(integers)):
+            owl_class.add_synonym_equivalence(self.get_term(next(integers)))
+        for _ in range(next(integers)):
+            owl_class.add_equivalence_rule(self.decode_logical_operation(integers))
+        for _ in range(next(integers)):
+            owl_class.add_parent_class_expression(self.decode_logical_operation(integers))
+        return owl_class
+
+    def decode_logical_operation(self, integers):
+        logical_operation = LogicalOperation(self.LOGICAL_OPERATION_TYPES[next(integers)])
+        # the operations with operators left to decode, and how many are left
+        stack = [[logical_operation, next(integers)]]
+        while stack:
+            frame = stack[-1]
+            if frame[1] == 0:
+                stack.pop()
+                continue
+            frame[1] -= 1
+            verb_id = next(integers)
+            if verb_id == self.NESTED_OPERATION:
+                nested_operation = LogicalOperation(self.LOGICAL_OPERATION_TYPES[next(integers)])
+                frame[0].add_logical_operator(nested_operation)
+                stack.append([nested_operation, next(integers)])
+            else:
+                frame[0].add_logical_operator(self.decode_rule(integers, verb_id))
+        return logical_operation
+
+    def decode_rule(self, integers, verb_id):
+        """
+        Decodes the rule whose verb (already read from the integers) has the given id.
+        """
+        rule = Rule()
+        rule.set_verb(self.get_term(verb_id))
+
+        quantification = Rule.Quantification()
+        quantification.set_quantification_type(self.get_term(next(integers)))
+        quantification.set_quantification_value(self.get_term(next(integers)))
+        rule.set_quantification(quantification)
+
+        range_type = next(integers)
+        concepts = [self.get_term(next(integers)) for _ in range(next(integers))]
+        rule_range = Rule.RuleRange()
+        if range_type == self.RANGE_NOUN_CONCEPT:
+            rule_range.set_noun_concept(concepts[0])
+        elif range_type == self.RANGE_CONJUNCTION:
+            rule_range.set_conjunction(concepts)
+        else:
+            rule_range.set_disjunction(concepts)
+        rule.set_rule_range(rule_range)
+        return rule
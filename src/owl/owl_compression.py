@@ -0,0 +1,86 @@
+import bz2
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class OWLCompression:
+    """
+    Opens output files that compress what is written to them on the fly, so the owl output
+    does not need to be compressed afterwards in a second pass. Gzip and bzip2 come with python;
+    zstandard needs the zstandard package.
+    """
+    CODEC_GZIP = 'gzip'
+    CODEC_BZ2 = 'bz2'
+    CODEC_ZSTD = 'zstd'
+    CODECS = (CODEC_GZIP, CODEC_BZ2, CODEC_ZSTD)
+
+    DEFAULT_LEVELS = {CODEC_GZIP: 6, CODEC_BZ2: 9, CODEC_ZSTD: 3}
+    # the lowest and highest level of every codec (-1 is the default level of zlib)
+    LEVEL_RANGES = {CODEC_GZIP: (-1, 9), CODEC_BZ2: (1, 9), CODEC_ZSTD: (1, 22)}
+    EXTENSIONS = {CODEC_GZIP: '.gz', CODEC_BZ2: '.bz2', CODEC_ZSTD: '.zst'}
+
+    # zlib window bits that make it write a gzip header and trailer
+    GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+    @staticmethod
+    def is_available(codec):
+        """
+        Returns True if the given codec can be used.
+        """
+        if codec == OWLCompression.CODEC_ZSTD:
+            return zstandard is not None
+        return codec in OWLCompression.CODECS
+
+    @staticmethod
+    def open(filename, codec, level=None):
+        """
+        Opens the given file for writing, compressed with the given codec and level (or the
+        default level of the codec). The returned object must be closed to complete the file.
+        """
+        if not OWLCompression.is_available(codec):
+            raise ValueError('Unavailable compression codec: ' + str(codec))
+        if level is None:
+            level = OWLCompression.DEFAULT_LEVELS[codec]
+
+        if codec == OWLCompression.CODEC_GZIP:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, OWLCompression.GZIP_WBITS)
+        elif codec == OWLCompression.CODEC_BZ2:
+            compressor = bz2.BZ2Compressor(level)
+        else:
+            compressor = zstandard.ZstdCompressor(level = level).compressobj()
+        return OWLCompression.CompressedFile(open(filename, 'wb'), compressor)
+
+    class CompressedFile:
+        """
+        A file object that compresses what is written to it. Flushing only flushes the
+        underlying file: the compressor keeps its state until the file is closed, so flushes
+        do not make the compression worse.
+        """
+        _output_file = None
+        _compressor = None
+
+        def __init__(self, output_file, compressor):
+            self._output_file = output_file
+            self._compressor = compressor
+
+        def write(self, data):
+            compressed = self._compressor.compress(data)
+            if compressed:
+                self._output_file.write(compressed)
+
+        def flush(self):
+            self._output_file.flush()
+
+        def close(self):
+            """
+            Writes what is left in the compressor and closes the underlying file.
+            """
+            if self._compressor is None:
+                return
+            self._output_file.write(self._compressor.flush())
+            self._compressor = None
+            self._output_file.close()
@@ -17,6 +17,10 @@ class OWLFile:
         
         </rdf:RDF>'''
 
+    # the namespaces template split around its content, so the content can be streamed
+    OWL_RDF_NAMESPACES_HEADER = OWL_RDF_NAMESPACES.split('{owl_file_content}')[0]
+    OWL_RDF_NAMESPACES_FOOTER = OWL_RDF_NAMESPACES.split('{owl_file_content}')[1]
+
     OWL_DOCTYPE = '''
         <!DOCTYPE rdf:RDF [
           <!ENTITY owl "http://www.w3.org/2002/07/owl#" >
@@ -24,3 +28,11 @@ class OWLFile:
           <!ENTITY rdfs "http://www.w3.org/2000/01/rdf-schema#" >
           <!ENTITY rdf "http://www.w3.org/1999/02/22-rdf-syntax-ns#" >
         ]>'''
+
+    OWL_ONTOLOGY = '''<owl:Ontology rdf:about="{prefix}"/>'''
+
+    OWL_ONTOLOGY_WITH_IMPORTS = '''<owl:Ontology rdf:about="{prefix}">
+{imports}
+</owl:Ontology>'''
+
+    OWL_IMPORTS = '''    <owl:imports rdf:resource="{ontology}"/>'''
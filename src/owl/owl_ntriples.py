@@ -0,0 +1,87 @@
+from src.owl.owl_output_options import OWLOutputOptions
+from src.owl.owl_triples import OWLTripleBuilder
+from src.owl.owl_triple_store import OWLTripleStore
+from src.utils.parallelutils import ParallelUtils
+
+
+class OWLNTriplesSerializer:
+    """
+    Writes an OWLSpecification (or the OWLTripleStore built from it) as n-triples. Every line is
+    an independent triple, so the entities can be rendered in chunks by several worker processes,
+    and the outputs of separate shards can simply be concatenated.
+    """
+    DEFAULT_CHUNK_SIZE = 1000
+
+    _prefix = None
+
+    def __init__(self, prefix):
+        """
+        Initializes the serializer with the prefix of the ontology, which must be absolute.
+        """
+        OWLOutputOptions.check_triples_prefix(prefix)
+        self._prefix = prefix
+
+    def render_ontology(self):
+        """
+        Returns the n-triples line that declares the ontology.
+        """
+        return '%s %s %s .\n' % OWLTripleBuilder(self._prefix).build_ontology_triple()
+
+    def build_triple_store(self, owl_specification):
+        return OWLTripleStore.from_owl_specification(owl_specification, self._prefix)
+
+    def render_entities(self, triple_store, start, stop):
+        """
+        Returns the n-triples lines of the entities between the given indexes.
+        """
+        first, last = triple_store.get_entity_triple_range(start, stop)
+        return ''.join('%s %s %s .\n' % triple for triple in triple_store.iter_triples(first, last))
+
+    def iter_chunks(self, triple_store, processes=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yields the n-triples of the store in chunks of entities, in order. The chunks are
+        rendered by the given number of processes, which inherit the store.
+        """
+        entity_count = triple_store.get_entity_count()
+        ranges = [(start, min(start + chunk_size, entity_count))
+                  for start in range(0, entity_count, chunk_size)]
+        return ParallelUtils.ordered_map(
+            lambda entity_range: self.render_entities(triple_store, entity_range[0], entity_range[1]),
+            ranges, processes)
+
+    def write(self, owl_specification, output_file, processes=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Writes the n-triples of the specification to the given file.
+        """
+        self.write_store(self.build_triple_store(owl_specification), output_file, processes,
+                         chunk_size)
+
+    def write_store(self, triple_store, output_file, processes=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Writes the n-triples of the store to the given file, after the ontology declaration.
+        """
+        output_file.write(self.render_ontology())
+        for chunk in self.iter_chunks(triple_store, processes, chunk_size):
+            output_file.write(chunk)
+
+    def write_shards(self, owl_specification, filenames, processes=None):
+        """
+        Splits the entities of the specification in as many consecutive shards as filenames
+        and writes each shard to its file, concurrently. The first shard starts with the ontology
+        declaration, so concatenating the files in order gives the same output as write.
+        """
+        triple_store = self.build_triple_store(owl_specification)
+        entity_count = triple_store.get_entity_count()
+        shard_size = (entity_count + len(filenames) - 1) // len(filenames) if filenames else 0
+        shards = [(filename, index * shard_size, min((index + 1) * shard_size, entity_count))
+                  for index, filename in enumerate(filenames)]
+        for _ in ParallelUtils.ordered_map(
+                lambda shard: self.write_shard(triple_store, shard[0], shard[1], shard[2]),
+                shards, processes if processes is not None else len(filenames)):
+            pass
+
+    def write_shard(self, triple_store, filename, start, stop):
+        with open(filename, 'w') as output_file:
+            if start == 0:
+                output_file.write(self.render_ontology())
+            output_file.write(self.render_entities(triple_store, start, stop))
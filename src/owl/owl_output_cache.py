@@ -0,0 +1,217 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+
+
+class OWLOutputCache:
+    """
+    A directory of finished ontologies, shared by runs and processes, addressed by the content
+    of what produced them: the sha256 of the input specification files, the prefix, the output
+    options that change the output, and the version of the tool. A run whose key is in the cache
+    gets its output as a copy of the cached file instead of transforming again.
+
+    The tool version is VERSION and a hash of the source files of the src package, so a change
+    to the code never serves ontologies written by the previous code. Outputs are copied into
+    the cache, and hits are copied out of it, never hard linked: an output file is written over
+    by the next run that writes it, with or without the cache, which must not change the
+    cached file. Cached files are read only.
+
+    The cache is kept under a size cap, evicting the least recently used files: a hit moves
+    the modification time of the cached file forward. Files are added and served through
+    renames, so concurrent runs never see a partial file. Sharded outputs are not cached.
+    """
+    VERSION = '1'
+    DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+    CHUNK_SIZE = 1024 * 1024
+    SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    _tool_version = None
+
+    _directory = None
+    _max_size = None
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initializes a cache in the given directory, created if it does not exist, that keeps at
+        most max_size bytes.
+        """
+        self._directory = directory
+        self._max_size = max_size
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as error:
+                # another run may have created it
+                if error.errno != errno.EEXIST:
+                    raise
+
+    def get_directory(self):
+        return self._directory
+
+    def get_max_size(self):
+        return self._max_size
+
+    @staticmethod
+    def get_tool_version():
+        """
+        Returns VERSION followed by the sha256 of the python sources of the src package, which
+        is computed once per process.
+        """
+        if OWLOutputCache._tool_version is None:
+            sources = hashlib.sha256()
+            for directory, directories, filenames in os.walk(OWLOutputCache.SOURCE_DIRECTORY):
+                directories.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith('.py'):
+                        path = os.path.join(directory, filename)
+                        sources.update(os.path.relpath(path, OWLOutputCache.SOURCE_DIRECTORY)
+                                       .encode('utf-8') + b'\0')
+                        OWLOutputCache.update_file_hash(sources, path)
+            OWLOutputCache._tool_version = OWLOutputCache.VERSION + '-' + sources.hexdigest()
+        return OWLOutputCache._tool_version
+
+    @staticmethod
+    def update_file_hash(file_hash, filename):
+        with open(filename, 'rb') as input_file:
+            for chunk in iter(lambda: input_file.read(OWLOutputCache.CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+
+    @staticmethod
+    def is_cacheable(output_options):
+        """
+        Returns True if the output of the given options is a single file that can be cached.
+        """
+        return not output_options.is_sharded()
+
+    @staticmethod
+    def get_key(input_filenames, prefix, output_options):
+        """
+        Returns the key of the output of the given input files, in order, written with the
+        given prefix and options. The options that do not change the output (processes and
+        memory budget) are not part of the key.
+        """
+        input_hashes = []
+        for filename in input_filenames:
+            input_hash = hashlib.sha256()
+            OWLOutputCache.update_file_hash(input_hash, filename)
+            input_hashes.append(input_hash.hexdigest())
+        key = {
+            'version': OWLOutputCache.get_tool_version(),
+            'inputs': input_hashes,
+            'prefix': prefix,
+            'options': {
+                'format': output_options.get_format(),
+                'compact': output_options.is_compact(),
+                'canonical': output_options.is_canonical(),
+                'reduced': output_options.is_reduced(),
+                'normalized': output_options.is_normalized(),
+                'shared': output_options.is_shared(),
+                'compression': output_options.get_compression(),
+                'compression_level': output_options.get_compression_level(),
+            },
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys = True).encode('utf-8')).hexdigest()
+
+    def get_filename(self, key):
+        """
+        Returns the file of the given key, in a subdirectory named after its first two digits.
+        """
+        return os.path.join(self._directory, key[:2], key)
+
+    def fetch(self, key, output_filename):
+        """
+        Writes the cached output of the given key to the output file and returns True, or
+        returns False if the key is not cached.
+        """
+        cached_filename = self.get_filename(key)
+        try:
+            self.place(cached_filename, output_filename)
+            os.utime(cached_filename, None)
+        except (IOError, OSError) as error:
+            # not cached, or evicted by another run meanwhile
+            if error.errno != errno.ENOENT:
+                raise
+            return False
+        return True
+
+    def store(self, key, output_filename):
+        """
+        Adds the given output file as the output of the given key, and evicts the least
+        recently used files over the size cap.
+        """
+        cached_filename = self.get_filename(key)
+        cached_directory = os.path.dirname(cached_filename)
+        if not os.path.isdir(cached_directory):
+            try:
+                os.makedirs(cached_directory)
+            except OSError as error:
+                if error.errno != errno.EEXIST:
+                    raise
+        self.place(output_filename, cached_filename,
+                   stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        self.evict(keep = cached_filename)
+
+    @staticmethod
+    def place(source_filename, target_filename, mode=None):
+        """
+        Makes the target file a copy of the source file, with the given mode, replacing the
+        target with a rename: a target that was a hard link is unlinked, not written through.
+        """
+        target_directory = os.path.dirname(os.path.abspath(target_filename))
+        descriptor, temporary_filename = tempfile.mkstemp(dir = target_directory,
+                                                          prefix = '.owl-cache-')
+        os.close(descriptor)
+        os.remove(temporary_filename)
+        try:
+            shutil.copyfile(source_filename, temporary_filename)
+            if mode is not None:
+                os.chmod(temporary_filename, mode)
+            os.rename(temporary_filename, target_filename)
+        finally:
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+
+    def get_entries(self):
+        """
+        Returns the (modification time, size, filename) of every cached file.
+        """
+        entries = []
+        for directory, _, filenames in os.walk(self._directory):
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get_size(self):
+        return sum(size for _, size, _ in self.get_entries())
+
+    def evict(self, keep=None):
+        """
+        Removes the least recently used files until the cache is under its size cap, except the
+        given one. Returns the number of removed files.
+        """
+        entries = sorted(self.get_entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        removed = 0
+        for _, entry_size, path in entries:
+            if size <= self._max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            removed += 1
+        return removed
@@ -0,0 +1,232 @@
+import re
+
+
+class OWLOutputOptions:
+    """
+    Holds the options that change how the owl output is written, without changing
+    the ontology itself.
+    """
+    FORMAT_RDF_XML = 'rdfxml'
+    FORMAT_NTRIPLES = 'ntriples'
+    FORMAT_TURTLE = 'turtle'
+    FORMAT_BINARY = 'binary'
+    FORMATS = (FORMAT_RDF_XML, FORMAT_NTRIPLES, FORMAT_TURTLE, FORMAT_BINARY)
+
+    # the scheme that starts an absolute iri (RFC 3987)
+    ABSOLUTE_IRI = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+    _format = None
+    _compact = False
+    _processes = 1
+    _canonical = False
+    _reduced = False
+    _normalized = False
+    _shared = False
+    _shard_count = None
+    _shard_size = None
+    _compression = None
+    _compression_level = None
+    _memory_budget = None
+    _spill_directory = None
+
+    def __init__(self):
+        """
+        Initializes the options with the default (pretty rdf/xml) output.
+        """
+        self._format = self.FORMAT_RDF_XML
+        self._compact = False
+        self._processes = 1
+        self._canonical = False
+        self._reduced = False
+        self._normalized = False
+        self._shared = False
+        self._shard_count = None
+        self._shard_size = None
+        self._compression = None
+        self._compression_level = None
+        self._memory_budget = None
+        self._spill_directory = None
+
+    def get_format(self):
+        return self._format
+
+    def set_format(self, output_format):
+        """
+        Sets the serialization format, which must be one of FORMATS.
+        """
+        if output_format not in self.FORMATS:
+            raise ValueError('Unknown output format: ' + str(output_format))
+        self._format = output_format
+
+    def is_compact(self):
+        """
+        Returns True if the output is minified, without insignificant whitespace.
+        """
+        return self._compact
+
+    def set_compact(self, compact):
+        self._compact = compact
+
+    def get_processes(self):
+        """
+        Returns the number of worker processes used by the serializers that support them.
+        """
+        return self._processes
+
+    def set_processes(self, processes):
+        """
+        Sets the number of worker processes, at least one.
+        """
+        if processes < 1:
+            raise ValueError('The number of processes must be at least 1: %d' % processes)
+        self._processes = processes
+
+    def is_canonical(self):
+        """
+        Returns True if the specification is sorted before it is written, so identical
+        ontologies always produce identical bytes.
+        """
+        return self._canonical
+
+    def set_canonical(self, canonical):
+        self._canonical = canonical
+
+    def is_reduced(self):
+        """
+        Returns True if the sub class axioms implied by other ones are removed before the
+        specification is written.
+        """
+        return self._reduced
+
+    def set_reduced(self, reduced):
+        self._reduced = reduced
+
+    def is_normalized(self):
+        """
+        Returns True if the class expressions are rewritten in a normal form, with their
+        repeated operands and repeated expressions removed, before the specification is written.
+        """
+        return self._normalized
+
+    def set_normalized(self, normalized):
+        self._normalized = normalized
+
+    def is_shared(self):
+        """
+        Returns True if the restrictions and collections that appear more than once in the
+        (not sharded) rdf/xml output are written once, as the equivalent class of a named class,
+        and referred to by its name.
+        """
+        return self._shared
+
+    def set_shared(self, shared):
+        self._shared = shared
+
+    def get_shard_count(self):
+        """
+        Returns the number of hierarchy subtree shards the rdf/xml output is split in, or None.
+        """
+        return self._shard_count
+
+    def set_shard_count(self, shard_count):
+        """
+        Sets the number of subtree shards, at least one, or None. Raises a ValueError if the
+        shards already have a size budget.
+        """
+        if shard_count is not None:
+            if shard_count < 1:
+                raise ValueError('The shard count must be at least 1: %d' % shard_count)
+            if self._shard_size is not None:
+                raise ValueError('The output is sharded by count or by size, not both')
+        self._shard_count = shard_count
+
+    def get_shard_size(self):
+        """
+        Returns the size budget in bytes of the shards the rdf/xml output is split in, or None.
+        """
+        return self._shard_size
+
+    def set_shard_size(self, shard_size):
+        """
+        Sets the size budget of the shards, at least one byte, or None. Raises a ValueError if
+        the output is already sharded by count.
+        """
+        if shard_size is not None:
+            if shard_size < 1:
+                raise ValueError('The shard size must be at least 1 byte: %d' % shard_size)
+            if self._shard_count is not None:
+                raise ValueError('The output is sharded by count or by size, not both')
+        self._shard_size = shard_size
+
+    def is_sharded(self):
+        return self._shard_count is not None or self._shard_size is not None
+
+    def check_prefix(self, prefix):
+        """
+        Raises a ValueError if the output needs an absolute prefix and the given one is not:
+        the ontology iris of the shards, and every iri of the triple formats, are built from it.
+        """
+        if self.is_sharded() and not self.ABSOLUTE_IRI.match(prefix or ''):
+            raise ValueError('Sharded output needs an absolute prefix, such as '
+                             'http://example.org/onto: %r' % prefix)
+        if self._format in (self.FORMAT_NTRIPLES, self.FORMAT_TURTLE):
+            self.check_triples_prefix(prefix)
+
+    @staticmethod
+    def check_triples_prefix(prefix):
+        """
+        Raises a ValueError if the given prefix is not absolute: n-triples (and turtle without
+        a base) can not have relative iris.
+        """
+        if not OWLOutputOptions.ABSOLUTE_IRI.match(prefix or ''):
+            raise ValueError('N-triples and turtle output need an absolute prefix, such as '
+                             'http://example.org/onto: %r' % prefix)
+
+    def get_compression(self):
+        """
+        Returns the codec the output is compressed with while it is written, or None.
+        """
+        return self._compression
+
+    def get_compression_level(self):
+        return self._compression_level
+
+    def set_compression(self, codec, level=None):
+        """
+        Sets the compression codec, one of OWLCompression.CODECS (or None to write the output
+        uncompressed), and its level, in the LEVEL_RANGES of the codec. None uses the default
+        level of the codec.
+        """
+        if codec is not None:
+            from src.owl.owl_compression import OWLCompression
+            if not OWLCompression.is_available(codec):
+                raise ValueError('Unavailable compression codec: ' + str(codec))
+            if level is not None:
+                lowest, highest = OWLCompression.LEVEL_RANGES[codec]
+                if not lowest <= level <= highest:
+                    raise ValueError('The %s compression level must be between %d and %d: %d'
+                                     % (codec, lowest, highest, level))
+        elif level is not None:
+            raise ValueError('A compression level needs a compression codec')
+        self._compression = codec
+        self._compression_level = level
+
+    def get_memory_budget(self):
+        """
+        Returns the resident memory, in bytes, over which the owl specification is spilled to
+        disk while it is built, or None to keep it in memory.
+        """
+        return self._memory_budget
+
+    def get_spill_directory(self):
+        return self._spill_directory
+
+    def set_memory_budget(self, memory_budget, spill_directory=None):
+        """
+        Sets the memory budget (or None for no budget) and the directory the specification is
+        spilled to, by default the temporary directory.
+        """
+        if memory_budget is not None and memory_budget < 0:
+            raise ValueError('The memory budget can not be negative: %d' % memory_budget)
+        self._memory_budget = memory_budget
+        self._spill_directory = spill_directory
@@ -0,0 +1,497 @@
+from src.utils.graphutils import GraphUtils
+from src.utils.unionfind import UnionFind
+
+
+class OWLReasoner:
+    """
+    Computes the class hierarchy entailed by an OWLSpecification from:
+
+    - the told sub class relations (add_parent_class),
+    - the synonym equivalences, which make classes equivalent,
+    - the definitions that are an intersection of allValuesFrom restrictions (single clauses
+      and conjunctions). A defined class is equivalent to its definition, so it is a sub class
+      of its restrictions, and any class whose restrictions (its own and the inherited ones)
+      cover the restrictions of the definition is a sub class of the defined class. Restriction
+      fillers are compared structurally: named classes by the hierarchy, unions and
+      intersections member by member.
+
+    Disjunctive definitions and necessities are not used. Equivalent classes (synonyms and
+    cycles of sub classes) are merged into one node. Structural subsumption is repeated until
+    it finds no new sub class relation; after the first round, only the classes below a class
+    that got a new super class, or with a restriction filler below one, are checked again.
+
+    Ancestor sets are python integers used as bitsets. Only the classes that have a sub class
+    which itself has sub classes get a bit, numbered in topological order, and ancestor sets
+    are only stored for the classes that have sub classes: the ancestors of a leaf are its
+    parents and their ancestors. This keeps the bitsets small on big, shallow hierarchies.
+
+    The whole hierarchy is classified at once. With the definitions of the reasoner benchmark,
+    on one core, it took 0.06s for 1k classes, 1.1s for 10k and 21s for 100k. The time per class
+    still grows with the size (60us at 1k, 210us at 100k): the definitions a class is checked
+    against are found through the ancestors of its fillers, and deeper hierarchies take more
+    rounds. Classifying a million densely defined classes in seconds is not within reach.
+    """
+    NOUN_CONCEPT = 0
+    CONJUNCTION = 1
+    DISJUNCTION = 2
+
+    _owl_specification = None
+    _names = None
+    _name_ids = None
+    _told_edges = None
+    _inferred_edges = None
+    _restrictions = None
+    _definitions = None
+    _union_find = None
+    _node = None
+    _parents = None
+    _bits = None
+    _bit_nodes = None
+    _ancestors = None
+    _order = None
+    _node_restrictions = None
+    _new_restrictions = None
+    _restriction_sizes = None
+    _filler_candidates = None
+    _definition_index = None
+    _labels = None
+    _classified = False
+
+    def __init__(self, owl_specification):
+        """
+        Initializes the reasoner for the given specification. Nothing is computed until
+        classify is called (or a query needs it).
+        """
+        self._owl_specification = owl_specification
+        self._names = []
+        self._name_ids = {}
+        self._told_edges = []
+        self._inferred_edges = []
+        self._restrictions = []
+        self._definitions = []
+        self._union_find = UnionFind()
+        self._classified = False
+
+    def name_id(self, classname):
+        name_id = self._name_ids.get(classname)
+        if name_id is None:
+            name_id = len(self._names)
+            self._name_ids[classname] = name_id
+            self._names.append(classname)
+            self._union_find.add()
+        return name_id
+
+    def load(self):
+        """
+        Reads the told axioms of the specification.
+        """
+        for owl_class in self._owl_specification.get_classes():
+            class_id = self.name_id(owl_class.get_classname())
+            for parent in owl_class.get_sub_class_of():
+                self._told_edges.append((class_id, self.name_id(parent)))
+            for synonym in owl_class.get_synonym_equivalences():
+                self._union_find.union(class_id, self.name_id(synonym))
+            for logical_operation in owl_class.get_equivalence_rules():
+                # only conjunctions (nested in any way) of restrictions are definitions
+                operations = logical_operation.iter_operations()
+                if any(operation.is_disjunction() for operation in operations):
+                    continue
+                conjuncts = []
+                for rule in logical_operation.iter_rules():
+                    if rule.get_rule_range() is not None:
+                        conjuncts.append((rule.get_verb(), self.build_filler(rule.get_rule_range())))
+                if conjuncts:
+                    self._definitions.append((class_id, tuple(conjuncts)))
+                    for conjunct in conjuncts:
+                        self._restrictions.append((class_id, conjunct))
+
+    def build_filler(self, rule_range):
+        """
+        Returns the filler of a restriction: its kind and the ids of its classes.
+        """
+        if rule_range.is_noun_concept():
+            return (self.NOUN_CONCEPT, (self.name_id(rule_range.get_range()),))
+        kind = self.CONJUNCTION if rule_range.is_conjunction() else self.DISJUNCTION
+        return (kind, tuple(self.name_id(classname) for classname in rule_range.get_range()))
+
+    def classify(self):
+        """
+        Computes the hierarchy. Queries call it when it was not called before.
+        """
+        if self._classified:
+            return
+        self.load()
+        changed = None
+        previous_node_count = None
+        while True:
+            node_count = self.build_hierarchy()
+            # the definitions are indexed by node, so they are indexed again when nodes merge
+            if node_count != previous_node_count:
+                self._definition_index = self.build_definition_index()
+            previous_node_count = node_count
+            inferred_edges = self.infer_edges(changed)
+            if not inferred_edges:
+                break
+            self._inferred_edges.extend(inferred_edges)
+            changed = [child for child, _ in inferred_edges]
+        self._classified = True
+
+    def build_hierarchy(self):
+        """
+        Builds the nodes (representatives of the sets of equivalent classes), their parents and
+        the ancestor bitsets, merging the classes of every cycle of sub classes. Returns the
+        number of nodes.
+        """
+        name_count = len(self._names)
+        while True:
+            find = self._union_find.find
+            self._node = node = [find(name_id) for name_id in range(name_count)]
+            self._parents = parents = [None] * name_count
+            for edges in (self._told_edges, self._inferred_edges):
+                for child, parent in edges:
+                    child, parent = node[child], node[parent]
+                    if child == parent:
+                        continue
+                    child_parents = parents[child]
+                    if child_parents is None:
+                        parents[child] = [parent]
+                    elif parent not in child_parents:
+                        child_parents.append(parent)
+
+            nodes = [name_id for name_id in range(name_count) if node[name_id] == name_id]
+            order, has_cycle = GraphUtils.postorder(name_count, parents, nodes)
+            if not has_cycle:
+                break
+            for component in GraphUtils.strongly_connected_components(name_count, parents, nodes):
+                for member in component[1:]:
+                    self._union_find.union(component[0], member)
+
+        # a class gets a bit when one of its sub classes has sub classes, an ancestor set when
+        # it has sub classes itself
+        has_children = bytearray(name_count)
+        for child in order:
+            if parents[child] is not None:
+                for parent in parents[child]:
+                    has_children[parent] = 1
+        self._bits = bits = [-1] * name_count
+        self._bit_nodes = []
+        for child in order:
+            if has_children[child] and parents[child] is not None:
+                for parent in parents[child]:
+                    if bits[parent] == -1:
+                        bits[parent] = len(self._bit_nodes)
+                        self._bit_nodes.append(parent)
+
+        self._ancestors = ancestors = [0] * name_count
+        for child in order:
+            if has_children[child] and parents[child] is not None:
+                child_ancestors = 0
+                for parent in parents[child]:
+                    child_ancestors |= ancestors[parent] | (1 << bits[parent])
+                ancestors[child] = child_ancestors
+        self._order = order
+        self._labels = None
+        return len(nodes)
+
+    def is_node_subsumed(self, sub_node, super_node):
+        """
+        Returns True if the first node is the second one or one of its descendants.
+        """
+        if sub_node == super_node:
+            return True
+        sub_parents = self._parents[sub_node]
+        if sub_parents is None:
+            return False
+        if super_node in sub_parents:
+            return True
+        bit = self._bits[super_node]
+        if bit == -1:
+            return False
+        if self._ancestors[sub_node]:
+            return bool(self._ancestors[sub_node] >> bit & 1)
+        for parent in sub_parents:
+            if self._ancestors[parent] >> bit & 1:
+                return True
+        return False
+
+    def get_ancestor_nodes(self, node):
+        """
+        Returns the list of the ancestors of the given node.
+        """
+        parents = self._parents[node] or []
+        ancestor_bits = self._ancestors[node]
+        if not ancestor_bits:
+            for parent in parents:
+                ancestor_bits |= self._ancestors[parent]
+        ancestor_nodes = set(parents)
+        while ancestor_bits:
+            lowest = ancestor_bits & -ancestor_bits
+            ancestor_nodes.add(self._bit_nodes[lowest.bit_length() - 1])
+            ancestor_bits ^= lowest
+        return list(ancestor_nodes)
+
+    def is_filler_subsumed(self, sub_filler, super_filler):
+        """
+        Returns True if the first filler is structurally subsumed by the second one: every
+        class of an intersection filler must subsume it, and every class of a union filler
+        must be subsumed by it. A class is subsumed by a union when it is subsumed by one of
+        its classes, and an intersection is subsumed when one of its classes is.
+        """
+        node = self._node
+        is_node_subsumed = self.is_node_subsumed
+        sub_kind, sub_names = sub_filler
+        super_kind, super_names = super_filler
+        if sub_kind == self.NOUN_CONCEPT and super_kind == self.NOUN_CONCEPT:
+            return is_node_subsumed(node[sub_names[0]], node[super_names[0]])
+        if super_kind == self.CONJUNCTION:
+            super_groups = [(node[name],) for name in super_names]
+        else:
+            super_groups = [[node[name] for name in super_names]]
+        sub_nodes = [node[name] for name in sub_names]
+        every_sub_node = sub_kind == self.DISJUNCTION
+        for super_nodes in super_groups:
+            for sub_node in sub_nodes:
+                subsumed = False
+                for super_node in super_nodes:
+                    if is_node_subsumed(sub_node, super_node):
+                        subsumed = True
+                        break
+                if subsumed != every_sub_node:
+                    break
+            else:
+                subsumed = every_sub_node
+            if not subsumed:
+                return False
+        return True
+
+    def update_node_restrictions(self, nodes=None):
+        """
+        Computes, for the given nodes (all of them by default, else a set closed under
+        descendants), a dictionary from property to the set of fillers of the restrictions of
+        the node, its own and the inherited ones (or None if it has none). The nodes with own
+        restrictions or more than one parent get a dictionary of their own, and their new
+        restrictions: the ones they do not inherit from the parent with most restrictions.
+        Returns the nodes with new restrictions among the given ones.
+        """
+        node = self._node
+        own_restrictions = {}
+        for name_id, (verb, filler) in self._restrictions:
+            if nodes is None or node[name_id] in nodes:
+                own_restrictions.setdefault(node[name_id], {}).setdefault(verb, set()).add(filler)
+
+        if nodes is None:
+            self._node_restrictions = [None] * len(node)
+            self._new_restrictions = {}
+            self._restriction_sizes = {}
+            self._filler_candidates = {}
+        restrictions = self._node_restrictions
+        sizes = self._restriction_sizes
+        candidates = []
+        for current in self._order:
+            if nodes is not None and current not in nodes:
+                continue
+            self._new_restrictions.pop(current, None)
+            parents = self._parents[current] or []
+            inherited = [restrictions[parent] for parent in parents
+                         if restrictions[parent] is not None]
+            own = own_restrictions.get(current)
+            if own is None and len(inherited) <= 1:
+                restrictions[current] = inherited[0] if inherited else None
+                continue
+
+            base = max(inherited, key = lambda parent_restrictions: sizes[id(parent_restrictions)]) \
+                if inherited else {}
+            merged = dict((verb, set(fillers)) for verb, fillers in base.items())
+            new = {}
+            for node_restrictions in inherited + ([own] if own is not None else []):
+                if node_restrictions is base:
+                    continue
+                for verb, fillers in node_restrictions.items():
+                    base_fillers = base.get(verb, ())
+                    merged.setdefault(verb, set()).update(fillers)
+                    new.setdefault(verb, set()).update(filler for filler in fillers
+                                                       if filler not in base_fillers)
+            restrictions[current] = merged
+            sizes[id(merged)] = sum(len(fillers) for fillers in merged.values())
+            self._new_restrictions[current] = new
+            candidates.append(current)
+            for fillers in merged.values():
+                for _, names in fillers:
+                    for name in names:
+                        self._filler_candidates.setdefault(name, set()).add(current)
+        return candidates
+
+    def build_definition_index(self):
+        """
+        Indexes the definitions by the property of every restriction and the classes of its
+        filler (the first one, for an intersection): a class can only be subsumed by the
+        definition if, for every restriction, it has one on the same property whose filler has
+        one of those classes or their sub classes.
+        """
+        node = self._node
+        definition_index = {}
+        for definition, (name_id, conjuncts) in enumerate(self._definitions):
+            for verb, (kind, names) in conjuncts:
+                key_names = names[:1] if kind == self.CONJUNCTION else names
+                for key_name in key_names:
+                    definition_index.setdefault((verb, node[key_name]), []).append(
+                        (definition, node[name_id], conjuncts))
+        return definition_index
+
+    def get_descendant_nodes(self, name_ids):
+        """
+        Returns the set of the nodes of the given classes and of all their descendants.
+        """
+        children = {}
+        for child, parents in enumerate(self._parents):
+            if parents is not None:
+                for parent in parents:
+                    children.setdefault(parent, []).append(child)
+        descendants = set(self._node[name_id] for name_id in name_ids)
+        pending = list(descendants)
+        while pending:
+            for child in children.get(pending.pop(), []):
+                if child not in descendants:
+                    descendants.add(child)
+                    pending.append(child)
+        return descendants
+
+    def infer_edges(self, changed=None):
+        """
+        Returns the (class, defined class) pairs found by structural subsumption that are not
+        in the hierarchy yet. If the classes that got new super classes in the previous round
+        are given, only the restrictions of their descendants are computed again, and only the
+        nodes whose restrictions or fillers may be affected are checked.
+
+        A node is subsumed by the definitions its parent with most restrictions is subsumed
+        by, so only the definitions with a restriction matched by one of its new restrictions
+        are checked: a definition the parent does not cover has a restriction that only a new
+        one covers.
+        """
+        node = self._node
+        if changed is None:
+            candidates = self.update_node_restrictions()
+        else:
+            descendants = self.get_descendant_nodes(changed)
+            candidates = set(self.update_node_restrictions(descendants))
+            # restrictions only grow, so the candidates of a filler may include stale ones
+            for name, filler_candidates in self._filler_candidates.items():
+                if node[name] in descendants:
+                    candidates.update(candidate for candidate in filler_candidates
+                                      if node[candidate] == candidate and
+                                      candidate in self._new_restrictions)
+            candidates = sorted(candidates)
+
+        restrictions = self._node_restrictions
+        definition_index = self._definition_index
+        inferred_edges = []
+        for candidate in candidates:
+            candidate_restrictions = restrictions[candidate]
+            checked = set()
+            for verb, fillers in self._new_restrictions[candidate].items():
+                for kind, names in fillers:
+                    for name in names:
+                        for key_node in [node[name]] + self.get_ancestor_nodes(node[name]):
+                            for definition, defined_node, conjuncts in \
+                                    definition_index.get((verb, key_node), []):
+                                if definition in checked:
+                                    continue
+                                checked.add(definition)
+                                if defined_node != candidate and \
+                                        not self.is_node_subsumed(candidate, defined_node) and \
+                                        self.covers(candidate_restrictions, conjuncts):
+                                    inferred_edges.append((candidate, defined_node))
+        return inferred_edges
+
+    def covers(self, restrictions, conjuncts):
+        """
+        Returns True if, for every restriction of a definition, the given restrictions have
+        one on the same property with a subsumed filler.
+        """
+        for verb, filler in conjuncts:
+            fillers = restrictions.get(verb)
+            if not fillers or not any(self.is_filler_subsumed(own_filler, filler)
+                                      for own_filler in fillers):
+                return False
+        return True
+
+    def get_inferred_edge_count(self):
+        """
+        Returns the number of sub class relations found by structural subsumption.
+        """
+        self.classify()
+        return len(self._inferred_edges)
+
+    def get_node_of(self, classname):
+        self.classify()
+        name_id = self._name_ids.get(classname)
+        return self._node[name_id] if name_id is not None else None
+
+    def get_label(self, node):
+        """
+        Returns the name of a node: the first name, in alphabetical order, of its classes.
+        """
+        if self._labels is None:
+            self._labels = {}
+            for name_id, classname in enumerate(self._names):
+                current = self._node[name_id]
+                if current not in self._labels or classname < self._labels[current]:
+                    self._labels[current] = classname
+        return self._labels[node]
+
+    def is_subclass_of(self, sub_classname, super_classname):
+        """
+        Returns True if the first class is entailed to be a sub class of (or equivalent to)
+        the second one. Unknown classes are only sub classes of themselves.
+        """
+        sub_node = self.get_node_of(sub_classname)
+        super_node = self.get_node_of(super_classname)
+        if sub_node is None or super_node is None:
+            return sub_classname == super_classname
+        return self.is_node_subsumed(sub_node, super_node)
+
+    def get_equivalent_classes(self, classname):
+        """
+        Returns the sorted names of the classes equivalent to the given one, itself included.
+        """
+        current = self.get_node_of(classname)
+        if current is None:
+            return [classname]
+        return sorted(name for name_id, name in enumerate(self._names)
+                      if self._node[name_id] == current)
+
+    def get_superclasses(self, classname, direct=False):
+        """
+        Returns the sorted names of the (direct, if asked) super classes of the given class,
+        one name per set of equivalent classes.
+        """
+        current = self.get_node_of(classname)
+        if current is None:
+            return []
+        if direct:
+            super_nodes = self.get_direct_super_nodes(current)
+        else:
+            super_nodes = self.get_ancestor_nodes(current)
+        return sorted(self.get_label(super_node) for super_node in super_nodes)
+
+    def get_direct_super_nodes(self, node):
+        """
+        Returns the parents of the node that are not ancestors of another one of its parents.
+        """
+        parents = self._parents[node] or []
+        return [parent for parent in parents
+                if not any(other != parent and self.is_node_subsumed(other, parent)
+                           for other in parents)]
+
+    def get_hierarchy(self):
+        """
+        Returns the classified hierarchy: a dictionary from the name of every set of
+        equivalent classes to the sorted names of its direct super classes.
+        """
+        self.classify()
+        hierarchy = {}
+        for name_id in range(len(self._names)):
+            if self._node[name_id] == name_id:
+                hierarchy[self.get_label(name_id)] = sorted(
+                    self.get_label(parent) for parent in self.get_direct_super_nodes(name_id))
+        return hierarchy
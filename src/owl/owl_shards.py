@@ -0,0 +1,231 @@
+import heapq
+import os
+from src.owl.owl_specification import OWLSpecification
+from src.owl.owl_writer import OWLWriter
+from src.utils.parallelutils import ParallelUtils
+
+
+class OWLShardWriter:
+    """
+    Writes an OWLSpecification as several rdf/xml files (shards) plus a small root ontology that
+    imports all of them, so consumers can load the shards in parallel or only the ones they need.
+
+    The object and data properties go to a properties shard, which every class shard imports.
+    The classes are split either by hierarchy subtree, keeping every class with the root of its
+    sub class hierarchy, or by size, starting a new shard when the current one reaches a byte
+    budget. Shards are named after the root file (ontology.owl gives ontology-properties.owl,
+    ontology-1.owl, ontology-2.owl...) and their ontology iris are the prefix of the
+    specification followed by the name of the file.
+    """
+    _owl_specification = None
+    _compact = False
+
+    def __init__(self, owl_specification, compact=False):
+        """
+        Initializes the writer for the given specification.
+        """
+        self._owl_specification = owl_specification
+        self._compact = compact
+
+    def shard_filename(self, root_filename, name):
+        base, extension = os.path.splitext(root_filename)
+        return '%s-%s%s' % (base, name, extension or '.owl')
+
+    def shard_iri(self, filename):
+        """
+        Returns the ontology iri of the shard written to the given file.
+        """
+        return self._owl_specification.get_prefix() + '/' + os.path.basename(filename)
+
+    def build_shard_specification(self, owl_classes=None, owl_properties=None):
+        """
+        Returns a specification with the prefix of the ontology and the given entities.
+        """
+        shard_specification = OWLSpecification(self._owl_specification.get_prefix())
+        for owl_property in owl_properties or []:
+            shard_specification.add_object_property(owl_property)
+        for owl_class in owl_classes or []:
+            shard_specification.add_class_specification(owl_class)
+        return shard_specification
+
+    def write_shard(self, filename, shard_specification, imports=None, processes=1):
+        with open(filename, 'w') as output_file:
+            OWLWriter(output_file, compact = self._compact).write_document(
+                self.shard_iri(filename),
+                shard_specification.iter_owl_fragments(self._compact, processes),
+                imports)
+
+    def write_root(self, root_filename, shard_filenames, root_file=None):
+        """
+        Writes the root ontology, which only imports the shards, to the given file object or,
+        if there is none, to root_filename.
+        """
+        if root_file is None:
+            with open(root_filename, 'w') as output_file:
+                self.write_root(root_filename, shard_filenames, output_file)
+            return
+        OWLWriter(root_file, compact = self._compact).write_document(
+            self._owl_specification.get_prefix(), [],
+            [self.shard_iri(filename) for filename in shard_filenames])
+
+    def write_properties_shard(self, root_filename):
+        filename = self.shard_filename(root_filename, 'properties')
+        self.write_shard(filename, self.build_shard_specification(
+            owl_properties = self._owl_specification.get_object_properties()))
+        return filename
+
+    def get_subtree_root(self, classname, parents, roots):
+        """
+        Returns the root of the hierarchy of the given class, following the first parent of
+        every class. Roots are cached in the given dictionary; a cycle ends at the first class
+        found twice.
+        """
+        path = []
+        visited = set()
+        current = classname
+        while current not in roots and current in parents and current not in visited:
+            visited.add(current)
+            path.append(current)
+            current = parents[current]
+        root = roots.get(current, current)
+        for name in path:
+            roots[name] = root
+        return root
+
+    def partition_by_subtree(self, shard_count):
+        """
+        Splits the classes in at most shard_count groups, so that all the classes of a subtree
+        end up in the same group. When there are fewer hierarchies than groups, the biggest
+        subtrees are split below their root, into the root and the subtree of every child,
+        until there are enough of them (or only single classes are left). Subtrees are
+        assigned, biggest first, to the smallest group. Every group keeps the order of the
+        specification.
+        """
+        owl_classes = self._owl_specification.get_classes()
+        parents = {}
+        for owl_class in owl_classes:
+            if owl_class.get_sub_class_of():
+                parents.setdefault(owl_class.get_classname(), owl_class.get_sub_class_of()[0])
+
+        roots = {}
+        subtrees = {}
+        for index, owl_class in enumerate(owl_classes):
+            root = self.get_subtree_root(owl_class.get_classname(), parents, roots)
+            subtrees.setdefault(root, []).append(index)
+        if len(subtrees) < shard_count:
+            subtrees = self.split_subtrees(subtrees, shard_count, parents)
+
+        groups = [(0, shard, []) for shard in range(shard_count)]
+        for root, indexes in sorted(subtrees.items(),
+                                    key = lambda subtree: (-len(subtree[1]), subtree[0])):
+            size, shard, group = heapq.heappop(groups)
+            group.extend(indexes)
+            heapq.heappush(groups, (size + len(indexes), shard, group))
+
+        return [[owl_classes[index] for index in sorted(group)]
+                for _, _, group in sorted(groups, key = lambda group: group[1]) if group]
+
+    def split_subtrees(self, subtrees, shard_count, parents):
+        """
+        Splits the biggest of the given subtrees (a dictionary from their root to the indexes of
+        their classes) below their root until there are shard_count of them, and returns them.
+        """
+        owl_classes = self._owl_specification.get_classes()
+        children = {}
+        for owl_class in owl_classes:
+            classname = owl_class.get_classname()
+            if classname in parents:
+                children.setdefault(parents[classname], []).append(classname)
+
+        subtrees = dict(subtrees)
+        while len(subtrees) < shard_count:
+            splittable = [(len(indexes), root) for root, indexes in subtrees.items()
+                          if children.get(root) and len(indexes) > 1]
+            if not splittable:
+                break
+            _, root = max(splittable)
+            indexes = subtrees.pop(root)
+            members = set(indexes)
+            subtree_of = {}
+            for child in children[root]:
+                # the first parents of a cycle lead back to its root, which keeps them
+                if child != root and child not in subtree_of:
+                    pending = [child]
+                    subtree_of[child] = child
+                    while pending:
+                        for grandchild in children.get(pending.pop(), []):
+                            if grandchild != root and grandchild not in subtree_of:
+                                subtree_of[grandchild] = child
+                                pending.append(grandchild)
+            for index in indexes:
+                subtree_root = subtree_of.get(owl_classes[index].get_classname(), root)
+                subtrees.setdefault(subtree_root, []).append(index)
+            if set(subtrees.get(root, [])) == members:
+                # no class of the subtree is below its root: it can not be split
+                subtrees[root] = indexes
+                children[root] = []
+        return subtrees
+
+    def write_by_subtree(self, root_filename, shard_count, processes=1, root_file=None):
+        """
+        Writes the shards of at most shard_count hierarchy subtrees, by the given number of
+        processes, and the root ontology, to root_file if it is given. Returns the filenames of
+        the shards.
+        """
+        properties_filename = self.write_properties_shard(root_filename)
+        groups = self.partition_by_subtree(shard_count)
+        filenames = [self.shard_filename(root_filename, str(index + 1)) for index in range(len(groups))]
+        imports = [self.shard_iri(properties_filename)]
+
+        # only the indexes of the shards are sent to the workers, which inherit the groups
+        for _ in ParallelUtils.ordered_map(
+                lambda index: self.write_shard(
+                    filenames[index], self.build_shard_specification(groups[index]), imports),
+                range(len(groups)), min(processes or 1, len(groups))):
+            pass
+
+        shard_filenames = [properties_filename] + filenames
+        self.write_root(root_filename, shard_filenames, root_file)
+        return shard_filenames
+
+    def write_by_size(self, root_filename, size_budget, processes=1, root_file=None):
+        """
+        Writes the classes in order, starting a new shard when the fragments of the current one
+        would grow beyond size_budget bytes, and the root ontology. Fragments are rendered by
+        the given number of processes, in batches, but every class is checked against the
+        budget on its own, so shards are only cut between classes. A class bigger than the
+        budget gets a shard of its own. Returns the filenames of the shards.
+        """
+        properties_filename = self.write_properties_shard(root_filename)
+        imports = [self.shard_iri(properties_filename)]
+        shard_filenames = [properties_filename]
+
+        output_file = None
+        owl_writer = None
+        shard_size = 0
+        try:
+            classes_specification = self.build_shard_specification(
+                self._owl_specification.get_classes())
+            for fragment in classes_specification.iter_owl_fragments(self._compact, processes,
+                                                                     joined = False):
+                if owl_writer is not None and shard_size + len(fragment) > size_budget:
+                    owl_writer.write_footer()
+                    output_file.close()
+                    owl_writer = None
+                if owl_writer is None:
+                    filename = self.shard_filename(root_filename, str(len(shard_filenames)))
+                    shard_filenames.append(filename)
+                    output_file = open(filename, 'w')
+                    owl_writer = OWLWriter(output_file, compact = self._compact)
+                    owl_writer.write_header(self.shard_iri(filename), imports)
+                    shard_size = 0
+                owl_writer.write_fragments([fragment])
+                shard_size += len(fragment)
+            if owl_writer is not None:
+                owl_writer.write_footer()
+        finally:
+            if output_file is not None:
+                output_file.close()
+
+        self.write_root(root_filename, shard_filenames, root_file)
+        return shard_filenames
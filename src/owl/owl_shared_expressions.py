@@ -0,0 +1,145 @@
+class OWLSharedExpressions:
+    """
+    Finds the class expressions that appear more than once in an OWLSpecification, so they can
+    be written once, as the equivalent class of a named class, and referred to by its name
+    everywhere else. A blank node referred to by several triples is not owl 2 dl.
+
+    Three kinds of expressions are shared: the restrictions of the necessities, the
+    allValuesFrom restrictions of the definitions, and the unionOf / intersectionOf collections
+    those restrictions take their values from. Expressions are identified by a structural key,
+    so identical expressions of different classes share the same class. A collection is only
+    counted once inside a shared restriction, since the restriction is only written once.
+    """
+    RESTRICTION = 'restriction'
+    ALL_VALUES_FROM = 'all-values-from'
+    COLLECTION = 'collection'
+
+    CLASSNAME = 'SharedExpression%d'
+
+    _counts = None
+    _classnames = None
+    _rule_classnames = None
+    _expressions = None
+    _reserved_names = None
+
+    def __init__(self):
+        """
+        Initializes an empty table.
+        """
+        self._counts = {}
+        self._classnames = {}
+        self._rule_classnames = {}
+        self._expressions = []
+        self._reserved_names = set()
+
+    @staticmethod
+    def from_owl_specification(owl_specification):
+        """
+        Builds the table of the expressions of the classes of the given specification that
+        appear more than once. Keys are computed once per expression. The names of the classes
+        and properties of the specification are never given to a shared expression.
+        """
+        shared_expressions = OWLSharedExpressions()
+        reserved_names = shared_expressions._reserved_names
+        reserved_names.update(owl_class.get_classname()
+                              for owl_class in owl_specification.get_classes())
+        reserved_names.update(owl_property.get_name()
+                              for owl_property in owl_specification.get_object_properties())
+        counts = shared_expressions._counts
+        get_key = shared_expressions.get_key
+        occurrences = []
+        for owl_class in owl_specification.get_classes():
+            for kind, logical_operations in (
+                    (OWLSharedExpressions.RESTRICTION, owl_class.get_sub_class_of_expressions()),
+                    (OWLSharedExpressions.ALL_VALUES_FROM, owl_class.get_equivalence_rules())):
+                for logical_operation in logical_operations:
+                    for rule in logical_operation.iter_rules():
+                        key = get_key(kind, rule)
+                        if key is None:
+                            continue
+                        counts[key] = counts.get(key, 0) + 1
+                        occurrences.append((owl_class, kind, rule, key))
+
+        collections = []
+        counted_restrictions = set()
+        for owl_class, kind, rule, key in occurrences:
+            if kind != OWLSharedExpressions.ALL_VALUES_FROM or rule.get_rule_range().is_noun_concept():
+                continue
+            collection_key = (OWLSharedExpressions.COLLECTION, key[2])
+            collections.append((owl_class, OWLSharedExpressions.COLLECTION, rule, collection_key))
+            if counts[key] > 1:
+                if key in counted_restrictions:
+                    continue
+                counted_restrictions.add(key)
+            counts[collection_key] = counts.get(collection_key, 0) + 1
+
+        for occurrence in occurrences + collections:
+            shared_expressions.share(*occurrence)
+        return shared_expressions
+
+    def get_key(self, kind, rule):
+        """
+        Returns the structural key of the expression of the given kind built from the rule, or
+        None if it is never shared: cardinality ranges are two restrictions, not one.
+        """
+        rule_range = rule.get_rule_range()
+        range_key = rule_range.get_sort_key() if rule_range is not None else None
+        if kind == self.RESTRICTION:
+            quantification = rule.get_quantification()
+            if quantification is None:
+                return (kind, rule.get_verb(), None, None, range_key)
+            if quantification.get_kind() == quantification.RANGE:
+                return None
+            return (kind, rule.get_verb(), quantification.get_type(), quantification.get_value(),
+                    range_key)
+        if kind == self.ALL_VALUES_FROM:
+            return (kind, rule.get_verb(), range_key)
+        return (kind, range_key)
+
+    def is_repeated(self, key):
+        return self._counts.get(key, 0) > 1
+
+    def share(self, owl_class, kind, rule, key):
+        """
+        Gives the expression the class name of its key if it is repeated. The class of the
+        first occurrence of a key writes its definition.
+        """
+        if not self.is_repeated(key):
+            return
+        classname = self._classnames.get(key)
+        if classname is None:
+            classname = self.new_classname()
+            self._classnames[key] = classname
+            self._expressions.append((classname, owl_class, kind, rule))
+        self._rule_classnames[(kind, id(rule))] = classname
+
+    def new_classname(self):
+        """
+        Returns the next class name that is not a name of the specification.
+        """
+        index = len(self._expressions) + 1
+        while self.CLASSNAME % index in self._reserved_names:
+            index += 1
+        classname = self.CLASSNAME % index
+        self._reserved_names.add(classname)
+        return classname
+
+    def get_classname(self, kind, rule):
+        """
+        Returns the class name of the expression of the given kind built from the rule, or None
+        if it is not shared. Rules are looked up by identity, so this only works for the rules
+        of the specification the table was built from.
+        """
+        return self._rule_classnames.get((kind, id(rule)))
+
+    def __len__(self):
+        return len(self._expressions)
+
+    def iter_owl_fragments(self, owl_templates):
+        """
+        Yields the owl (xml) fragment of the class of every shared expression.
+        """
+        for classname, owl_class, kind, rule in self._expressions:
+            owl = []
+            owl_class.write_shared_expression(owl_templates, owl.append, classname, kind, rule)
+            yield ''.join(owl)
@@ -2,6 +2,12 @@ from src.sbvr.rule import *
 from src.sbvr.fact import *
 from owl_configuration import *
 from src.sbvr.logicaloperation import *
+from src.sbvr.logicaloperationnormalizer import LogicalOperationNormalizer
+from src.owl.owl_templates import OWLTemplates
+from src.owl.owl_shared_expressions import OWLSharedExpressions
+from src.utils.parallelutils import ParallelUtils
+from src.utils.spillinglist import SpillingList
+from src.utils.graphutils import GraphUtils
 
 
 class OWLSpecification:
@@ -13,6 +19,10 @@ class OWLSpecification:
     _classes = None
     _object_properties = None
     _prefix = None
+    _owl_templates = None
+    _instrumentation = None
+
+    DEFAULT_BATCH_SIZE = 500
 
     def __init__(self, prefix):
         """
@@ -21,6 +31,34 @@ class OWLSpecification:
         self._prefix = prefix
         self._classes = []
         self._object_properties = []
+        self._owl_templates = {}
+
+    def get_prefix(self):
+        return self._prefix
+
+    def set_memory_budget(self, memory_budget, spill_directory=None):
+        """
+        Keeps the classes and properties added from now on in lists that spill to disk once the
+        resident memory goes over the given budget, in bytes. The spilled specification can only
+        be added to and written in order: it cannot be sorted, reduced or normalized.
+        """
+        self._classes = SpillingList(memory_budget, spill_directory)
+        self._object_properties = SpillingList(memory_budget, spill_directory)
+
+    def close(self):
+        """
+        Deletes what was spilled to disk, if the specification has a memory budget.
+        """
+        for entities in (self._classes, self._object_properties):
+            if isinstance(entities, SpillingList):
+                entities.close()
+
+    def set_instrumentation(self, instrumentation):
+        """
+        Sets the instrumentation that counts the renders of the templates, or None.
+        """
+        self._instrumentation = instrumentation
+        self._owl_templates = {}
 
     def get_classes(self):
         return self._classes
@@ -40,6 +78,68 @@ class OWLSpecification:
         """
         self._object_properties.append(object_property)
 
+    def canonicalize(self):
+        """
+        Sorts the object and data properties by name, the classes by classname, and the contents
+        of every class, so equivalent specifications produce the same output whatever the order
+        of their input. Sort keys are computed once per element, so this takes O(n log n).
+        """
+        for owl_class in self._classes:
+            owl_class.canonicalize()
+        self._object_properties.sort(key = lambda owl_property: owl_property.get_sort_key())
+        self._classes.sort(key = lambda owl_class: owl_class.get_sort_key())
+
+    def normalize(self, normalizer=None):
+        """
+        Replaces the class expressions of every class by their normalized form, so equivalent
+        expressions become the same object, and removes the repeated ones. Returns the number
+        of removed class expressions.
+        """
+        if normalizer is None:
+            normalizer = LogicalOperationNormalizer()
+        removed = 0
+        for owl_class in self._classes:
+            removed += owl_class.normalize(normalizer)
+        return removed
+
+    def reduce_sub_class_of(self):
+        """
+        Removes the parent classes implied by other parent classes (A is a B and a C, and B is
+        already a C) and the repeated ones, keeping the transitive reduction of the told class
+        hierarchy. Classes in a cycle keep their parents. Returns the number of removed
+        sub class axioms.
+        """
+        name_ids = {}
+        for owl_class in self._classes:
+            name_ids.setdefault(owl_class.get_classname(), len(name_ids))
+            for parent in owl_class.get_sub_class_of():
+                name_ids.setdefault(parent, len(name_ids))
+
+        successors = [None] * len(name_ids)
+        for owl_class in self._classes:
+            parents = owl_class.get_sub_class_of()
+            if parents:
+                class_id = name_ids[owl_class.get_classname()]
+                successors[class_id] = (successors[class_id] or []) + \
+                    [name_ids[parent] for parent in parents]
+        reduction = GraphUtils.transitive_reduction(len(name_ids), successors)
+
+        kept_edges = set((class_id, parent_id) for class_id in range(len(name_ids))
+                         for parent_id in reduction[class_id] or [])
+        removed = 0
+        for owl_class in self._classes:
+            class_id = name_ids[owl_class.get_classname()]
+            parents = []
+            for parent in owl_class.get_sub_class_of():
+                edge = (class_id, name_ids[parent])
+                if edge in kept_edges:
+                    kept_edges.remove(edge)
+                    parents.append(parent)
+                else:
+                    removed += 1
+            owl_class.set_sub_class_of(parents)
+        return removed
+
     def get_class_specification(self, owl_class):
         """
         Returns the OWLClassSpecification if the given class already exists in the
@@ -54,19 +154,113 @@ class OWLSpecification:
         """
         Builds the owl content to write to the file.
         """
-        owl_content = ''
+        owl_content = []
+        for fragment in self.iter_owl_fragments():
+            owl_content.append('\n')
+            owl_content.append(fragment)
+        return ''.join(owl_content)
 
-        for owl_object_property in self._object_properties:
-            owl_content += '\n' + owl_object_property.to_owl(self._prefix)
+    def get_owl_templates(self, compact=False):
+        """
+        Returns the templates compiled with the prefix of this specification.
+        """
+        owl_templates = self._owl_templates.get(compact)
+        if owl_templates is None:
+            owl_templates = OWLTemplates(self._prefix, compact,
+                                         instrumentation = self._instrumentation)
+            self._owl_templates[compact] = owl_templates
+        return owl_templates
+
+    def iter_owl_fragments(self, compact=False, processes=1, batch_size=DEFAULT_BATCH_SIZE,
+                           shared=False, term_profiler=None, joined=True):
+        """
+        Yields the owl (xml) fragment of every object property and then of every class,
+        one at a time, so they can be streamed to the output.
 
-        for owl_class in self._classes:
-            owl_content  += '\n' + owl_class.to_owl(self._prefix)
+        With more than one process the fragments are rendered in batches by worker processes,
+        and every yielded item holds the fragments of a batch, joined with the separator of the
+        templates. Batches are yielded in order, and only a few of them are in flight at a time.
+        If joined is False, the fragments of every batch are yielded one at a time instead.
+
+        If shared is True, the restrictions and collections that appear more than once are
+        referred to by the name of a class equivalent to them, and the definitions of those
+        classes are yielded after the classes.
 
-        return owl_content
+        With a term profiler, the entities are rendered in this process by the profiler, which
+        records their render time and output size.
+        """
+        shared_expressions = None
+        if shared:
+            shared_expressions = OWLSharedExpressions.from_owl_specification(self)
+            owl_templates = OWLTemplates(self._prefix, compact, shared_expressions,
+                                         self._instrumentation)
+        else:
+            owl_templates = self.get_owl_templates(compact)
+
+        if term_profiler is not None:
+            for owl_entities in (self._object_properties, self._classes):
+                for owl_entity in owl_entities:
+                    yield term_profiler.render_owl(owl_entity, owl_templates)
+        elif processes is not None and processes > 1:
+            entities = self._object_properties + self._classes
+            batches = [(start, min(start + batch_size, len(entities)))
+                       for start in range(0, len(entities), batch_size)]
+            render_batch = self.render_owl_batch if joined else self.render_owl_fragments
+            for batch in ParallelUtils.ordered_map(
+                    lambda batch: render_batch(owl_templates, entities, batch[0], batch[1]),
+                    batches, processes):
+                if joined:
+                    yield batch
+                else:
+                    for fragment in batch:
+                        yield fragment
+        else:
+            for owl_object_property in self._object_properties:
+                yield owl_object_property.render_owl(owl_templates)
+
+            for owl_class in self._classes:
+                yield owl_class.render_owl(owl_templates)
+
+        if shared_expressions:
+            for fragment in shared_expressions.iter_owl_fragments(owl_templates):
+                yield fragment
+
+    def render_owl_batch(self, owl_templates, entities, start, stop):
+        """
+        Renders the entities between the given indexes, joined with the separator of the templates.
+        """
+        separator = '' if owl_templates.is_compact() else '\n'
+        return separator.join(entity.render_owl(owl_templates) for entity in entities[start:stop])
+
+    def render_owl_fragments(self, owl_templates, entities, start, stop):
+        """
+        Returns the list of the fragments of the entities between the given indexes.
+        """
+        return [entity.render_owl(owl_templates) for entity in entities[start:stop]]
 
     class OWLClassSpecification:
         """ 
         """
+        # fields that are filled by nested templates, written straight to the output
+        TEMPLATE_SLOTS = {
+            'OWL_CLASS_TEMPLATE': ('sub_class_clauses', 'synonym_equivalences',
+                                   'equivalence_class_expressions', 'sub_class_of_expressions'),
+            'OWL_EQUIVALENCE_CLASS_TEMPLATE': ('all_values_from',),
+            'OWL_COMPOUND_EQUIVALENCE_CLASS_TEMPLATE': ('restrictions',),
+            'OWL_EQUIVALENCE_RESTRICTION_TEMPLATE': ('all_values_from',),
+            'OWL_ALL_VALUES_FROM_TEMPLATE': ('descriptions',),
+            'OWL_NECESSARY_CONDITION_TEMPLATE': ('restriction',),
+            'OWL_COMPOUND_NECESSARY_CONDITION_TEMPLATE': ('restrictions',),
+            'OWL_RESTRICTION_TEMPLATE': ('restriction_rule',),
+            'OWL_SHARED_RESTRICTION_TEMPLATE': ('restriction_rule',),
+            'OWL_SHARED_COLLECTION_TEMPLATE': ('descriptions',),
+            'OWL_NESTED_CLASS_TEMPLATE': ('operators',),
+            'OWL_COLLECTION_RESTRICTION_RULE_TEMPLATE': ('descriptions',),
+            'OWL_SOME_VALUES_FROM_RULE_TEMPLATE': ('some_values_from',),
+            'OWL_SOME_VALUES_FROM_TEMPLATE': ('descriptions',),
+            'OWL_RANGE_RESTRICTION_TEMPLATE': ('min_restriction_rule', 'max_restriction_rule'),
+        }
+
         OWL_SIMPLE_CLASS_TEMPLATE = '<owl:Class rdf:about="{prefix}#{classname}" />'
         OWL_CLASS_TEMPLATE = '''
         <owl:Class rdf:about="{prefix}#{classname}">
@@ -152,6 +346,85 @@ class OWLSpecification:
         </owl:{quantification_cardinality}>
         """
 
+        OWL_COLLECTION_RESTRICTION_RULE_TEMPLATE = """
+        <owl:onProperty rdf:resource="{prefix}#{property_name}"/>
+        <owl:onClass>
+            <owl:Class>
+                <owl:{set_type} rdf:parseType="Collection">
+                     {descriptions}
+                </owl:{set_type}>
+             </owl:Class>
+        </owl:onClass>
+        <owl:{quantification_cardinality} rdf:datatype="&xsd;nonNegativeInteger">
+            {cardinality_value}
+        </owl:{quantification_cardinality}>
+        """
+
+        OWL_SOME_VALUES_FROM_RULE_TEMPLATE = """
+        <owl:onProperty rdf:resource="{prefix}#{property_name}"/>
+        {some_values_from}
+        """
+
+        OWL_SOME_VALUES_FROM_TEMPLATE = """
+        <owl:someValuesFrom>
+            <owl:Class>
+                <owl:{set_type} rdf:parseType="Collection">
+                     {descriptions}
+                </owl:{set_type}>
+             </owl:Class>
+        </owl:someValuesFrom>
+        """
+        OWL_SOME_VALUES_FROM_SINGLE_CLASS_TEMPLATE = """
+        <owl:someValuesFrom rdf:resource="{prefix}#{classname}"/>
+        """
+
+        # a cardinality range is the intersection of its minimum and maximum restrictions
+        OWL_RANGE_RESTRICTION_TEMPLATE = """
+        <owl:Class>
+            <owl:intersectionOf rdf:parseType="Collection">
+                <owl:Restriction>
+                    {min_restriction_rule}
+                </owl:Restriction>
+                <owl:Restriction>
+                    {max_restriction_rule}
+                </owl:Restriction>
+            </owl:intersectionOf>
+        </owl:Class>
+        """
+
+        # the anonymous class of an operation nested in a conjunction or disjunction
+        OWL_NESTED_CLASS_TEMPLATE = """
+        <owl:Class>
+            <owl:{collection_type} rdf:parseType="Collection">
+                {operators}
+            </owl:{collection_type}>
+        </owl:Class>
+        """
+
+        # shared expressions are written once, as the equivalent class of a named class, and
+        # referred to by its name: a blank node can be the object of a single triple in owl 2 dl
+        OWL_SHARED_RESTRICTION_TEMPLATE = """
+        <owl:Class rdf:about="{prefix}#{classname}">
+            <owl:equivalentClass>
+                <owl:Restriction>
+                    {restriction_rule}
+                </owl:Restriction>
+            </owl:equivalentClass>
+        </owl:Class>
+        """
+
+        OWL_SHARED_COLLECTION_TEMPLATE = """
+        <owl:Class rdf:about="{prefix}#{classname}">
+            <owl:equivalentClass>
+                <owl:Class>
+                    <owl:{set_type} rdf:parseType="Collection">
+                         {descriptions}
+                    </owl:{set_type}>
+                </owl:Class>
+            </owl:equivalentClass>
+        </owl:Class>
+        """
+
         _classname = None
         _synonym_equivalences = None
         _equivalence_rules = None
@@ -172,161 +445,368 @@ class OWLSpecification:
             """
             Prints this owl class specification in owl format (xml)
             """
-            sub_class_clauses = self.build_sub_class_clauses(prefix)
-            equivalence_class_expressions = self.build_equivalence_class_expressions(prefix)
-            sub_class_of_expressions = self.build_sub_class_of_expressions(prefix)
-            synonym_equivalences = self.build_synonym_equivalences(prefix)
-            class_expression = self.OWL_CLASS_TEMPLATE.format(
-                prefix = prefix,
+            return self.render_owl(OWLTemplates.for_prefix(prefix))
+
+        def render_owl(self, owl_templates):
+            """
+            Renders this owl class specification with the given compiled templates.
+            """
+            owl = []
+            self.write_owl(owl_templates, owl.append)
+            return ''.join(owl)
+
+        def write_owl(self, owl_templates, write):
+            """
+            Writes this owl class specification in owl format (xml) with the given write function.
+            """
+            templates = owl_templates.of(self.__class__)
+            if templates.compact and self.is_empty():
+                templates.OWL_SIMPLE_CLASS_TEMPLATE(write, classname = self._classname)
+                return
+            templates.OWL_CLASS_TEMPLATE(
+                write,
                 classname = self._classname,
-                sub_class_clauses = sub_class_clauses,
-                synonym_equivalences = synonym_equivalences,
-                equivalence_class_expressions = equivalence_class_expressions,
-                sub_class_of_expressions = sub_class_of_expressions)
-            return class_expression
-
-        def build_sub_class_of_expressions(self, prefix):
-            expressions = []
-            for expression in self._sub_class_of_expressions:
-                expressions.append(self.build_sub_class_of_expression(prefix, expression))
-            return '\n'.join(expressions)
-
-        def build_sub_class_of_expression(self, prefix, logical_operation):
+                sub_class_clauses = self.slot(self.write_sub_class_clauses, templates,
+                                              self._sub_class_of),
+                synonym_equivalences = self.slot(self.write_synonym_equivalences, templates,
+                                                 self._synonym_equivalences),
+                equivalence_class_expressions = self.slot(self.write_equivalence_class_expressions,
+                                                          templates, self._equivalence_rules),
+                sub_class_of_expressions = self.slot(self.write_sub_class_of_expressions, templates,
+                                                     self._sub_class_of_expressions))
+
+        def slot(self, write_method, templates, elements):
+            """
+            Returns the function that fills a template slot with the given elements, or None
+            when there are no elements to write.
+            """
+            if not elements:
+                return None
+            return lambda write: write_method(templates, write, elements)
+
+        def write_sub_class_of_expressions(self, templates, write, expressions):
+            for index, expression in enumerate(expressions):
+                if index > 0:
+                    write(templates.separator)
+                self.write_sub_class_of_expression(templates, write, expression)
+
+        def write_sub_class_of_expression(self, templates, write, logical_operation):
             if logical_operation.is_single_clause():
                 expression = logical_operation.get_logical_operators()[0]
+                classname = self.get_shared_classname(templates, OWLSharedExpressions.RESTRICTION,
+                                                       expression)
+                if classname is not None:
+                    templates.OWL_SUB_CLASS_OF_TEMPLATE(write, parent = classname)
+                    return
+                templates.OWL_NECESSARY_CONDITION_TEMPLATE(
+                    write,
+                    restriction = lambda write: self.write_restriction_expression(
+                        templates, write, expression))
+            else:
+                self.write_compound_sub_class_expression(templates, write, logical_operation)
 
-                quantification_cardinality = self.get_quantification_cardinality(expression.get_quantification())
-                quantification_value = expression.get_quantification().get_value() \
-                    if expression.get_quantification().get_value() is not None else ''
-
-                restriction_rule = self.OWL_RESTRICTION_RULE_TEMPLATE.format(
-                    prefix=prefix,
-                    property_name=expression.get_verb(),
-                    classname=expression.get_rule_range().get_range(),
-                    cardinality_value = quantification_value,
-                    quantification_cardinality = quantification_cardinality
-                )
+        def write_compound_sub_class_expression(self, templates, write, logical_operation):
+            head, tail = self.split_template(
+                templates.OWL_COMPOUND_NECESSARY_CONDITION_TEMPLATE, 'restrictions',
+                necessary_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf")
+            self.write_compound_expression(templates, write, logical_operation, head, tail,
+                                           self.write_restriction_expression)
 
-                restriction = self.OWL_RESTRICTION_TEMPLATE.format(
-                    restriction_rule=restriction_rule
-                )
+        def write_compound_expression(self, templates, write, logical_operation, head, tail,
+                                      write_rule):
+            """
+            Writes the operators of a conjunction or disjunction between the given head and tail,
+            the rules with the given write function and the nested operations as anonymous
+            classes. Nested operations are written with an explicit stack, so any depth is
+            supported.
+            """
+            write(head)
+            # the operators, the position of the next one and the tail of every open operation
+            stack = [[logical_operation.get_logical_operators(), 0, tail]]
+            while stack:
+                frame = stack[-1]
+                operators, position = frame[0], frame[1]
+                if position == len(operators):
+                    write(frame[2])
+                    stack.pop()
+                    continue
+                frame[1] = position + 1
+                if position > 0:
+                    write(templates.separator)
+                operator = operators[position]
+                while isinstance(operator, LogicalOperation) and operator.is_single_clause():
+                    operator = operator.get_logical_operators()[0]
+                if isinstance(operator, LogicalOperation):
+                    nested_head, nested_tail = self.split_template(
+                        templates.OWL_NESTED_CLASS_TEMPLATE, 'operators',
+                        collection_type = "intersectionOf" if operator.is_conjunction() else "unionOf")
+                    write(nested_head)
+                    stack.append([operator.get_logical_operators(), 0, nested_tail])
+                else:
+                    write_rule(templates, write, operator)
 
-                return self.OWL_NECESSARY_CONDITION_TEMPLATE.format(
-                    restriction=restriction)
-            else:
-                return self.build_compound_sub_class_expression(prefix, logical_operation)
-
-        def build_compound_sub_class_expression(self, prefix, logical_operation):
-            restrictions = []
-            for rule in logical_operation.get_logical_operators():
-                restrictions.append(self.build_restriction_expression(prefix, rule))
-
-            return self.OWL_COMPOUND_NECESSARY_CONDITION_TEMPLATE.format(
-                necessary_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf",
-                prefix = prefix,
-                restrictions = "\n".join(restrictions))
-
-        def build_restriction_expression(self, prefix, expression):
-            quantification_cardinality = self.get_quantification_cardinality(expression.get_quantification())
-            quantification_value = expression.get_quantification().get_value() \
-                if expression.get_quantification().get_value() is not None else ''
-            restriction_rule =  self.OWL_RESTRICTION_RULE_TEMPLATE.format(
-                prefix = prefix,
-                classname = expression.get_rule_range().get_range(),
+        def split_template(self, template, slot, **fields):
+            """
+            Returns the text the given template writes before and after its slot.
+            """
+            owl = []
+            fields[slot] = lambda write: write(None)
+            template(owl.append, **fields)
+            index = owl.index(None)
+            return ''.join(owl[:index]), ''.join(owl[index + 1:])
+
+        def write_restriction_expression(self, templates, write, expression):
+            classname = self.get_shared_classname(templates, OWLSharedExpressions.RESTRICTION,
+                                                   expression)
+            if classname is not None:
+                templates.OWL_DESCRIPTION_TEMPLATE(write, classname = classname)
+                return
+            if self.get_quantification_kind(expression) == Rule.Quantification.RANGE:
+                minimum, maximum = self.get_quantification_bounds(expression)
+                templates.OWL_RANGE_RESTRICTION_TEMPLATE(
+                    write,
+                    min_restriction_rule = lambda write: self.write_cardinality_rule(
+                        templates, write, expression, 'minQualifiedCardinality', minimum),
+                    max_restriction_rule = lambda write: self.write_cardinality_rule(
+                        templates, write, expression, 'maxQualifiedCardinality', maximum))
+                return
+            templates.OWL_RESTRICTION_TEMPLATE(
+                write,
+                restriction_rule = lambda write: self.write_restriction_rule(
+                    templates, write, expression))
+
+        def write_restriction_rule(self, templates, write, expression):
+            """
+            Writes the restriction of a necessity with the emitter of its quantification kind.
+            """
+            emitter = self.RESTRICTION_RULE_EMITTERS.get(self.get_quantification_kind(expression))
+            if emitter is None:
+                raise ValueError('Unsupported quantification of a necessity: %s' % (
+                    expression.get_quantification().get_type()
+                    if expression.get_quantification() is not None else None))
+            emitter(self, templates, write, expression)
+
+        def write_qualified_cardinality_rule(self, templates, write, expression):
+            self.write_cardinality_rule(
+                templates, write, expression,
+                self.get_quantification_cardinality(expression.get_quantification()),
+                self.get_cardinality(expression))
+
+        def write_existential_rule(self, templates, write, expression):
+            templates.OWL_SOME_VALUES_FROM_RULE_TEMPLATE(
+                write,
                 property_name = expression.get_verb(),
+                some_values_from = lambda write: self.write_some_values_from(
+                    templates, write, expression))
+
+        def write_universal_rule(self, templates, write, expression):
+            self.write_equivalence_restriction_rule(templates, write, expression)
+
+        def write_cardinality_rule(self, templates, write, expression, quantification_cardinality,
+                                   cardinality):
+            rule_range = expression.get_rule_range()
+            if rule_range.is_noun_concept():
+                templates.OWL_RESTRICTION_RULE_TEMPLATE(
+                    write,
+                    classname = rule_range.get_range(),
+                    property_name = expression.get_verb(),
+                    quantification_cardinality = quantification_cardinality,
+                    cardinality_value = cardinality)
+                return
+            templates.OWL_COLLECTION_RESTRICTION_RULE_TEMPLATE(
+                write,
+                property_name = expression.get_verb(),
+                set_type = 'intersectionOf' if rule_range.is_conjunction() else 'unionOf',
+                descriptions = lambda write: self.write_descriptions(
+                    templates, write, rule_range.get_range()),
                 quantification_cardinality = quantification_cardinality,
-                cardinality_value = quantification_value)
-            return self.OWL_RESTRICTION_TEMPLATE.format(
-                restriction_rule = restriction_rule
-            )
+                cardinality_value = cardinality)
+
+        def write_some_values_from(self, templates, write, expression):
+            rule_range = expression.get_rule_range()
+            if rule_range.is_noun_concept():
+                templates.OWL_SOME_VALUES_FROM_SINGLE_CLASS_TEMPLATE(
+                    write, classname = rule_range.get_range())
+                return
+            templates.OWL_SOME_VALUES_FROM_TEMPLATE(
+                write,
+                set_type = 'intersectionOf' if rule_range.is_conjunction() else 'unionOf',
+                descriptions = lambda write: self.write_descriptions(
+                    templates, write, rule_range.get_range()))
+
+        def get_quantification_kind(self, expression):
+            quantification = expression.get_quantification()
+            return quantification.get_kind() if quantification is not None else None
+
+        def get_quantification_bounds(self, expression):
+            """
+            Returns the cardinality bounds of the quantification of a necessity, which must
+            have a value.
+            """
+            bounds = expression.get_quantification().get_bounds()
+            if bounds is None:
+                raise ValueError('The %s quantification of %s has no value' % (
+                    expression.get_quantification().get_type(), expression.get_verb()))
+            return bounds
+
+        def get_cardinality(self, expression):
+            """
+            Returns the cardinality of a necessity whose quantification is a single cardinality:
+            its maximum for at most quantifications, else its minimum.
+            """
+            minimum, maximum = self.get_quantification_bounds(expression)
+            if expression.get_quantification().get_kind() == Rule.Quantification.AT_MOST:
+                return maximum
+            return minimum
 
         def get_quantification_cardinality(self, quantification):
-            if quantification.get_type() == 'at-least-N':
-                return 'minQualifiedCardinality'
-            
-            if quantification.get_type() == 'at-least-N':
-                return 'maxQualifiedCardinality'
-            
-            # TODO: place other cardinalities
-            return ''
-
-        def build_synonym_equivalences(self, prefix):
-            equivalences = []
-            for equivalence in self._synonym_equivalences:
-                equivalences.append(
-                    self.OWL_SYNONYM_EQUIVALENCE_TEMPLATE.format(
-                        prefix = prefix,
-                        classname = equivalence))
-            return '\n'.join(equivalences)
-
-        def build_sub_class_clauses(self, prefix):
-            clauses = []
-            for parent in self._sub_class_of:
-                clauses.append(
-                    self.OWL_SUB_CLASS_OF_TEMPLATE.format(prefix = prefix, parent = parent))
-            return '\n'.join(clauses)
-
-        def build_equivalence_class_expressions(self, prefix):
-            equivalences = []
-            for equivalence in self._equivalence_rules:
-                equivalences.append(
-                    self.build_equivalence_class_expression(prefix, equivalence))
-            return '\n'.join(equivalences)
-
-        def build_equivalence_class_expression(self, prefix, logical_operation):
+            """
+            Returns the owl cardinality of a quantification, or None if it is not a single
+            cardinality.
+            """
+            return self.QUANTIFICATION_CARDINALITIES.get(quantification.get_kind())
+
+        def write_synonym_equivalences(self, templates, write, equivalences):
+            for index, equivalence in enumerate(equivalences):
+                if index > 0:
+                    write(templates.separator)
+                templates.OWL_SYNONYM_EQUIVALENCE_TEMPLATE(write, classname = equivalence)
+
+        def write_sub_class_clauses(self, templates, write, parents):
+            for index, parent in enumerate(parents):
+                if index > 0:
+                    write(templates.separator)
+                templates.OWL_SUB_CLASS_OF_TEMPLATE(write, parent = parent)
+
+        def write_equivalence_class_expressions(self, templates, write, equivalences):
+            for index, equivalence in enumerate(equivalences):
+                if index > 0:
+                    write(templates.separator)
+                self.write_equivalence_class_expression(templates, write, equivalence)
+
+        def write_equivalence_class_expression(self, templates, write, logical_operation):
             if logical_operation.is_single_clause():
                 equivalence = logical_operation.get_logical_operators()[0]
-                if equivalence.get_rule_range().is_noun_concept():
-                    all_values_from = self.build_all_values_from_noun_concept(
-                        prefix, equivalence.get_rule_range().get_range())
-                else:
-                    all_values_from = self.build_all_values_from_collection(
-                        prefix, equivalence)
-                return self.OWL_EQUIVALENCE_CLASS_TEMPLATE.format(
-                    prefix = prefix,
+                classname = self.get_shared_classname(
+                    templates, OWLSharedExpressions.ALL_VALUES_FROM, equivalence)
+                if classname is not None:
+                    templates.OWL_SYNONYM_EQUIVALENCE_TEMPLATE(write, classname = classname)
+                    return
+                templates.OWL_EQUIVALENCE_CLASS_TEMPLATE(
+                    write,
                     property_name = equivalence.get_verb(),
-                    all_values_from = all_values_from)
+                    all_values_from = lambda write: self.write_all_values_from(
+                        templates, write, equivalence))
             else:
-                return self.build_compound_equivalence_class_expression(prefix, logical_operation)
-
-        def build_compound_equivalence_class_expression(self, prefix, logical_operation):
-            restrictions = []
-            for rule in logical_operation.get_logical_operators():
-                restrictions.append(self.build_equivalence_restriction_expression(prefix, rule))
-
-            return self.OWL_COMPOUND_EQUIVALENCE_CLASS_TEMPLATE.format(
-                equivalence_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf",
-                restrictions = "\n".join(restrictions))
+                self.write_compound_equivalence_class_expression(templates, write, logical_operation)
+
+        def write_compound_equivalence_class_expression(self, templates, write, logical_operation):
+            head, tail = self.split_template(
+                templates.OWL_COMPOUND_EQUIVALENCE_CLASS_TEMPLATE, 'restrictions',
+                equivalence_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf")
+            self.write_compound_expression(templates, write, logical_operation, head, tail,
+                                           self.write_equivalence_restriction_expression)
+
+        def write_equivalence_restriction_expression(self, templates, write, equivalence):
+            classname = self.get_shared_classname(templates, OWLSharedExpressions.ALL_VALUES_FROM,
+                                                   equivalence)
+            if classname is not None:
+                templates.OWL_DESCRIPTION_TEMPLATE(write, classname = classname)
+                return
+            templates.OWL_RESTRICTION_TEMPLATE(
+                write,
+                restriction_rule = lambda write: self.write_equivalence_restriction_rule(
+                    templates, write, equivalence))
+
+        def write_equivalence_restriction_rule(self, templates, write, equivalence):
+            templates.OWL_EQUIVALENCE_RESTRICTION_TEMPLATE(
+                write,
+                property_name = equivalence.get_verb(),
+                all_values_from = lambda write: self.write_all_values_from(
+                    templates, write, equivalence))
 
-        def build_equivalence_restriction_expression(self, prefix, equivalence):
+        def write_all_values_from(self, templates, write, equivalence):
             if equivalence.get_rule_range().is_noun_concept():
-                all_values_from = self.build_all_values_from_noun_concept(
-                    prefix, equivalence.get_rule_range().get_range())
+                templates.OWL_ALL_VALUES_FROM_SINGLE_CLASS_TEMPLATE(
+                    write, classname = equivalence.get_rule_range().get_range())
+                return
+            classname = self.get_shared_classname(templates, OWLSharedExpressions.COLLECTION,
+                                                   equivalence)
+            if classname is not None:
+                templates.OWL_ALL_VALUES_FROM_SINGLE_CLASS_TEMPLATE(write, classname = classname)
             else:
-                all_values_from = self.build_all_values_from_collection(
-                    prefix, equivalence)
-            restriction_rule = self.OWL_EQUIVALENCE_RESTRICTION_TEMPLATE.format(
-                prefix = prefix,
-                property_name = equivalence.get_verb(),
-                all_values_from = all_values_from)
-            return self.OWL_RESTRICTION_TEMPLATE.format(
-                restriction_rule = restriction_rule)
-
-        def build_all_values_from_noun_concept(self, prefix, classname):
-            return self.OWL_ALL_VALUES_FROM_SINGLE_CLASS_TEMPLATE.format(
-                prefix = prefix, classname = classname)
-
-        def build_all_values_from_collection(self, prefix, equivalence):
-            set_type = 'intersectionOf' if equivalence.get_rule_range().is_conjunction() else 'unionOf'
-
-            descriptions = []
-            for classname in equivalence.get_rule_range().get_range():
-                descriptions.append(
-                    self.OWL_DESCRIPTION_TEMPLATE.format(prefix = prefix, classname = classname))
-            joint_descriptions = '\n'.join(descriptions)
-            
-            return self.OWL_ALL_VALUES_FROM_TEMPLATE.format(
-                prefix = prefix, set_type = set_type, descriptions = joint_descriptions)
+                self.write_all_values_from_collection(templates, write, equivalence)
+
+        def write_all_values_from_collection(self, templates, write, equivalence):
+            templates.OWL_ALL_VALUES_FROM_TEMPLATE(
+                write,
+                set_type = 'intersectionOf' if equivalence.get_rule_range().is_conjunction() else 'unionOf',
+                descriptions = lambda write: self.write_descriptions(
+                    templates, write, equivalence.get_rule_range().get_range()))
+
+        def write_descriptions(self, templates, write, classnames):
+            for index, classname in enumerate(classnames):
+                if index > 0:
+                    write(templates.separator)
+                templates.OWL_DESCRIPTION_TEMPLATE(write, classname = classname)
+
+        def get_shared_classname(self, templates, kind, rule):
+            """
+            Returns the name of the class of the expression of the given kind built from the
+            rule, or None if it is written in place.
+            """
+            if templates.shared_expressions is None:
+                return None
+            return templates.shared_expressions.get_classname(kind, rule)
+
+        def write_shared_expression(self, owl_templates, write, classname, kind, rule):
+            """
+            Writes the definition of a shared expression, as the class with the given name.
+            """
+            templates = owl_templates.of(self.__class__)
+            if kind == OWLSharedExpressions.COLLECTION:
+                templates.OWL_SHARED_COLLECTION_TEMPLATE(
+                    write,
+                    classname = classname,
+                    set_type = 'intersectionOf' if rule.get_rule_range().is_conjunction() else 'unionOf',
+                    descriptions = lambda write: self.write_descriptions(
+                        templates, write, rule.get_rule_range().get_range()))
+            elif kind == OWLSharedExpressions.ALL_VALUES_FROM:
+                templates.OWL_SHARED_RESTRICTION_TEMPLATE(
+                    write,
+                    classname = classname,
+                    restriction_rule = lambda write: self.write_equivalence_restriction_rule(
+                        templates, write, rule))
+            else:
+                templates.OWL_SHARED_RESTRICTION_TEMPLATE(
+                    write,
+                    classname = classname,
+                    restriction_rule = lambda write: self.write_restriction_rule(
+                        templates, write, rule))
+
+        # the owl cardinality of the quantification kinds that are a single cardinality
+        QUANTIFICATION_CARDINALITIES = {
+            Rule.Quantification.AT_LEAST: 'minQualifiedCardinality',
+            Rule.Quantification.AT_MOST: 'maxQualifiedCardinality',
+            Rule.Quantification.EXACTLY: 'qualifiedCardinality',
+        }
+
+        # the emitter of the restriction of every quantification kind but ranges, which are
+        # two restrictions. The kind is resolved when the quantification type is parsed.
+        RESTRICTION_RULE_EMITTERS = {
+            Rule.Quantification.AT_LEAST: write_qualified_cardinality_rule,
+            Rule.Quantification.AT_MOST: write_qualified_cardinality_rule,
+            Rule.Quantification.EXACTLY: write_qualified_cardinality_rule,
+            Rule.Quantification.EXISTENTIAL: write_existential_rule,
+            Rule.Quantification.UNIVERSAL: write_universal_rule,
+        }
+
+        def is_empty(self):
+            """
+            Returns True if this class has nothing more than its name.
+            """
+            return not (self._sub_class_of or self._synonym_equivalences or
+                        self._equivalence_rules or self._sub_class_of_expressions)
 
         def get_classname(self):
             return self._classname
@@ -352,9 +832,54 @@ class OWLSpecification:
         def add_parent_class(self, parent_class):
             self._sub_class_of.append(parent_class)
 
+        def set_sub_class_of(self, parent_classes):
+            self._sub_class_of = parent_classes
+
         def add_parent_class_expression(self, parent_class_expression):
             self._sub_class_of_expressions.append(parent_class_expression)
 
+        def get_sort_key(self):
+            return self._classname
+
+        def canonicalize(self):
+            """
+            Sorts the parent classes, the synonyms and the class expressions of this class,
+            canonicalizing every expression first.
+            """
+            self._sub_class_of = sorted(self._sub_class_of)
+            self._synonym_equivalences = sorted(self._synonym_equivalences)
+            self._equivalence_rules = self.canonicalize_logical_operations(self._equivalence_rules)
+            self._sub_class_of_expressions = self.canonicalize_logical_operations(
+                self._sub_class_of_expressions)
+
+        def normalize(self, normalizer):
+            """
+            Replaces the class expressions of this class by their normalized form, keeping the
+            first of the repeated ones. Returns the number of removed class expressions.
+            """
+            count = len(self._equivalence_rules) + len(self._sub_class_of_expressions)
+            self._equivalence_rules = self.normalize_logical_operations(
+                normalizer, self._equivalence_rules)
+            self._sub_class_of_expressions = self.normalize_logical_operations(
+                normalizer, self._sub_class_of_expressions)
+            return count - len(self._equivalence_rules) - len(self._sub_class_of_expressions)
+
+        def normalize_logical_operations(self, normalizer, logical_operations):
+            normalized_operations = []
+            normalized_ids = set()
+            for logical_operation in logical_operations:
+                normalized = normalizer.normalize(logical_operation)
+                if id(normalized) not in normalized_ids:
+                    normalized_ids.add(id(normalized))
+                    normalized_operations.append(normalized)
+            return normalized_operations
+
+        def canonicalize_logical_operations(self, logical_operations):
+            for logical_operation in logical_operations:
+                logical_operation.canonicalize()
+            return sorted(logical_operations,
+                          key = lambda logical_operation: logical_operation.get_sort_key())
+
     class OWLObjectPropertySpecification:
         """
         Holds the specification of an owl object property.
@@ -385,6 +910,21 @@ class OWLSpecification:
             self._range = op_range
             self._equivalent_to = None
 
+        def get_name(self):
+            return self._name
+
+        def get_domain(self):
+            return self._domain
+
+        def get_range(self):
+            return self._range
+
+        def get_equivalent_to(self):
+            return self._equivalent_to
+
+        def get_sort_key(self):
+            return (self._name, self._domain or '', self._range or '', self._equivalent_to or '')
+
         def set_equivalent_to(self, equivalent_to):
             self._domain = None
             self._range = None
@@ -395,14 +935,29 @@ class OWLSpecification:
             """
             Gets the owl (xml) format class definition of this object property.
             """
+            return self.render_owl(OWLTemplates.for_prefix(prefix))
+
+        def render_owl(self, owl_templates):
+            """
+            Renders this object property with the given compiled templates.
+            """
+            owl = []
+            self.write_owl(owl_templates, owl.append)
+            return ''.join(owl)
+
+        def write_owl(self, owl_templates, write):
+            """
+            Writes this object property in owl format (xml) with the given write function.
+            """
+            templates = owl_templates.of(self.__class__)
             if self._equivalent_to != None:
-                return self.OWL_OBJECT_PROPERTY_EQUIVALENCE_TEMPLATE.format(
-                    prefix = prefix,
+                templates.OWL_OBJECT_PROPERTY_EQUIVALENCE_TEMPLATE(
+                    write,
                     property_name = self._name,
                     equivalent_property_name = self._equivalent_to)
             else:
-                return self.OWL_OBJECT_PROPERTY_TEMPLATE.format(
-                    prefix = prefix, 
+                templates.OWL_OBJECT_PROPERTY_TEMPLATE(
+                    write,
                     op_name = self._name,
                     op_domain = self._domain,
                     op_range = self._range)
@@ -430,12 +985,45 @@ class OWLSpecification:
             self._domain = dp_domain
             self._range_xsd = dp_range_xsd
 
+        def get_name(self):
+            return self._name
+
+        def get_domain(self):
+            return self._domain
+
+        def get_range_xsd(self):
+            return self._range_xsd
+
+        def get_sort_key(self):
+            return (self._name, self._domain or '', self._range_xsd or '', '')
+
         def to_owl(self, prefix):
             """
             Gets the owl (xml) format class definition of this data property.
             """
-            return self.OWL_OBJECT_PROPERTY_TEMPLATE.format(
-                prefix=prefix,
-                dp_name=self._name,
-                dp_domain=self._domain,
-                dp_range_xsd=self._range_xsd)
+            return self.render_owl(OWLTemplates.for_prefix(prefix))
+
+        def render_owl(self, owl_templates):
+            """
+            Renders this data property with the given compiled templates.
+            """
+            owl = []
+            self.write_owl(owl_templates, owl.append)
+            return ''.join(owl)
+
+        def write_owl(self, owl_templates, write):
+            """
+            Writes this data property in owl format (xml) with the given write function.
+            """
+            owl_templates.of(self.__class__).OWL_OBJECT_PROPERTY_TEMPLATE(
+                write,
+                dp_name = self._name,
+                dp_domain = self._domain,
+                dp_range_xsd = self._range_xsd)
+
+
+# the nested classes are also module attributes, so pickle can find them when the
+# specification is spilled to disk
+OWLClassSpecification = OWLSpecification.OWLClassSpecification
+OWLObjectPropertySpecification = OWLSpecification.OWLObjectPropertySpecification
+OWLDataPropertySpecification = OWLSpecification.OWLDataPropertySpecification
@@ -0,0 +1,175 @@
+import collections
+import re
+import string
+
+
+def compact_xml(text):
+    """
+    Removes the insignificant whitespace of an xml (template) text: indentation and line breaks
+    between tags and at the edges of the text. Line breaks between attributes become a space.
+    """
+    text = re.sub(r'>\s*\n\s*', '>', text)
+    text = re.sub(r'\s*\n\s*<', '<', text)
+    text = re.sub(r'^\s*\n\s*|\s*\n\s*$', '', text)
+    return re.sub(r'\s*\n\s*', ' ', text)
+
+
+class OWLTemplates:
+    """
+    Compiles the owl templates of the specification classes into emitters with the prefix
+    already bound, so the templates are not parsed again on every call.
+
+    An emitter is a function that takes a write function followed by the template fields, by
+    name or in the order they first appear in the template. Fields declared as slots receive
+    a function that is called with the write function (or None to leave the slot empty), so
+    nested templates write straight to the output instead of building intermediate strings.
+
+    In compact mode the insignificant whitespace of the templates is removed when they are
+    compiled, and the elements of a slot are written without line breaks between them. The
+    shared expressions, if given, are written as references to their named classes. With an
+    instrumentation, every render of a template is counted.
+
+    The templates shared by prefix (for_prefix) are kept for the MAX_SHARED_PREFIXES most
+    recently used prefixes, so a long lived process does not keep every prefix it has seen.
+    """
+    MAX_SHARED_PREFIXES = 16
+
+    _templates_by_prefix = collections.OrderedDict()
+
+    _prefix = None
+    _compact = False
+    _shared_expressions = None
+    _instrumentation = None
+    _compiled_templates = None
+
+    def __init__(self, prefix, compact=False, shared_expressions=None, instrumentation=None):
+        """
+        Initializes the instance for the given prefix. Templates are compiled on first use.
+        """
+        self._prefix = prefix
+        self._compact = compact
+        self._shared_expressions = shared_expressions
+        self._instrumentation = instrumentation
+        self._compiled_templates = {}
+
+    @classmethod
+    def for_prefix(cls, prefix, compact=False):
+        """
+        Returns the shared templates bound to the given prefix, evicting the least recently
+        used ones over MAX_SHARED_PREFIXES.
+        """
+        templates_by_prefix = cls._templates_by_prefix
+        owl_templates = templates_by_prefix.pop((prefix, compact), None)
+        if owl_templates is None:
+            owl_templates = cls(prefix, compact)
+            while len(templates_by_prefix) >= cls.MAX_SHARED_PREFIXES:
+                templates_by_prefix.popitem(last = False)
+        templates_by_prefix[(prefix, compact)] = owl_templates
+        return owl_templates
+
+    def get_prefix(self):
+        return self._prefix
+
+    def is_compact(self):
+        return self._compact
+
+    def get_shared_expressions(self):
+        return self._shared_expressions
+
+    def of(self, owner):
+        """
+        Returns the compiled templates of the given class. Every attribute of the class whose
+        name ends with _TEMPLATE is compiled, using the slots declared in its TEMPLATE_SLOTS.
+        """
+        compiled_templates = self._compiled_templates.get(owner)
+        if compiled_templates is None:
+            compiled_templates = OWLTemplates.CompiledTemplates()
+            compiled_templates.compact = self._compact
+            compiled_templates.separator = '' if self._compact else '\n'
+            compiled_templates.shared_expressions = self._shared_expressions
+            slots = getattr(owner, 'TEMPLATE_SLOTS', {})
+            for name in dir(owner):
+                if name.endswith('_TEMPLATE'):
+                    emitter = self.compile(getattr(owner, name), slots.get(name, ()))
+                    if self._instrumentation is not None:
+                        emitter = self._instrumentation.count_calls(
+                            'render.%s.%s' % (owner.__name__, name), emitter)
+                    setattr(compiled_templates, name, emitter)
+            self._compiled_templates[owner] = compiled_templates
+        return compiled_templates
+
+    def compile(self, template, slots=()):
+        """
+        Compiles the given str.format template into an emitter function. The template is split
+        once, at its slots, into str.format texts with the prefix already in them.
+        """
+        fields = []
+        pieces = []
+        text = ''
+        has_fields = False
+
+        for literal, field, _, _ in string.Formatter().parse(template):
+            if self._compact:
+                literal = compact_xml(literal)
+            text += literal.replace('{', '{{').replace('}', '}}')
+            if field is None:
+                continue
+            if field == 'prefix':
+                text += self._prefix.replace('{', '{{').replace('}', '}}')
+                continue
+            if field not in fields:
+                fields.append(field)
+            if field in slots:
+                pieces.extend(self.build_text_pieces(text, has_fields))
+                pieces.append((None, field))
+                text = ''
+                has_fields = False
+            else:
+                text += '{' + field + '}'
+                has_fields = True
+        pieces.extend(self.build_text_pieces(text, has_fields))
+
+        if len(pieces) == 1 and pieces[0][0] is not None:
+            text, has_fields = pieces[0]
+            if not has_fields:
+                return lambda write, *args, **values: write(text)
+
+            def emit_text(write, *args, **values):
+                if args:
+                    values.update(zip(fields, args))
+                write(text.format(**values))
+            return emit_text
+
+        def emit(write, *args, **values):
+            if args:
+                values.update(zip(fields, args))
+            for text, piece in pieces:
+                if text is None:
+                    slot = values[piece]
+                    if slot is not None:
+                        slot(write)
+                elif piece:
+                    write(text.format(**values))
+                else:
+                    write(text)
+        return emit
+
+    def build_text_pieces(self, text, has_fields):
+        """
+        Returns the piece that writes the given str.format text, if it is not empty: the text
+        itself, without the escaped braces, if it has no fields.
+        """
+        if has_fields:
+            return [(text, True)]
+        if text:
+            return [(text.replace('{{', '{').replace('}}', '}'), False)]
+        return []
+
+    class CompiledTemplates:
+        """
+        Holds the emitters of one class, as attributes named after its templates, the
+        separator to write between the elements of a slot and the shared expressions.
+        """
+        compact = False
+        separator = '\n'
+        shared_expressions = None
@@ -0,0 +1,180 @@
+from src.owl.owl_triples import OWLTripleBuilder
+
+
+class OWLTripleStore:
+    """
+    An in-memory store of the triples of an OWLSpecification, built once and shared by the
+    serializers and queries that work on triples.
+
+    Terms (in n-triples syntax) are dictionary encoded: every distinct term is stored once and
+    triples are tuples of term ids. Triples are kept in the order they were added, grouped by
+    the entity that produced them, and indexed by subject (SPO), predicate (POS) and object (OSP),
+    so any triple pattern is answered from the index of one of its bound terms. The triples of
+    a subject are matched in the order they were added. Adding a triple that is already in the
+    store does nothing.
+    """
+    _terms = None
+    _term_ids = None
+    _triples = None
+    _triple_set = None
+    _entity_starts = None
+    _spo = None
+    _pos = None
+    _osp = None
+
+    def __init__(self):
+        """
+        Initializes an empty store.
+        """
+        self._terms = []
+        self._term_ids = {}
+        self._triples = []
+        self._triple_set = set()
+        self._entity_starts = []
+        self._spo = {}
+        self._pos = {}
+        self._osp = {}
+
+    @staticmethod
+    def from_owl_specification(owl_specification, prefix=None):
+        """
+        Builds the store with the triples of every entity of the given specification, with
+        its prefix or the given one.
+        """
+        triple_store = OWLTripleStore()
+        triple_builder = OWLTripleBuilder(
+            prefix if prefix is not None else owl_specification.get_prefix())
+        for index, entity in enumerate(triple_builder.get_entities(owl_specification)):
+            triple_store.start_entity()
+            for subject, predicate, obj in triple_builder.build_entity_triples(index, entity):
+                triple_store.add(subject, predicate, obj)
+        return triple_store
+
+    def encode(self, term):
+        """
+        Returns the id of the given term, adding it to the dictionary if it is new.
+        """
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+        return term_id
+
+    def decode(self, term_id):
+        return self._terms[term_id]
+
+    def start_entity(self):
+        """
+        Starts the group of triples of a new entity. Entities are numbered from zero.
+        """
+        self._entity_starts.append(len(self._triples))
+
+    def add(self, subject, predicate, obj):
+        """
+        Adds a triple. Returns False if it was already in the store.
+        """
+        triple = (self.encode(subject), self.encode(predicate), self.encode(obj))
+        if triple in self._triple_set:
+            return False
+        self._triple_set.add(triple)
+        self._triples.append(triple)
+        subject_id, predicate_id, object_id = triple
+        self._spo.setdefault(subject_id, []).append((predicate_id, object_id))
+        self._pos.setdefault(predicate_id, {}).setdefault(object_id, []).append(subject_id)
+        self._osp.setdefault(object_id, {}).setdefault(subject_id, []).append(predicate_id)
+        return True
+
+    def __len__(self):
+        return len(self._triples)
+
+    def get_term_count(self):
+        return len(self._terms)
+
+    def get_entity_count(self):
+        return len(self._entity_starts)
+
+    def get_entity_triple_range(self, start, stop):
+        """
+        Returns the range of positions of the triples of the entities between the given indexes.
+        """
+        return self.get_entity_start(start), self.get_entity_start(stop)
+
+    def get_entity_start(self, index):
+        if index < len(self._entity_starts):
+            return self._entity_starts[index]
+        return len(self._triples)
+
+    def get_entity_subject(self, index):
+        """
+        Returns the subject of the first triple of the given entity: the entity itself. Returns
+        None if all the triples of the entity were already in the store.
+        """
+        first, last = self.get_entity_triple_range(index, index + 1)
+        if first == last:
+            return None
+        return self.decode(self._triples[first][0])
+
+    def iter_triples(self, start=0, stop=None):
+        """
+        Yields the triples between the given positions, in the order they were added.
+        """
+        terms = self._terms
+        for subject_id, predicate_id, object_id in self._triples[start:stop]:
+            yield terms[subject_id], terms[predicate_id], terms[object_id]
+
+    def match(self, subject=None, predicate=None, obj=None):
+        """
+        Returns the list of triples that match the given pattern, where None matches any term.
+        """
+        ids = []
+        for term in (subject, predicate, obj):
+            if term is None:
+                ids.append(None)
+            elif term in self._term_ids:
+                ids.append(self._term_ids[term])
+            else:
+                return []
+        subject_id, predicate_id, object_id = ids
+
+        if subject_id is not None:
+            triples = [(subject_id, p, o) for p, o in self._spo.get(subject_id, [])
+                       if (predicate_id is None or p == predicate_id) and
+                       (object_id is None or o == object_id)]
+        elif predicate_id is not None:
+            triples = [(s, predicate_id, o) for o, s in
+                       self.match_index(self._pos, predicate_id, object_id)]
+        elif object_id is not None:
+            triples = [(s, p, object_id) for s, p in self.match_index(self._osp, object_id, None)]
+        else:
+            triples = self._triples
+
+        terms = self._terms
+        return [(terms[s], terms[p], terms[o]) for s, p, o in triples]
+
+    def match_index(self, index, first, second):
+        """
+        Returns the (second, third) id pairs under the first id of a POS or OSP index,
+        restricted to the given second id when it is not None.
+        """
+        entries = index.get(first, {})
+        if second is not None:
+            return [(second, third) for third in entries.get(second, [])]
+        return [(key, third) for key, thirds in entries.items() for third in thirds]
+
+    def get_objects(self, subject, predicate):
+        """
+        Returns the objects of the given subject and predicate, in the order they were added.
+        """
+        return [obj for _, _, obj in self.match(subject, predicate)]
+
+    def get_subjects(self, predicate, obj):
+        """
+        Returns the subjects of the given predicate and object, in the order they were added.
+        """
+        predicate_id = self._term_ids.get(predicate)
+        object_id = self._term_ids.get(obj)
+        if predicate_id is None or object_id is None:
+            return []
+        return [self._terms[subject_id]
+                for subject_id in self._pos.get(predicate_id, {}).get(object_id, [])]
@@ -0,0 +1,293 @@
+import re
+from src.owl.owl_specification import OWLSpecification
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.rule import Rule
+
+
+class OWLTripleBuilder:
+    """
+    Builds the rdf triples of the entities of an OWLSpecification, with the same meaning as the
+    rdf/xml written by their to_owl methods. Terms are written in n-triples syntax: iris between
+    angle brackets, blank nodes as _:label and typed literals.
+
+    The triples of every entity (object property, data property or class) are built on their
+    own. Blank node labels include the index of the entity, so the triples of different entities
+    can be built separately and joined without clashes.
+    """
+    RDF = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+    RDFS = 'http://www.w3.org/2000/01/rdf-schema#'
+    OWL = 'http://www.w3.org/2002/07/owl#'
+    XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+    RDF_TYPE = '<' + RDF + 'type>'
+    RDF_FIRST = '<' + RDF + 'first>'
+    RDF_REST = '<' + RDF + 'rest>'
+    RDF_NIL = '<' + RDF + 'nil>'
+    RDFS_SUB_CLASS_OF = '<' + RDFS + 'subClassOf>'
+    RDFS_DOMAIN = '<' + RDFS + 'domain>'
+    RDFS_RANGE = '<' + RDFS + 'range>'
+    OWL_ONTOLOGY = '<' + OWL + 'Ontology>'
+    OWL_CLASS = '<' + OWL + 'Class>'
+    OWL_OBJECT_PROPERTY = '<' + OWL + 'ObjectProperty>'
+    OWL_DATATYPE_PROPERTY = '<' + OWL + 'DatatypeProperty>'
+    OWL_RESTRICTION = '<' + OWL + 'Restriction>'
+    OWL_EQUIVALENT_CLASS = '<' + OWL + 'equivalentClass>'
+    OWL_EQUIVALENT_PROPERTY = '<' + OWL + 'equivalentProperty>'
+    OWL_ON_PROPERTY = '<' + OWL + 'onProperty>'
+    OWL_ON_CLASS = '<' + OWL + 'onClass>'
+    OWL_ALL_VALUES_FROM = '<' + OWL + 'allValuesFrom>'
+    OWL_SOME_VALUES_FROM = '<' + OWL + 'someValuesFrom>'
+    OWL_INTERSECTION_OF = '<' + OWL + 'intersectionOf>'
+    OWL_UNION_OF = '<' + OWL + 'unionOf>'
+    XSD_NON_NEGATIVE_INTEGER = '<' + XSD + 'nonNegativeInteger>'
+
+    # characters that can not appear in an n-triples iri
+    IRI_ESCAPES = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+    _prefix = None
+
+    def __init__(self, prefix):
+        """
+        Initializes the builder with the prefix of the ontology.
+        """
+        self._prefix = prefix
+
+    def get_prefix(self):
+        return self._prefix
+
+    def iri(self, name):
+        """
+        Returns the n-triples term of the iri of the given name in the ontology.
+        """
+        return '<' + self.IRI_ESCAPES.sub(self.escape_iri_character, self._prefix + '#' + name) + '>'
+
+    def ontology_iri(self):
+        """
+        Returns the n-triples term of the iri of the ontology, which is the prefix.
+        """
+        return '<' + self.IRI_ESCAPES.sub(self.escape_iri_character, self._prefix) + '>'
+
+    def build_ontology_triple(self):
+        """
+        Returns the triple that declares the ontology, which the rdf/xml output writes as its
+        owl:Ontology element.
+        """
+        return (self.ontology_iri(), self.RDF_TYPE, self.OWL_ONTOLOGY)
+
+    def escape_iri_character(self, match):
+        return '%%%02X' % ord(match.group(0))
+
+    def literal(self, value, datatype):
+        """
+        Returns the n-triples term of a typed literal.
+        """
+        value = value.strip().replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '"' + value + '"^^' + datatype
+
+    def get_entities(self, owl_specification):
+        """
+        Returns the entities of the specification, in the order they are serialized:
+        first the object and data properties, then the classes.
+        """
+        return owl_specification.get_object_properties() + owl_specification.get_classes()
+
+    def iter_triples(self, owl_specification):
+        """
+        Yields the triple of the ontology and the triples of all the entities of the given
+        specification.
+        """
+        yield self.build_ontology_triple()
+        for index, entity in enumerate(self.get_entities(owl_specification)):
+            for triple in self.build_entity_triples(index, entity):
+                yield triple
+
+    def build_entity_triples(self, entity_index, entity):
+        """
+        Returns the list of triples of the given entity.
+        """
+        triples = OWLTripleBuilder.EntityTriples(entity_index)
+        if isinstance(entity, OWLSpecification.OWLClassSpecification):
+            self.build_class_triples(triples, entity)
+        elif isinstance(entity, OWLSpecification.OWLDataPropertySpecification):
+            self.build_data_property_triples(triples, entity)
+        else:
+            self.build_object_property_triples(triples, entity)
+        return triples.get_triples()
+
+    def build_object_property_triples(self, triples, object_property):
+        subject = self.iri(object_property.get_name())
+        triples.add(subject, self.RDF_TYPE, self.OWL_OBJECT_PROPERTY)
+        if object_property.get_equivalent_to() is not None:
+            triples.add(subject, self.OWL_EQUIVALENT_PROPERTY,
+                        self.iri(object_property.get_equivalent_to()))
+        else:
+            triples.add(subject, self.RDFS_RANGE, self.iri(object_property.get_range()))
+            triples.add(subject, self.RDFS_DOMAIN, self.iri(object_property.get_domain()))
+
+    def build_data_property_triples(self, triples, data_property):
+        subject = self.iri(data_property.get_name())
+        triples.add(subject, self.RDF_TYPE, self.OWL_DATATYPE_PROPERTY)
+        triples.add(subject, self.RDFS_DOMAIN, self.iri(data_property.get_domain()))
+        triples.add(subject, self.RDFS_RANGE, '<' + self.XSD + data_property.get_range_xsd() + '>')
+
+    def build_class_triples(self, triples, owl_class):
+        subject = self.iri(owl_class.get_classname())
+        triples.add(subject, self.RDF_TYPE, self.OWL_CLASS)
+
+        for parent in owl_class.get_sub_class_of():
+            triples.add(subject, self.RDFS_SUB_CLASS_OF, self.iri(parent))
+
+        for synonym in owl_class.get_synonym_equivalences():
+            triples.add(subject, self.OWL_EQUIVALENT_CLASS, self.iri(synonym))
+
+        for logical_operation in owl_class.get_equivalence_rules():
+            triples.add(subject, self.OWL_EQUIVALENT_CLASS,
+                        self.build_equivalence_class_expression(triples, logical_operation))
+
+        for logical_operation in owl_class.get_sub_class_of_expressions():
+            triples.add(subject, self.RDFS_SUB_CLASS_OF,
+                        self.build_sub_class_of_expression(triples, owl_class, logical_operation))
+
+    def build_equivalence_class_expression(self, triples, logical_operation):
+        """
+        Builds the class expression of a definition and returns its node.
+        """
+        return self.build_class_expression(
+            triples, logical_operation,
+            lambda rule: self.build_all_values_from_restriction(triples, rule))
+
+    def build_sub_class_of_expression(self, triples, owl_class, logical_operation):
+        """
+        Builds the class expression of a necessity and returns its node.
+        """
+        return self.build_class_expression(
+            triples, logical_operation,
+            lambda rule: self.build_cardinality_restriction(triples, owl_class, rule))
+
+    def build_class_expression(self, triples, logical_operation, build_restriction):
+        """
+        Builds the class expression of a logical operation, with the given function for its
+        rules, and returns its node. Nested operations are built with an explicit stack, so any
+        depth is supported: an operation is built when all its operators are.
+        """
+        # the operation, the position of its next operator and its member nodes
+        stack = [[logical_operation, 0, []]]
+        while True:
+            frame = stack[-1]
+            operation, position, members = frame
+            operators = operation.get_logical_operators()
+            if position < len(operators):
+                frame[1] = position + 1
+                if isinstance(operators[position], LogicalOperation):
+                    stack.append([operators[position], 0, []])
+                else:
+                    members.append(build_restriction(operators[position]))
+                continue
+            stack.pop()
+            if operation.is_single_clause():
+                node = members[0]
+            else:
+                node = self.build_compound_class(triples, operation.is_conjunction(), members)
+            if not stack:
+                return node
+            stack[-1][2].append(node)
+
+    def build_all_values_from_restriction(self, triples, rule):
+        restriction = triples.new_blank_node()
+        triples.add(restriction, self.RDF_TYPE, self.OWL_RESTRICTION)
+        triples.add(restriction, self.OWL_ON_PROPERTY, self.iri(rule.get_verb()))
+        triples.add(restriction, self.OWL_ALL_VALUES_FROM, self.build_range(triples, rule.get_rule_range()))
+        return restriction
+
+    def build_cardinality_restriction(self, triples, owl_class, rule):
+        """
+        Builds the restriction of a necessity, for the kind of its quantification, and returns
+        its node. A cardinality range is the intersection of two restrictions.
+        """
+        quantification = rule.get_quantification()
+        kind = quantification.get_kind() if quantification is not None else None
+        if kind == Rule.Quantification.RANGE:
+            minimum, maximum = owl_class.get_quantification_bounds(rule)
+            return self.build_compound_class(triples, True, [
+                self.build_qualified_cardinality_restriction(
+                    triples, rule, 'minQualifiedCardinality', minimum),
+                self.build_qualified_cardinality_restriction(
+                    triples, rule, 'maxQualifiedCardinality', maximum)])
+        if kind == Rule.Quantification.EXISTENTIAL:
+            restriction = triples.new_blank_node()
+            triples.add(restriction, self.RDF_TYPE, self.OWL_RESTRICTION)
+            triples.add(restriction, self.OWL_ON_PROPERTY, self.iri(rule.get_verb()))
+            triples.add(restriction, self.OWL_SOME_VALUES_FROM,
+                        self.build_range(triples, rule.get_rule_range()))
+            return restriction
+        if kind == Rule.Quantification.UNIVERSAL:
+            return self.build_all_values_from_restriction(triples, rule)
+        cardinality = owl_class.get_quantification_cardinality(quantification) \
+            if quantification is not None else None
+        if cardinality is None:
+            raise ValueError('Unsupported quantification of a necessity: %s' % (
+                quantification.get_type() if quantification is not None else None))
+        return self.build_qualified_cardinality_restriction(
+            triples, rule, cardinality, owl_class.get_cardinality(rule))
+
+    def build_qualified_cardinality_restriction(self, triples, rule, cardinality, value):
+        restriction = triples.new_blank_node()
+        triples.add(restriction, self.RDF_TYPE, self.OWL_RESTRICTION)
+        triples.add(restriction, self.OWL_ON_PROPERTY, self.iri(rule.get_verb()))
+        triples.add(restriction, self.OWL_ON_CLASS, self.build_range(triples, rule.get_rule_range()))
+        triples.add(restriction, '<' + self.OWL + cardinality + '>',
+                    self.literal(str(value), self.XSD_NON_NEGATIVE_INTEGER))
+        return restriction
+
+    def build_range(self, triples, rule_range):
+        """
+        Returns the node of the range of a rule: a named class or a union or intersection of them.
+        """
+        if rule_range.is_noun_concept():
+            return self.iri(rule_range.get_range())
+        return self.build_compound_class(
+            triples, rule_range.is_conjunction(),
+            [self.iri(classname) for classname in rule_range.get_range()])
+
+    def build_compound_class(self, triples, is_conjunction, members):
+        compound_class = triples.new_blank_node()
+        triples.add(compound_class, self.RDF_TYPE, self.OWL_CLASS)
+        triples.add(compound_class, self.OWL_INTERSECTION_OF if is_conjunction else self.OWL_UNION_OF,
+                    self.build_list(triples, members))
+        return compound_class
+
+    def build_list(self, triples, members):
+        """
+        Builds an rdf collection with the given members and returns its first node.
+        """
+        if not members:
+            return self.RDF_NIL
+        nodes = [triples.new_blank_node() for _ in members]
+        for index, member in enumerate(members):
+            triples.add(nodes[index], self.RDF_FIRST, member)
+            triples.add(nodes[index], self.RDF_REST,
+                        nodes[index + 1] if index + 1 < len(nodes) else self.RDF_NIL)
+        return nodes[0]
+
+    class EntityTriples:
+        """
+        Collects the triples of one entity and labels its blank nodes.
+        """
+        _entity_index = None
+        _triples = None
+        _blank_nodes = 0
+
+        def __init__(self, entity_index):
+            self._entity_index = entity_index
+            self._triples = []
+            self._blank_nodes = 0
+
+        def new_blank_node(self):
+            self._blank_nodes += 1
+            return '_:e%db%d' % (self._entity_index, self._blank_nodes)
+
+        def add(self, subject, predicate, obj):
+            self._triples.append((subject, predicate, obj))
+
+        def get_triples(self):
+            return self._triples
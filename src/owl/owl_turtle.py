@@ -0,0 +1,132 @@
+import re
+from src.owl.owl_output_options import OWLOutputOptions
+from src.owl.owl_triples import OWLTripleBuilder
+from src.owl.owl_triple_store import OWLTripleStore
+
+
+class OWLTurtleSerializer:
+    """
+    Writes an OWLSpecification (or the OWLTripleStore built from it) as turtle, grouping the
+    triples of every entity under its subject, with prefixed names, nested blank nodes and
+    collections.
+    """
+    NAMESPACES = (('rdf', OWLTripleBuilder.RDF),
+                  ('rdfs', OWLTripleBuilder.RDFS),
+                  ('owl', OWLTripleBuilder.OWL),
+                  ('xsd', OWLTripleBuilder.XSD))
+
+    LOCAL_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_\-]*$')
+
+    # the kinds of the nodes pending on the render stack
+    PREDICATE_OBJECTS = 'predicate-objects'
+    OBJECT = 'object'
+
+    _prefix = None
+    _namespaces = None
+
+    def __init__(self, prefix):
+        """
+        Initializes the serializer with the prefix of the ontology, which is the default
+        namespace of the document and must be absolute.
+        """
+        OWLOutputOptions.check_triples_prefix(prefix)
+        self._prefix = prefix
+        self._namespaces = [('', prefix + '#')] + list(self.NAMESPACES)
+
+    def write(self, owl_specification, output_file):
+        """
+        Writes the turtle document of the specification to the given file.
+        """
+        self.write_store(OWLTripleStore.from_owl_specification(owl_specification, self._prefix),
+                         output_file)
+
+    def write_store(self, triple_store, output_file):
+        """
+        Writes the turtle document of the triples of the store to the given file.
+        """
+        for name, namespace in self._namespaces:
+            output_file.write('@prefix %s: <%s> .\n' % (name, namespace))
+        output_file.write('\n')
+        output_file.write('%s a owl:Ontology .\n\n'
+                          % OWLTripleBuilder(self._prefix).build_ontology_triple()[0])
+
+        # every subject is written once, with all its triples, even if several entities share it
+        written_subjects = set()
+        for index in range(triple_store.get_entity_count()):
+            subject = triple_store.get_entity_subject(index)
+            if subject is not None and subject not in written_subjects:
+                written_subjects.add(subject)
+                output_file.write(self.render_entity(triple_store, subject))
+
+    def render_entity(self, triple_store, subject):
+        """
+        Renders the triples of one entity. The blank nodes of an entity are used once each,
+        so they are written nested inside the node that refers to them. Nested nodes are
+        rendered with an explicit stack of pending texts and nodes, so any depth is supported.
+        """
+        owl = [self.render_term(subject), ' ']
+        stack = [' .\n\n', (self.PREDICATE_OBJECTS, subject, 1)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, tuple):
+                stack.extend(reversed(self.expand(triple_store, *item)))
+            else:
+                owl.append(item)
+        return ''.join(owl)
+
+    def expand(self, triple_store, kind, node, depth):
+        """
+        Returns the texts and the nodes (kind, node, depth) a node is rendered as, in order.
+        """
+        if kind == self.PREDICATE_OBJECTS:
+            items = []
+            for index, (_, predicate, obj) in enumerate(triple_store.match(node)):
+                if index > 0:
+                    items.append(' ;\n' + '    ' * depth)
+                items.extend([self.render_predicate(predicate) + ' ', (self.OBJECT, obj, depth)])
+            return items
+        if not node.startswith('_:'):
+            return [self.render_term(node)]
+        if self.is_list(triple_store, node):
+            items = ['( ']
+            for member in self.list_members(triple_store, node):
+                items.extend([(self.OBJECT, member, depth), ' '])
+            items.append(')')
+            return items
+        return ['[\n' + '    ' * (depth + 1), (self.PREDICATE_OBJECTS, node, depth + 1),
+                '\n' + '    ' * depth + ']']
+
+    def is_list(self, triple_store, node):
+        return [predicate for _, predicate, _ in triple_store.match(node)] == \
+            [OWLTripleBuilder.RDF_FIRST, OWLTripleBuilder.RDF_REST]
+
+    def list_members(self, triple_store, node):
+        members = []
+        while node != OWLTripleBuilder.RDF_NIL:
+            (_, _, member), (_, _, node) = triple_store.match(node)
+            members.append(member)
+        return members
+
+    def render_predicate(self, predicate):
+        if predicate == OWLTripleBuilder.RDF_TYPE:
+            return 'a'
+        return self.render_term(predicate)
+
+    def render_term(self, term):
+        """
+        Abbreviates an iri, or the datatype of a literal, with the namespace prefixes.
+        """
+        if term.startswith('<'):
+            return self.render_iri(term)
+        if term.startswith('"'):
+            value, _, datatype = term.rpartition('^^')
+            return value + '^^' + self.render_iri(datatype)
+        return term
+
+    def render_iri(self, iri):
+        for name, namespace in self._namespaces:
+            if iri.startswith('<' + namespace):
+                local_name = iri[len(namespace) + 1:-1]
+                if self.LOCAL_NAME.match(local_name):
+                    return name + ':' + local_name
+        return iri
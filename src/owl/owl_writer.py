@@ -0,0 +1,112 @@
+from src.owl.owl_file import OWLFile
+from src.owl.owl_templates import compact_xml
+
+
+class OWLWriter(OWLFile):
+    """
+    Streams an owl document to a file object. The header, every fragment and the footer are
+    written as they come, through a small buffer, so the whole document is never held in memory.
+    In compact mode the document is written without insignificant whitespace.
+    """
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    _output_file = None
+    _buffer = None
+    _buffered_size = 0
+    _buffer_size = None
+    _bytes_written = 0
+    _compact = False
+
+    def __init__(self, output_file, buffer_size=DEFAULT_BUFFER_SIZE, compact=False):
+        """
+        Initializes the writer over an already opened output file.
+        """
+        self._output_file = output_file
+        self._buffer = []
+        self._buffered_size = 0
+        self._buffer_size = buffer_size
+        self._bytes_written = 0
+        self._compact = compact
+
+    def get_bytes_written(self):
+        return self._bytes_written
+
+    def write(self, text):
+        """
+        Appends the given text to the buffer, flushing it when it reaches the buffer size.
+        """
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+        if self._buffered_size >= self._buffer_size:
+            self.write_buffer()
+
+    def write_buffer(self):
+        """
+        Writes the buffered text to the output file, without flushing the file itself, so
+        compressing output files are not forced to end their blocks.
+        """
+        if self._buffer:
+            self._output_file.write(''.join(self._buffer))
+            self._bytes_written += self._buffered_size
+            self._buffer = []
+            self._buffered_size = 0
+
+    def flush(self):
+        """
+        Writes the buffered text to the output file and flushes it.
+        """
+        self.write_buffer()
+        self._output_file.flush()
+
+    def write_header(self, prefix, imports=None):
+        """
+        Writes everything that goes before the owl fragments: the xml version, the doctype,
+        the rdf namespaces and the ontology declaration, which imports the given ontologies.
+        """
+        if imports:
+            owl_ontology = self.OWL_ONTOLOGY_WITH_IMPORTS.format(
+                prefix = prefix,
+                imports = '\n'.join(self.OWL_IMPORTS.format(ontology = ontology)
+                                    for ontology in imports))
+            if self._compact:
+                owl_ontology = compact_xml(owl_ontology)
+        else:
+            owl_ontology = self.OWL_ONTOLOGY.format(prefix = prefix)
+        if self._compact:
+            self.write(self.XML_VERSION)
+            self.write(compact_xml(self.OWL_DOCTYPE))
+            self.write(compact_xml(self.OWL_RDF_NAMESPACES_HEADER))
+            self.write(owl_ontology)
+        else:
+            self.write(self.XML_VERSION + '\n')
+            self.write(self.OWL_DOCTYPE + '\n')
+            self.write(self.OWL_RDF_NAMESPACES_HEADER)
+            self.write('\n\n' + owl_ontology + '\n\n')
+
+    def write_fragments(self, fragments):
+        """
+        Writes each one of the given owl fragments, one after the other.
+        """
+        separator = '' if self._compact else '\n'
+        for fragment in fragments:
+            self.write(separator)
+            self.write(fragment)
+
+    def write_footer(self):
+        """
+        Closes the rdf element and flushes the buffer.
+        """
+        if self._compact:
+            self.write(compact_xml(self.OWL_RDF_NAMESPACES_FOOTER) + '\n')
+        else:
+            self.write('\n\n')
+            self.write(self.OWL_RDF_NAMESPACES_FOOTER + '\n')
+        self.flush()
+
+    def write_document(self, prefix, fragments, imports=None):
+        """
+        Writes a complete owl document with the given fragments.
+        """
+        self.write_header(prefix, imports)
+        self.write_fragments(fragments)
+        self.write_footer()
@@ -42,3 +42,8 @@ class BinaryVerbConceptRule:
 
         def get_xsd_type(self):
             return self._xsd_type
+
+
+# the nested class is also a module attribute, so pickle can find it when parsed terms are
+# spilled to disk
+BinaryVerbConceptRuleRole = BinaryVerbConceptRule.BinaryVerbConceptRuleRole
@@ -1,37 +1,105 @@
-class LogicalOperation:
-    """
-    This class holds an logical operation, which can be a conjunction, a disjunction, or a single clause.
-    """
-    _type = None
-    _logical_operators = None
-
-    def __init__(self, logical_operation_type):
-        self._type = logical_operation_type
-        self._logical_operators = []
-
-    def add_logical_operator(self, operator):
-        self._logical_operators.append(operator)        
-
-    def get_logical_operators(self):
-        return self._logical_operators
-
-    def set_logical_operators(self, logical_operators):
-        self._logical_operators = logical_operators
-    
-    def is_conjunction(self):
-        """
-        Returns true if this logical operation is a conjunction.
-        """
-        return 'conjunction' == self._type
-
-    def is_disjunction(self):
-        """
-        Returns true if this logical operation is a disjunction.
-        """
-        return 'disjunction' == self._type
-
-    def is_single_clause(self):
-        """ 
-        Returns true if this term is a single logical clause.
-        """
-        return not self.is_disjunction() and not self.is_conjunction()
+class LogicalOperation:
+    """
+    This class holds an logical operation, which can be a conjunction, a disjunction, or a single clause.
+    The operators of a conjunction or a disjunction are rules or nested logical operations.
+    """
+    _type = None
+    _logical_operators = None
+
+    def __init__(self, logical_operation_type):
+        self._type = logical_operation_type
+        self._logical_operators = []
+
+    def get_type(self):
+        return self._type
+
+    def add_logical_operator(self, operator):
+        self._logical_operators.append(operator)        
+
+    def get_logical_operators(self):
+        return self._logical_operators
+
+    def set_logical_operators(self, logical_operators):
+        self._logical_operators = logical_operators
+    
+    def is_conjunction(self):
+        """
+        Returns true if this logical operation is a conjunction.
+        """
+        return 'conjunction' == self._type
+
+    def is_disjunction(self):
+        """
+        Returns true if this logical operation is a disjunction.
+        """
+        return 'disjunction' == self._type
+
+    def is_single_clause(self):
+        """ 
+        Returns true if this term is a single logical clause.
+        """
+        return not self.is_disjunction() and not self.is_conjunction()
+
+    def iter_operations(self):
+        """
+        Yields this operation and its nested operations, every operation after the ones nested
+        in it. The operations are walked with an explicit stack, so any depth is supported.
+        """
+        stack = [(self, False)]
+        while stack:
+            operation, expanded = stack.pop()
+            if expanded:
+                yield operation
+                continue
+            stack.append((operation, True))
+            for operator in reversed(operation._logical_operators):
+                if isinstance(operator, LogicalOperation):
+                    stack.append((operator, False))
+
+    def iter_rules(self):
+        """
+        Yields the rules of this operation and of its nested operations, in order.
+        """
+        stack = [iter(self._logical_operators)]
+        while stack:
+            for operator in stack[-1]:
+                if isinstance(operator, LogicalOperation):
+                    stack.append(iter(operator._logical_operators))
+                    break
+                yield operator
+            else:
+                stack.pop()
+
+    def canonicalize(self):
+        """
+        Canonicalizes the operators and sorts them, in this operation and in the nested ones.
+        Conjunctions and disjunctions do not depend on the order of their operators, so this
+        does not change the meaning of the operation.
+        """
+        sort_keys = {}
+        for operation in self.iter_operations():
+            for operator in operation._logical_operators:
+                if not isinstance(operator, LogicalOperation):
+                    operator.canonicalize()
+                    sort_keys[id(operator)] = operator.get_sort_key()
+            operation._logical_operators = sorted(operation._logical_operators,
+                                                  key = lambda operator: sort_keys[id(operator)])
+            sort_keys[id(operation)] = operation.build_sort_key(sort_keys)
+
+    def get_sort_key(self):
+        """
+        Returns a key that orders logical operations by type and then by operators.
+        """
+        sort_keys = {}
+        for operation in self.iter_operations():
+            for operator in operation._logical_operators:
+                if not isinstance(operator, LogicalOperation):
+                    sort_keys[id(operator)] = operator.get_sort_key()
+            sort_keys[id(operation)] = operation.build_sort_key(sort_keys)
+        return sort_keys[id(self)]
+
+    def build_sort_key(self, sort_keys):
+        """
+        Returns the sort key of this operation, given the sort keys of its operators by id.
+        """
+        return (self._type or '', tuple(sort_keys[id(operator)] for operator in self._logical_operators))
@@ -0,0 +1,128 @@
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.rule import Rule
+
+
+class LogicalOperationNormalizer:
+    """
+    Rewrites logical operations, with their rules and rule ranges, in a canonical form:
+
+    - the operators of conjunctions and disjunctions, and the noun concepts of collection
+      ranges, are sorted and repeated ones are removed,
+    - operations with a single operator become single clauses, and collection ranges with a
+      single noun concept become noun concept ranges,
+    - operations nested in an operation of the same type are flattened into it, and single
+      clauses nested in an operation are replaced by their operator.
+
+    Rules sort by their sort key, before the nested operations, which keep the order they were
+    first normalized in. Results are memoized by a structural key, so equivalent operations,
+    rules and ranges normalized by the same normalizer are the same object. The key of an
+    operation refers to its nested operations by number, so keys stay flat whatever the depth,
+    and nested operations are normalized with an explicit stack. Normalized objects are shared:
+    they must not be modified.
+    """
+    SINGLE_CLAUSE = 'single-clause'
+
+    _logical_operations = None
+    _rules = None
+    _rule_ranges = None
+    _keys = None
+
+    def __init__(self):
+        """
+        Initializes the normalizer with empty memos.
+        """
+        self._logical_operations = {}
+        self._rules = {}
+        self._rule_ranges = {}
+        self._keys = {}
+
+    def __len__(self):
+        """
+        Returns the number of distinct normalized operations, rules and ranges.
+        """
+        return len(self._logical_operations) + len(self._rules) + len(self._rule_ranges)
+
+    def normalize(self, logical_operation):
+        """
+        Returns the normalized logical operation.
+        """
+        normalized_operations = {}
+        for operation in logical_operation.iter_operations():
+            normalized_operations[id(operation)] = self.normalize_operation(
+                operation, normalized_operations)
+        return normalized_operations[id(logical_operation)]
+
+    def normalize_operation(self, logical_operation, normalized_operations):
+        """
+        Returns the normalized logical operation, given the normalized operations nested in it
+        by id.
+        """
+        operators = {}
+        for operator in logical_operation.get_logical_operators():
+            for normalized_operator in self.normalize_operator(operator, logical_operation,
+                                                               normalized_operations):
+                operators.setdefault(self._keys[id(normalized_operator)], normalized_operator)
+
+        if len(operators) == 1:
+            operator = list(operators.values())[0]
+            if isinstance(operator, LogicalOperation):
+                return operator
+            operation_type = self.SINGLE_CLAUSE
+        else:
+            operation_type = logical_operation.get_type()
+        key = (operation_type or '', tuple(sorted(operators)))
+
+        normalized = self._logical_operations.get(key)
+        if normalized is None:
+            normalized = LogicalOperation(operation_type)
+            normalized.set_logical_operators([operators[operator_key]
+                                              for operator_key in sorted(operators)])
+            self._logical_operations[key] = normalized
+            self._keys[id(normalized)] = (1, len(self._logical_operations))
+        return normalized
+
+    def normalize_operator(self, operator, logical_operation, normalized_operations):
+        """
+        Returns the list of the normalized operators that replace the given operator of the
+        given operation: the operators of a nested operation of the same type (or of a nested
+        single clause), else the normalized operator.
+        """
+        if not isinstance(operator, LogicalOperation):
+            return [self.normalize_rule(operator)]
+        normalized = normalized_operations[id(operator)]
+        if normalized.is_single_clause() or normalized.get_type() == logical_operation.get_type():
+            return normalized.get_logical_operators()
+        return [normalized]
+
+    def normalize_rule(self, rule):
+        """
+        Returns the normalized rule, with its range normalized.
+        """
+        normalized = Rule()
+        normalized.domain_noun_concept = rule.domain_noun_concept
+        normalized.set_verb(rule.get_verb())
+        normalized.set_quantification(rule.get_quantification())
+        if rule.get_rule_range() is not None:
+            normalized.set_rule_range(self.normalize_rule_range(rule.get_rule_range()))
+        key = (0, normalized.get_sort_key(), rule.get_quantification() is None)
+        if key not in self._rules:
+            self._rules[key] = normalized
+            self._keys[id(normalized)] = key
+        return self._rules[key]
+
+    def normalize_rule_range(self, rule_range):
+        """
+        Returns the normalized rule range.
+        """
+        normalized = Rule.RuleRange()
+        if rule_range.is_noun_concept():
+            normalized.set_noun_concept(rule_range.get_range())
+        else:
+            noun_concepts = sorted(set(rule_range.get_range()))
+            if len(noun_concepts) == 1:
+                normalized.set_noun_concept(noun_concepts[0])
+            elif rule_range.is_conjunction():
+                normalized.set_conjunction(noun_concepts)
+            else:
+                normalized.set_disjunction(noun_concepts)
+        return self._rule_ranges.setdefault(normalized.get_sort_key(), normalized)
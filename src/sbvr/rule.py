@@ -47,6 +47,24 @@ class Rule:
     def set_rule_range(self, rule_range):
         self.rule_range = rule_range
 
+    def canonicalize(self):
+        """
+        Sorts the noun concepts of the range, if it is a collection.
+        """
+        if self.rule_range is not None:
+            self.rule_range.canonicalize()
+
+    def get_sort_key(self):
+        """
+        Returns a key that orders rules by verb, quantification and range.
+        """
+        quantification_key = ('', '')
+        if self.quantification is not None:
+            quantification_key = (self.quantification.get_type() or '',
+                                  self.quantification.get_value() or '')
+        range_key = self.rule_range.get_sort_key() if self.rule_range is not None else ()
+        return (self.verb or '', quantification_key, range_key)
+
     def __eq__(self, another_rule):
         if self.verb != another_rule.verb:
             return False
@@ -73,10 +91,35 @@ class Rule:
         """ 
         This class holds the quantification element of the SBVR rules. It has a type, which can be, 
         for example, 'Universal', and a text, which can be, in this case 'Each'.
+
+        The type is resolved to its kind when it is set, through QUANTIFICATION_KINDS, and the
+        value to the bounds of the cardinality (a number, or 'N..M' for a range), so nothing is
+        parsed again when the rule is written. Unknown types and invalid values raise ValueError.
         """
-        
+        AT_LEAST = 'at-least'
+        AT_MOST = 'at-most'
+        EXACTLY = 'exactly'
+        RANGE = 'range'
+        EXISTENTIAL = 'existential'
+        UNIVERSAL = 'universal'
+
+        # the kind of every sbvr-quantification type
+        QUANTIFICATION_KINDS = {
+            'at-least-N': AT_LEAST,
+            'at-most-N': AT_MOST,
+            'exactly-N': EXACTLY,
+            'at-least-N-and-at-most-M': RANGE,
+            'existential': EXISTENTIAL,
+            'existencial': EXISTENTIAL,
+            'universal': UNIVERSAL,
+        }
+
+        RANGE_SEPARATOR = '..'
+
         quantification_type = None
         quantification_value = ''
+        _kind = None
+        _bounds = None
         
         # def __init__(self, quantification_type, quantification_value):
         #     """
@@ -91,11 +134,61 @@ class Rule:
         def get_value(self):
             return self.quantification_value
         
+        def get_kind(self):
+            """
+            Returns the kind of the quantification, one of the values of QUANTIFICATION_KINDS,
+            or None if it has no type.
+            """
+            return self._kind
+
+        def get_bounds(self):
+            """
+            Returns the minimum and maximum cardinality of the quantification (None for a
+            missing bound), or None if its value is not set yet.
+            """
+            return self._bounds
+
         def set_quantification_type(self, quantification_type):
+            if quantification_type is not None and \
+                    quantification_type not in self.QUANTIFICATION_KINDS:
+                raise ValueError('Unknown quantification type: ' + str(quantification_type))
             self.quantification_type = quantification_type
+            self._kind = self.QUANTIFICATION_KINDS.get(quantification_type)
+            self._bounds = self.parse_bounds(self.quantification_value)
 
         def set_quantification_value(self, quantification_value):
             self.quantification_value = quantification_value
+            self._bounds = self.parse_bounds(quantification_value)
+
+        def parse_bounds(self, value):
+            """
+            Returns the (minimum, maximum) cardinality of the given value for the kind of this
+            quantification.
+            """
+            if self._kind == self.EXISTENTIAL:
+                return (1, None)
+            if self._kind not in (self.AT_LEAST, self.AT_MOST, self.EXACTLY, self.RANGE):
+                return (None, None)
+            if value is None or not value.strip():
+                return None
+            try:
+                if self._kind == self.RANGE:
+                    minimum, _, maximum = value.partition(self.RANGE_SEPARATOR)
+                    bounds = (int(minimum), int(maximum))
+                    if bounds[0] < 0 or bounds[0] > bounds[1]:
+                        raise ValueError(value)
+                    return bounds
+                cardinality = int(value)
+                if cardinality < 0:
+                    raise ValueError(value)
+            except ValueError:
+                raise ValueError('Invalid value of a %s quantification: %s'
+                                 % (self.quantification_type, value))
+            if self._kind == self.AT_LEAST:
+                return (cardinality, None)
+            if self._kind == self.AT_MOST:
+                return (None, cardinality)
+            return (cardinality, cardinality)
 
         def __eq__(self, another_quantification):
             if another_quantification == None:
@@ -221,3 +314,28 @@ class Rule:
             self._range_noun_concept = None
             self._conjunction = conjunction
 
+        def canonicalize(self):
+            """
+            Sorts the noun concepts of a disjunction or a conjunction.
+            """
+            if self._disjunction is not None:
+                self._disjunction = sorted(self._disjunction)
+            if self._conjunction is not None:
+                self._conjunction = sorted(self._conjunction)
+
+        def get_sort_key(self):
+            """
+            Returns a key that orders ranges by kind and then by noun concepts.
+            """
+            if self.is_noun_concept():
+                return (0, (self._range_noun_concept,))
+            if self.is_conjunction():
+                return (1, tuple(self._conjunction))
+            return (2, tuple(self._disjunction or ()))
+
+
+
+# the nested classes are also module attributes, so pickle can find them when parsed terms
+# are spilled to disk
+Quantification = Rule.Quantification
+RuleRange = Rule.RuleRange
@@ -0,0 +1,362 @@
+import sqlite3
+import xml.etree.ElementTree as ET
+from binary_verb_concept_rule import BinaryVerbConceptRule
+from logicaloperation import LogicalOperation
+from rule import Rule
+from sbvrspecification import SBVRSpecification
+from sbvrterm import SBVRTerm
+
+
+class SBVRRepository:
+    """
+    A persistent store of SBVR terms in a sqlite database, so a large glossary is imported once
+    and then only the terms that are needed, such as the subtree of a general concept, are loaded
+    into an SBVRSpecification to be transformed.
+
+    Terms are stored in document order with their necessity and definition split in tables:
+    logical operations (nested ones point to their parent), rules, the noun concepts of the
+    rule ranges and the roles of the verb concepts. Terms are indexed by name and general
+    concept, and rules by verb. Empty logical operators (parsed as None) are not stored, and
+    terms whose necessity or definition is not a logical operation (or the roles of a verb
+    concept) are rejected.
+    """
+    NECESSITY = 'necessity'
+    DEFINITION = 'definition'
+
+    NOUN_CONCEPT = 'noun-concept'
+    CONJUNCTION = 'conjunction'
+    DISJUNCTION = 'disjunction'
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, name TEXT, '
+        'general_concept TEXT, concept_type TEXT, synonym TEXT, verb_necessity INTEGER)',
+        'CREATE TABLE IF NOT EXISTS logical_operations (id INTEGER PRIMARY KEY, '
+        'term_id INTEGER, part TEXT, parent_id INTEGER, position INTEGER, type TEXT)',
+        'CREATE TABLE IF NOT EXISTS rules (id INTEGER PRIMARY KEY, term_id INTEGER, '
+        'operation_id INTEGER, position INTEGER, verb TEXT, has_quantification INTEGER, '
+        'quantification_type TEXT, quantification_value TEXT, range_kind TEXT)',
+        'CREATE TABLE IF NOT EXISTS ranges (rule_id INTEGER, position INTEGER, concept TEXT)',
+        'CREATE TABLE IF NOT EXISTS roles (term_id INTEGER, position INTEGER, text TEXT, '
+        'xsd_type TEXT)',
+        'CREATE INDEX IF NOT EXISTS terms_name ON terms (name)',
+        'CREATE INDEX IF NOT EXISTS terms_general_concept ON terms (general_concept)',
+        'CREATE INDEX IF NOT EXISTS logical_operations_term ON logical_operations (term_id)',
+        'CREATE INDEX IF NOT EXISTS rules_term ON rules (term_id)',
+        'CREATE INDEX IF NOT EXISTS rules_verb ON rules (verb)',
+        'CREATE INDEX IF NOT EXISTS ranges_rule ON ranges (rule_id)',
+        'CREATE INDEX IF NOT EXISTS roles_term ON roles (term_id)',
+        'CREATE INDEX IF NOT EXISTS roles_text ON roles (text)',
+    )
+
+    # the names of the general concept and of every concept under it, at any depth; UNION
+    # drops the names already found, so cycles in the hierarchy end
+    SUBTREE_QUERY = (
+        'WITH RECURSIVE subtree (name) AS (SELECT ? UNION '
+        'SELECT terms.name FROM terms JOIN subtree ON terms.general_concept = subtree.name) ')
+
+    _connection = None
+    _batch_size = None
+    _ids = None
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Opens the repository in the given database file, creating it if it does not exist.
+        Imports are inserted in batches of batch_size terms.
+        """
+        self._connection = sqlite3.connect(filename)
+        self._batch_size = batch_size
+        for statement in self.SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def count_terms(self):
+        return self._connection.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+
+    def import_xml_file(self, filename):
+        """
+        Adds the terms of the given xml file, parsed one term at a time, so the whole xml tree
+        is never held in memory. Returns the number of terms added.
+        """
+        return self.import_terms(self.iter_xml_terms(filename))
+
+    @staticmethod
+    def iter_xml_terms(filename):
+        """
+        Yields the terms of the given xml file, in document order.
+        """
+        parser = SBVRSpecification()
+        root = None
+        depth = 0
+        for event, element in ET.iterparse(filename, events = ('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and element.tag == 'sbvr-term':
+                yield parser.parse_sbvr_term(element)
+                root.clear()
+
+    def import_specification(self, sbvr_specification):
+        """
+        Adds the terms of the given specification. Returns the number of terms added.
+        """
+        return self.import_terms(sbvr_specification.get_terms())
+
+    def import_terms(self, sbvr_terms):
+        """
+        Adds the given terms after the stored ones, in a single transaction. Returns the number
+        of terms added.
+        """
+        self._ids = dict((table, self.get_next_id(table))
+                         for table in ('terms', 'logical_operations', 'rules'))
+        rows = self.build_rows()
+        count = 0
+        with self._connection:
+            for sbvr_term in sbvr_terms:
+                self.add_term_rows(rows, sbvr_term)
+                count += 1
+                if count % self._batch_size == 0:
+                    self.insert_rows(rows)
+                    rows = self.build_rows()
+            self.insert_rows(rows)
+        return count
+
+    def get_next_id(self, table):
+        return self._connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM ' + table).fetchone()[0]
+
+    def new_id(self, table):
+        new_id = self._ids[table]
+        self._ids[table] += 1
+        return new_id
+
+    @staticmethod
+    def build_rows():
+        return dict((table, []) for table in ('terms', 'logical_operations', 'rules', 'ranges', 'roles'))
+
+    def insert_rows(self, rows):
+        for table, table_rows in rows.items():
+            if table_rows:
+                self._connection.executemany(
+                    'INSERT INTO %s VALUES (%s)' % (table, ', '.join('?' * len(table_rows[0]))),
+                    table_rows)
+
+    def add_term_rows(self, rows, sbvr_term):
+        """
+        Adds the rows that store the given term to the given rows of every table. Raises a
+        ValueError if its necessity or its definition can not be stored.
+        """
+        term_id = self.new_id('terms')
+        necessity = sbvr_term.get_necessity()
+        verb_necessity = isinstance(necessity, BinaryVerbConceptRule)
+        rows['terms'].append((term_id, sbvr_term.get_name(), sbvr_term.get_general_concept(),
+                              sbvr_term.get_concept_type(), sbvr_term.get_synonym(),
+                              int(verb_necessity)))
+        if verb_necessity:
+            for position, role in enumerate(necessity.get_roles()):
+                rows['roles'].append((term_id, position, role.get_text(), role.get_xsd_type()))
+        elif isinstance(necessity, LogicalOperation):
+            self.add_logical_operation_rows(rows, term_id, self.NECESSITY, necessity)
+        elif necessity is not None:
+            raise ValueError('The necessity of %s is not a logical operation: %r'
+                             % (sbvr_term.get_name(), necessity))
+        definition = sbvr_term.get_definition()
+        if isinstance(definition, LogicalOperation):
+            self.add_logical_operation_rows(rows, term_id, self.DEFINITION, definition)
+        elif definition is not None:
+            raise ValueError('The definition of %s is not a logical operation: %r'
+                             % (sbvr_term.get_name(), definition))
+
+    def add_logical_operation_rows(self, rows, term_id, part, logical_operation):
+        """
+        Adds the rows of the given logical operation of a term, and of its nested operations and
+        rules, walked with an explicit stack.
+        """
+        stack = [(logical_operation, None, 0)]
+        while stack:
+            operation, parent_id, position = stack.pop()
+            operation_id = self.new_id('logical_operations')
+            rows['logical_operations'].append((operation_id, term_id, part, parent_id, position,
+                                               operation.get_type()))
+            for position, operator in enumerate(operation.get_logical_operators()):
+                if isinstance(operator, LogicalOperation):
+                    stack.append((operator, operation_id, position))
+                elif operator is not None:
+                    self.add_rule_rows(rows, term_id, operation_id, position, operator)
+
+    def add_rule_rows(self, rows, term_id, operation_id, position, rule):
+        rule_id = self.new_id('rules')
+        quantification = rule.get_quantification()
+        rule_range = rule.get_rule_range()
+        concepts = []
+        range_kind = None
+        if rule_range is not None:
+            if rule_range.is_conjunction():
+                range_kind, concepts = self.CONJUNCTION, rule_range.get_range()
+            elif rule_range.is_disjunction():
+                range_kind, concepts = self.DISJUNCTION, rule_range.get_range()
+            else:
+                range_kind, concepts = self.NOUN_CONCEPT, [rule_range.get_range()]
+        rows['rules'].append((rule_id, term_id, operation_id, position, rule.get_verb(),
+                              int(quantification is not None),
+                              quantification.get_type() if quantification is not None else None,
+                              quantification.get_value() if quantification is not None else None,
+                              range_kind))
+        for concept_position, concept in enumerate(concepts):
+            rows['ranges'].append((rule_id, concept_position, concept))
+
+    def get_subtree_names(self, general_concept):
+        """
+        Returns the names of the given general concept and of the concepts under it.
+        """
+        return [row[0] for row in self._connection.execute(
+            self.SUBTREE_QUERY + 'SELECT name FROM subtree', (general_concept,))]
+
+    def load_all(self):
+        """
+        Returns a specification with all the stored terms.
+        """
+        return self.load_query('SELECT id FROM terms')
+
+    def load_terms(self, names):
+        """
+        Returns a specification with the stored terms of the given names, in import order.
+        """
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS names (name TEXT)')
+        self._connection.execute('DELETE FROM names')
+        self._connection.executemany('INSERT INTO names VALUES (?)', [(name,) for name in names])
+        return self.load_query('SELECT terms.id FROM terms JOIN names ON terms.name = names.name')
+
+    def load_subtree(self, general_concept, include_verbs=True):
+        """
+        Returns a specification with the given general concept and the terms under it, at any
+        depth. With include_verbs, the terms the subtree needs are added: the verbs with a role
+        in the subtree, the verbs of the rules of its terms, and the synonyms (and verb synonyms)
+        these terms name, at any depth.
+        """
+        subtree_terms = 'SELECT terms.id FROM terms JOIN subtree ON terms.name = subtree.name'
+        if not include_verbs:
+            return self.load_query(self.SUBTREE_QUERY + subtree_terms, (general_concept,))
+        return self.load_query(
+            self.SUBTREE_QUERY + subtree_terms +
+            ' UNION SELECT roles.term_id FROM roles JOIN subtree ON roles.text = subtree.name'
+            ' UNION SELECT terms.id FROM terms JOIN rules ON terms.name = rules.verb'
+            ' WHERE rules.term_id IN (' + subtree_terms + ')',
+            (general_concept,), include_synonyms = True)
+
+    def load_query(self, term_query, parameters=(), include_synonyms=False):
+        """
+        Returns a specification with the stored terms whose ids the given query selects, in
+        import order, and with include_synonyms, the terms named by their synonyms, until no
+        new term is named. The ids are kept in a temporary table, so every table is read with
+        a single query.
+        """
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS selected (id INTEGER PRIMARY KEY)')
+        self._connection.execute('DELETE FROM selected')
+        self._connection.execute('INSERT OR IGNORE INTO selected ' + term_query, parameters)
+        added = include_synonyms
+        while added:
+            added = self._connection.execute(
+                'INSERT OR IGNORE INTO selected SELECT terms.id FROM terms '
+                'JOIN terms AS referring ON terms.name = referring.synonym '
+                'JOIN selected ON referring.id = selected.id').rowcount > 0
+
+        # the (position, operator) pairs of every logical operation, starting with its rules
+        operators = self.load_rules()
+        operations = {}
+        necessities = {}
+        definitions = {}
+        for operation_id, term_id, part, parent_id, position, operation_type in \
+                self._connection.execute(
+                    'SELECT logical_operations.id, term_id, part, parent_id, position, type '
+                    'FROM logical_operations JOIN selected ON term_id = selected.id'):
+            logical_operation = LogicalOperation(operation_type)
+            operations[operation_id] = logical_operation
+            if parent_id is None:
+                parts = necessities if part == self.NECESSITY else definitions
+                parts[term_id] = logical_operation
+            else:
+                operators.setdefault(parent_id, []).append((position, logical_operation))
+        for operation_id, logical_operation in operations.items():
+            logical_operation.set_logical_operators(
+                [operator for _, operator in sorted(operators.get(operation_id, ()),
+                                                    key = lambda operator: operator[0])])
+
+        roles = {}
+        for term_id, text, xsd_type in self._connection.execute(
+                'SELECT term_id, text, xsd_type FROM roles JOIN selected ON term_id = selected.id '
+                'ORDER BY term_id, position'):
+            role_as_xml = ET.Element('sbvr-role')
+            role_as_xml.text = text
+            if xsd_type is not None:
+                role_as_xml.set('xsd-type', xsd_type)
+            roles.setdefault(term_id, []).append(
+                BinaryVerbConceptRule.BinaryVerbConceptRuleRole(role_as_xml))
+
+        sbvr_specification = SBVRSpecification()
+        for term_id, name, general_concept, concept_type, synonym, verb_necessity in \
+                self._connection.execute(
+                    'SELECT terms.id, name, general_concept, concept_type, synonym, verb_necessity '
+                    'FROM terms JOIN selected ON terms.id = selected.id ORDER BY terms.id'):
+            sbvr_term = SBVRTerm()
+            sbvr_term.set_name(name)
+            sbvr_term.set_general_concept(general_concept)
+            sbvr_term.set_concept_type(concept_type)
+            sbvr_term.set_synonym(synonym)
+            sbvr_term.set_definition(definitions.get(term_id))
+            if verb_necessity:
+                necessity = BinaryVerbConceptRule()
+                for role in roles.get(term_id, ()):
+                    necessity.add_role(role)
+                sbvr_term.set_necessity(necessity)
+            else:
+                sbvr_term.set_necessity(necessities.get(term_id))
+            sbvr_specification.get_terms().append(sbvr_term)
+        return sbvr_specification
+
+    def load_rules(self):
+        """
+        Returns the rules of the selected terms as lists of (position, rule) by logical
+        operation id. A rule stored without a quantification gets None.
+        """
+        concepts = {}
+        for rule_id, concept in self._connection.execute(
+                'SELECT rule_id, concept FROM ranges JOIN rules ON ranges.rule_id = rules.id '
+                'JOIN selected ON rules.term_id = selected.id ORDER BY rule_id, ranges.position'):
+            concepts.setdefault(rule_id, []).append(concept)
+
+        rules = {}
+        for rule_id, operation_id, position, verb, has_quantification, quantification_type, \
+                quantification_value, range_kind in self._connection.execute(
+                    'SELECT rules.id, operation_id, position, verb, has_quantification, '
+                    'quantification_type, quantification_value, range_kind FROM rules '
+                    'JOIN selected ON term_id = selected.id'):
+            quantification = None
+            if has_quantification:
+                quantification = Rule.Quantification()
+                quantification.set_quantification_type(quantification_type)
+                quantification.set_quantification_value(quantification_value)
+            rule = Rule()
+            rule.set_verb(verb)
+            rule.set_quantification(quantification)
+            rule.set_rule_range(self.build_rule_range(range_kind, concepts.get(rule_id, [])))
+            rules.setdefault(operation_id, []).append((position, rule))
+        return rules
+
+    def build_rule_range(self, range_kind, concepts):
+        if range_kind is None:
+            return None
+        rule_range = Rule.RuleRange()
+        if range_kind == self.CONJUNCTION:
+            rule_range.set_conjunction(concepts)
+        elif range_kind == self.DISJUNCTION:
+            rule_range.set_disjunction(concepts)
+        else:
+            rule_range.set_noun_concept(concepts[0])
+        return rule_range
@@ -3,13 +3,20 @@ from rule import *
 from logicaloperation import *
 from sbvrterm import *
 from binary_verb_concept_rule import *
+import time
 import xml.etree.ElementTree as ET
+from src.utils.spillinglist import SpillingList
 
 
 class SBVRSpecification:
     """
     This class holds a list of SBVR facts and SBVR rules that form an SBVR specification
     """
+    # the type of the logical operation of every compound operation tag
+    LOGICAL_OPERATION_TYPES = {
+        'sbvr-conjunction': 'conjunction',
+        'sbvr-disjunction': 'disjunction',
+    }
 
     _terms = None
     
@@ -28,20 +35,73 @@ class SBVRSpecification:
         """
         self._terms = terms
 
-    def from_xml_file(self, filename):
+    def set_memory_budget(self, memory_budget, spill_directory=None):
         """
-        Parses the xml file given as a parameter.
+        Keeps the terms parsed from now on in a list that spills to disk once the resident
+        memory goes over the given budget, in bytes. Files are then parsed incrementally, one
+        term at a time, so the whole xml tree is never held in memory.
         """
-        root = ET.parse(filename).getroot()
-        self.from_xml(root)
+        self._terms = SpillingList(memory_budget, spill_directory)
 
-    def from_xml(self, root):
+    def close(self):
         """
-        Parses the given file and gets the elements from it
+        Deletes the terms spilled to disk, if the specification has a memory budget.
         """
-        sbvr_terms = root.findall('sbvr-term')
-        for term in sbvr_terms:
+        if isinstance(self._terms, SpillingList):
+            self._terms.close()
+
+    def from_xml_file(self, filename, instrumentation=None, term_profiler=None):
+        """
+        Parses the xml file given as a parameter. With an instrumentation, the parse is
+        recorded as the parse stage, whose items are the terms.
+        """
+        if instrumentation is None:
+            self.parse_xml_file(filename, term_profiler)
+            return
+        with instrumentation.stage('parse') as stage:
+            self.parse_xml_file(filename, term_profiler)
+            stage['items'] = len(self._terms)
+
+    def parse_xml_file(self, filename, term_profiler=None):
+        """
+        Parses the xml file given as a parameter, incrementally if the terms spill to disk.
+        """
+        if not isinstance(self._terms, SpillingList):
+            self.from_xml(ET.parse(filename).getroot(), term_profiler)
+            return
+        root = None
+        depth = 0
+        for event, element in ET.iterparse(filename, events = ('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and element.tag == 'sbvr-term':
+                self.add_sbvr_term(element, term_profiler)
+                # the parsed terms are removed from the tree
+                root.clear()
+
+    def from_xml(self, root, term_profiler=None):
+        """
+        Parses the given file and gets the elements from it. With a term profiler, the parse
+        time of every term is recorded.
+        """
+        for term in root.findall('sbvr-term'):
+            self.add_sbvr_term(term, term_profiler)
+
+    def add_sbvr_term(self, term, term_profiler=None):
+        """
+        Parses the given xml term and adds it, recording its parse time with a term profiler.
+        """
+        if term_profiler is None:
             self._terms.append(self.parse_sbvr_term(term))
+            return
+        start = time.time()
+        sbvr_term = self.parse_sbvr_term(term)
+        term_profiler.record(term_profiler.PARSE, time.time() - start, sbvr_term)
+        self._terms.append(sbvr_term)
 
     def parse_sbvr_term(self, term):
         """
@@ -70,25 +130,37 @@ class SBVRSpecification:
         if necessity_as_xml == None or len(list(necessity_as_xml)) == 0:
             return None
         
-        # first try conjunction
-        conjunction = necessity_as_xml.find('sbvr-conjunction')
-        if conjunction is not None:
-            logical_operation = LogicalOperation('conjunction')
-            logical_operation.set_logical_operators(self.parse_logical_operators(conjunction))
-            return logical_operation
-        
-        # if not, try disjunction
-        disjunction = necessity_as_xml.find('sbvr-disjunction')
-        if disjunction is not None:
-            logical_operation = LogicalOperation('disjunction')
-            logical_operation.set_logical_operators(self.parse_logical_operators(disjunction))
-            return logical_operation
+        # first try conjunction, if not, try disjunction
+        for tag in ('sbvr-conjunction', 'sbvr-disjunction'):
+            operation_as_xml = necessity_as_xml.find(tag)
+            if operation_as_xml is not None:
+                return self.parse_compound_logical_operation(operation_as_xml)
 
         # it must be a single concept
         logical_operation = LogicalOperation('single-clause')
         logical_operation.set_logical_operators(self.parse_logical_operators(necessity_as_xml))
         return logical_operation
 
+    def parse_compound_logical_operation(self, operation_as_xml):
+        """
+        Parses a conjunction or a disjunction, whose operators are logical operators and nested
+        conjunctions and disjunctions, in document order. Nested operations are parsed with an
+        explicit stack, so any depth is supported.
+        """
+        logical_operation = LogicalOperation(self.LOGICAL_OPERATION_TYPES[operation_as_xml.tag])
+        stack = [(logical_operation, operation_as_xml)]
+        while stack:
+            operation, operation_as_xml = stack.pop()
+            for operator_as_xml in operation_as_xml:
+                if operator_as_xml.tag == 'sbvr-logical-operator':
+                    operation.add_logical_operator(self.parse_sbvr_rule(operator_as_xml))
+                elif operator_as_xml.tag in self.LOGICAL_OPERATION_TYPES:
+                    nested_operation = LogicalOperation(
+                        self.LOGICAL_OPERATION_TYPES[operator_as_xml.tag])
+                    operation.add_logical_operator(nested_operation)
+                    stack.append((nested_operation, operator_as_xml))
+        return logical_operation
+
     def parse_logical_operators(self, logical_operation):
         """
         Parse the operators_as_xml found on a logical operation object
@@ -0,0 +1,153 @@
+class GraphUtils:
+    """
+    Helpers for directed graphs whose nodes are the integers from zero to node_count - 1 and
+    whose edges are given as a list with the successors of every node (or None for none).
+    """
+
+    @staticmethod
+    def postorder(node_count, successors, nodes=None):
+        """
+        Returns the nodes in depth first postorder, so every node comes after all its successors,
+        and whether the graph has a cycle (in which case the order is not topological). Only the
+        given nodes, and the nodes reachable from them, are visited.
+        """
+        state = bytearray(node_count)
+        order = []
+        has_cycle = False
+        for start in (nodes if nodes is not None else range(node_count)):
+            if state[start]:
+                continue
+            state[start] = 1
+            stack = [(start, 0)]
+            while stack:
+                node, position = stack[-1]
+                node_successors = successors[node]
+                if node_successors is not None and position < len(node_successors):
+                    stack[-1] = (node, position + 1)
+                    successor = node_successors[position]
+                    if state[successor] == 0:
+                        state[successor] = 1
+                        stack.append((successor, 0))
+                    elif state[successor] == 1:
+                        has_cycle = True
+                else:
+                    state[node] = 2
+                    order.append(node)
+                    stack.pop()
+        return order, has_cycle
+
+    @staticmethod
+    def strongly_connected_components(node_count, successors, nodes=None):
+        """
+        Returns the strongly connected components of the graph (Tarjan's algorithm, without
+        recursion), each one after the components it has edges to.
+        """
+        index = [-1] * node_count
+        lowlink = [0] * node_count
+        on_stack = bytearray(node_count)
+        component_stack = []
+        components = []
+        counter = 0
+        for start in (nodes if nodes is not None else range(node_count)):
+            if index[start] != -1:
+                continue
+            index[start] = lowlink[start] = counter
+            counter += 1
+            component_stack.append(start)
+            on_stack[start] = 1
+            stack = [(start, 0)]
+            while stack:
+                node, position = stack[-1]
+                node_successors = successors[node]
+                if node_successors is not None and position < len(node_successors):
+                    stack[-1] = (node, position + 1)
+                    successor = node_successors[position]
+                    if index[successor] == -1:
+                        index[successor] = lowlink[successor] = counter
+                        counter += 1
+                        component_stack.append(successor)
+                        on_stack[successor] = 1
+                        stack.append((successor, 0))
+                    elif on_stack[successor]:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                    continue
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = component_stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    @staticmethod
+    def transitive_reduction(node_count, successors):
+        """
+        Returns the successors of every node (or None for none) without the edges implied by
+        other paths, and without repeated edges. Edges inside a cycle are kept, and only one
+        edge is kept between two cycles when there is no other path between them.
+
+        The reduction is computed on the components, which are numbered so that a component
+        can only reach components with lower numbers. For every component with more than one
+        successor, a depth first search from the successors of its successors, which does not
+        go below the lowest of them, finds the successors that are implied. On hierarchies,
+        where most classes have one parent, this visits few nodes.
+        """
+        components = GraphUtils.strongly_connected_components(node_count, successors)
+        component_of = [0] * node_count
+        for component_id, component in enumerate(components):
+            for node in component:
+                component_of[node] = component_id
+
+        component_successors = [[] for _ in components]
+        for node in range(node_count):
+            for successor in successors[node] or []:
+                first, second = component_of[node], component_of[successor]
+                if first != second and second not in component_successors[first]:
+                    component_successors[first].append(second)
+
+        kept = [None] * len(components)
+        visited = [-1] * len(components)
+        for component_id, first_successors in enumerate(component_successors):
+            if len(first_successors) < 2:
+                continue
+            lowest = min(first_successors)
+            pending = [successor for first_successor in first_successors
+                       for successor in component_successors[first_successor]
+                       if successor >= lowest]
+            while pending:
+                current = pending.pop()
+                if visited[current] == component_id:
+                    continue
+                visited[current] = component_id
+                pending.extend(successor for successor in component_successors[current]
+                               if successor >= lowest and visited[successor] != component_id)
+            kept[component_id] = set(successor for successor in first_successors
+                                     if visited[successor] != component_id)
+
+        reduction = [None] * node_count
+        cycle_edges = set()
+        component_edges = set()
+        for node in range(node_count):
+            if successors[node] is None:
+                continue
+            node_successors = []
+            for successor in successors[node]:
+                first, second = component_of[node], component_of[successor]
+                if first == second:
+                    edges, edge = cycle_edges, (node, successor)
+                elif kept[first] is None or second in kept[first]:
+                    edges, edge = component_edges, (first, second)
+                else:
+                    continue
+                if edge not in edges:
+                    edges.add(edge)
+                    node_successors.append(successor)
+            reduction[node] = node_successors
+        return reduction
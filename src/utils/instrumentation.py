@@ -0,0 +1,183 @@
+import contextlib
+import json
+import os
+import resource
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+class Instrumentation:
+    """
+    Records what the stages of a transformation cost: the wall time, the cpu time, the peak
+    memory and the number of items of every stage, plus named counters, such as the number of
+    times every template is rendered and the bytes written. It is opt-in: the classes that
+    support it take an instance, and do nothing extra without one.
+
+    Peak memory is the peak of the memory traced by tracemalloc during the stage when it is
+    available (python 3), else the peak resident memory of the process so far. Stages are
+    recorded in the order they end, and must not be nested.
+    """
+    MEMORY_TRACEMALLOC = 'tracemalloc'
+    MEMORY_RSS = 'rss'
+
+    _stages = None
+    _counters = None
+
+    def __init__(self):
+        """
+        Initializes the instance with no stages and no counters.
+        """
+        self._stages = []
+        self._counters = {}
+
+    def get_stages(self):
+        return self._stages
+
+    def get_counters(self):
+        return self._counters
+
+    def get_stage(self, name):
+        """
+        Returns the record of the last stage with the given name, or None.
+        """
+        for stage in reversed(self._stages):
+            if stage['name'] == name:
+                return stage
+        return None
+
+    def count(self, name, count=1):
+        """
+        Adds the given count to the counter with the given name.
+        """
+        self._counters[name] = self._counters.get(name, 0) + count
+
+    def count_calls(self, name, function):
+        """
+        Returns a function that calls the given function and counts the calls in the counter
+        with the given name.
+        """
+        counters = self._counters
+
+        def counted_function(*arguments, **keywords):
+            counters[name] = counters.get(name, 0) + 1
+            return function(*arguments, **keywords)
+        return counted_function
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Records the stage run in the with block it is used in. The stage record is given to
+        the block, which can set its number of items.
+        """
+        started_tracing = False
+        if tracemalloc is not None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        record = {'name': name, 'items': None}
+        cpu_start = self.get_cpu_time()
+        wall_start = time.time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.time() - wall_start
+            record['cpu_seconds'] = self.get_cpu_time() - cpu_start
+            if tracemalloc is not None:
+                record['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+                record['memory'] = self.MEMORY_TRACEMALLOC
+                if started_tracing:
+                    tracemalloc.stop()
+            else:
+                record['peak_memory_bytes'] = self.get_peak_rss()
+                record['memory'] = self.MEMORY_RSS
+            self._stages.append(record)
+
+    @staticmethod
+    def get_cpu_time():
+        """
+        Returns the user and system cpu time of this process, in seconds.
+        """
+        times = os.times()
+        return times[0] + times[1]
+
+    @staticmethod
+    def get_peak_rss():
+        """
+        Returns the peak resident memory of this process, in bytes (ru_maxrss is in kilobytes
+        on linux).
+        """
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def to_dict(self):
+        return {'stages': self._stages, 'counters': self._counters}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent = 2, separators = (',', ': '), sort_keys = True)
+
+    def write_report(self, filename):
+        """
+        Writes the json report to the given file.
+        """
+        with open(filename, 'w') as report_file:
+            report_file.write(self.to_json() + '\n')
+
+    def get_summary(self):
+        """
+        Returns a one line summary: the wall time of every stage, the total, the bytes written
+        and the largest peak memory.
+        """
+        parts = []
+        for stage in self._stages:
+            part = '%s %.3fs' % (stage['name'], stage['wall_seconds'])
+            if stage['items'] is not None:
+                part += ' (%d)' % stage['items']
+            parts.append(part)
+        parts.append('total %.3fs' % sum(stage['wall_seconds'] for stage in self._stages))
+        if 'io_seconds' in self._counters:
+            parts.append('io %.3fs' % self._counters['io_seconds'])
+        if 'bytes_written' in self._counters:
+            parts.append('%.1fMB written' % (self._counters['bytes_written'] / 1048576.0))
+        if self._stages:
+            parts.append('peak %.1fMB' % (
+                max(stage['peak_memory_bytes'] for stage in self._stages) / 1048576.0))
+        return ' | '.join(parts)
+
+    class InstrumentedFile:
+        """
+        Wraps an output file to count the bytes written to it, in the bytes_written counter,
+        and the time spent writing, in the io_seconds counter. Everything else is delegated to
+        the wrapped file.
+        """
+        _output_file = None
+        _counters = None
+
+        def __init__(self, output_file, instrumentation):
+            self._output_file = output_file
+            self._counters = instrumentation.get_counters()
+            self._counters.setdefault('bytes_written', 0)
+            self._counters.setdefault('io_seconds', 0.0)
+
+        def write(self, data):
+            start = time.time()
+            self._output_file.write(data)
+            self._counters['io_seconds'] += time.time() - start
+            self._counters['bytes_written'] += len(data)
+
+        def flush(self):
+            start = time.time()
+            self._output_file.flush()
+            self._counters['io_seconds'] += time.time() - start
+
+        def close(self):
+            start = time.time()
+            self._output_file.close()
+            self._counters['io_seconds'] += time.time() - start
+
+        def __getattr__(self, name):
+            return getattr(self._output_file, name)
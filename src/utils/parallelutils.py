@@ -0,0 +1,53 @@
+import collections
+import multiprocessing
+
+# the function run by the worker processes. It is set before the pool is created, so the
+# forked workers inherit it (and everything it refers to) without pickling it.
+_worker_function = None
+
+
+def _call_worker_function(item):
+    return _worker_function(item)
+
+
+class ParallelUtils:
+    """
+    Helpers to run work in worker processes.
+    """
+
+    @staticmethod
+    def ordered_map(function, items, processes, window=None):
+        """
+        Yields function(item) for every item, in the order of the items. When more than one
+        process is requested the items are processed by a pool of forked worker processes,
+        so only the items and the results need to be pickled.
+
+        At most window items (by default, twice the number of processes) are submitted and not
+        yet yielded at any time, so a slow consumer bounds the memory held by pending results.
+        """
+        global _worker_function
+
+        if processes is None or processes <= 1:
+            for item in items:
+                yield function(item)
+            return
+
+        if window is None:
+            window = 2 * processes
+        _worker_function = function
+        pool = multiprocessing.Pool(processes)
+        try:
+            pending = collections.deque()
+            for item in items:
+                if len(pending) >= window:
+                    yield pending.popleft().get()
+                pending.append(pool.apply_async(_call_worker_function, (item,)))
+            while pending:
+                yield pending.popleft().get()
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            _worker_function = None
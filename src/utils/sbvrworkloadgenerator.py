@@ -0,0 +1,267 @@
+"""
+Writes synthetic SBVR specifications, to measure the transformation at scale.
+
+Usage: python -m src.utils.sbvrworkloadgenerator [options] term_count output_file
+"""
+import argparse
+import itertools
+import random
+import sys
+
+
+class SBVRWorkloadGenerator:
+    """
+    Writes a seeded, synthetic SBVR specification with the given number of terms, in the xml
+    format SBVRSpecification parses. The same options and seed always write the same document.
+
+    The terms are general concepts, with a fraction of them in synonym pairs, followed by binary
+    verb concepts, with a fraction of them relating a concept and a literal (data properties).
+    General concepts form trees of the given depth and fan out, through their general concept.
+    Necessities and definitions are single clauses, conjunctions or disjunctions of rules whose
+    ranges are noun concepts, conjunctions or disjunctions of noun concepts; compound operations
+    and collection ranges have the given widths. Rules only use the verbs relating concepts.
+
+    Terms are written one at a time and nothing is kept about the terms already written, so the
+    document is written in constant memory whatever the number of terms.
+    """
+    CONCEPT_NAME = 'Concepto%d'
+    VERB_NAME = 'verbo%d'
+    XSD_TYPES = ('Integer', 'String', 'Boolean', 'Date')
+
+    # the quantifications of the necessities, with a function that gives their value
+    NECESSITY_QUANTIFICATIONS = (
+        ('at-least-N', lambda random_generator: str(random_generator.randint(1, 3))),
+        ('at-most-N', lambda random_generator: str(random_generator.randint(1, 3))),
+        ('exactly-N', lambda random_generator: str(random_generator.randint(1, 3))),
+        ('at-least-N-and-at-most-M', lambda random_generator: '%d..%d' % (
+            random_generator.randint(0, 1), random_generator.randint(2, 4))),
+        ('existential', lambda random_generator: ''),
+        ('universal', lambda random_generator: ''),
+    )
+
+    TERM_TEMPLATE = ('  <sbvr-term>\n'
+                     '    <sbvr-term-name>%s</sbvr-term-name>\n'
+                     '    <sbvr-term-definition>%s</sbvr-term-definition>\n'
+                     '    <sbvr-term-general-concept>%s</sbvr-term-general-concept>\n'
+                     '    <sbvr-term-concept-type>%s</sbvr-term-concept-type>\n'
+                     '    <sbvr-term-synonym>%s</sbvr-term-synonym>\n'
+                     '    <sbvr-term-necessity>%s</sbvr-term-necessity>\n'
+                     '  </sbvr-term>\n')
+    OPERATOR_TEMPLATE = ('<sbvr-logical-operator><sbvr-verb>%s</sbvr-verb>'
+                         '<sbvr-quantification type="%s">%s</sbvr-quantification>'
+                         '%s</sbvr-logical-operator>')
+    ROLE_TEMPLATE = '<sbvr-role position="%d">%s</sbvr-role>'
+    LITERAL_ROLE_TEMPLATE = '<sbvr-role position="%d" xsd-type="%s"></sbvr-role>'
+
+    _term_count = None
+    _verb_ratio = None
+    _data_property_ratio = None
+    _synonym_ratio = None
+    _depth = None
+    _fan_out = None
+    _necessity_ratio = None
+    _definition_ratio = None
+    _conjunction_width = None
+    _disjunction_width = None
+    _seed = None
+
+    def __init__(self, term_count, verb_ratio=0.1, data_property_ratio=0.2, synonym_ratio=0.1,
+                 depth=5, fan_out=4, necessity_ratio=0.3, definition_ratio=0.1,
+                 conjunction_width=2, disjunction_width=2, seed=0):
+        """
+        Initializes the generator. Ratios are fractions between zero and one: the verb ratio of
+        all the terms, the data property ratio of the verbs, the synonym ratio of the general
+        concepts, and the necessity and definition ratios of the general concepts that are not
+        synonyms. Widths below two disable the compound operations and ranges of their type.
+        """
+        for name, ratio in (('verb_ratio', verb_ratio), ('data_property_ratio', data_property_ratio),
+                            ('synonym_ratio', synonym_ratio), ('necessity_ratio', necessity_ratio),
+                            ('definition_ratio', definition_ratio)):
+            if not 0 <= ratio <= 1:
+                raise ValueError('%s must be between 0 and 1: %r' % (name, ratio))
+        if term_count < 0 or depth < 1 or fan_out < 1:
+            raise ValueError('term_count must not be negative, and depth and fan_out positive')
+
+        if term_count > 0 and verb_ratio == 1:
+            raise ValueError('verbs need general concepts to relate: verb_ratio must be below 1')
+
+        self._term_count = term_count
+        self._verb_ratio = verb_ratio
+        self._data_property_ratio = data_property_ratio
+        self._synonym_ratio = synonym_ratio
+        self._depth = depth
+        self._fan_out = fan_out
+        self._necessity_ratio = necessity_ratio
+        self._definition_ratio = definition_ratio
+        self._conjunction_width = conjunction_width
+        self._disjunction_width = disjunction_width
+        self._seed = seed
+
+    def get_verb_count(self):
+        return int(round(self._term_count * self._verb_ratio))
+
+    def get_concept_count(self):
+        return self._term_count - self.get_verb_count()
+
+    def get_object_verb_count(self):
+        """
+        Returns the number of verbs that relate two concepts, which come before the verbs that
+        relate a concept and a literal.
+        """
+        verb_count = self.get_verb_count()
+        return verb_count - int(round(verb_count * self._data_property_ratio))
+
+    def get_general_concept(self, index):
+        """
+        Returns the index of the general concept of the concept with the given index, or None
+        for the roots. Concepts are numbered breadth first in consecutive trees of the given
+        depth and fan out, so a concept is always written after its general concept.
+        """
+        if self._fan_out == 1:
+            tree_size = self._depth
+        else:
+            tree_size = (self._fan_out ** self._depth - 1) // (self._fan_out - 1)
+        position = index % tree_size
+        if position == 0:
+            return None
+        return index - position + (position - 1) // self._fan_out
+
+    def write(self, output_file):
+        """
+        Writes the specification to the given file object and returns the number of terms.
+        """
+        random_generator = random.Random(self._seed)
+        output_file.write('<?xml version="1.0"?>\n<sbvr-specification>\n')
+        concept_count = self.get_concept_count()
+        synonym_of = None
+        # indexes are counted, not listed, so the memory used does not depend on the term count
+        for index in itertools.islice(itertools.count(), concept_count):
+            if synonym_of is not None:
+                # the second term of a synonym pair
+                output_file.write(self.build_concept(index, synonym_of, None, None))
+                synonym_of = None
+                continue
+            synonym = None
+            if index + 1 < concept_count and random_generator.random() < self._synonym_ratio:
+                synonym, synonym_of = index + 1, index
+            necessity = definition = None
+            if random_generator.random() < self._necessity_ratio:
+                necessity = self.build_logical_operation(random_generator, True)
+            if random_generator.random() < self._definition_ratio:
+                definition = self.build_logical_operation(random_generator, False)
+            output_file.write(self.build_concept(index, synonym, necessity, definition))
+
+        object_verb_count = self.get_object_verb_count()
+        for index in itertools.islice(itertools.count(), self.get_verb_count()):
+            output_file.write(self.build_verb(random_generator, index, index >= object_verb_count))
+        output_file.write('</sbvr-specification>\n')
+        return self._term_count
+
+    def build_concept(self, index, synonym, necessity, definition):
+        general_concept = self.get_general_concept(index)
+        return self.TERM_TEMPLATE % (
+            self.CONCEPT_NAME % index, definition or '',
+            self.CONCEPT_NAME % general_concept if general_concept is not None else '',
+            'general concept', self.CONCEPT_NAME % synonym if synonym is not None else '',
+            necessity or '')
+
+    def build_verb(self, random_generator, index, relates_literal):
+        concept_count = self.get_concept_count()
+        roles = [self.ROLE_TEMPLATE % (1, self.CONCEPT_NAME % random_generator.randrange(concept_count))]
+        if relates_literal:
+            roles.append(self.LITERAL_ROLE_TEMPLATE % (2, random_generator.choice(self.XSD_TYPES)))
+        else:
+            roles.append(self.ROLE_TEMPLATE % (
+                2, self.CONCEPT_NAME % random_generator.randrange(concept_count)))
+        # the parser needs the roles of a verb on their own lines, as in the examples
+        return self.TERM_TEMPLATE % (self.VERB_NAME % index, '', '', 'binary verb concept', '',
+                                     ''.join(['\n      ' + role for role in roles]) + '\n    ')
+
+    def build_logical_operation(self, random_generator, necessity):
+        """
+        Returns the xml of a single clause, conjunction or disjunction of rules, or None if
+        there are no verbs to build rules with.
+        """
+        if self.get_object_verb_count() == 0:
+            return None
+        operation_type, width = self.choose_collection(random_generator)
+        if operation_type is None:
+            return self.OPERATOR_TEMPLATE % self.build_rule(random_generator, necessity)
+        operators = [self.OPERATOR_TEMPLATE % self.build_rule(random_generator, necessity)
+                     for _ in range(width)]
+        return '<sbvr-%s>%s</sbvr-%s>' % (operation_type, ''.join(operators), operation_type)
+
+    def build_rule(self, random_generator, necessity):
+        """
+        Returns the verb, quantification type, quantification value and range xml of a rule.
+        Definitions are existential, as in the examples.
+        """
+        if necessity:
+            quantification_type, build_value = random_generator.choice(self.NECESSITY_QUANTIFICATIONS)
+            quantification_value = build_value(random_generator)
+        else:
+            quantification_type, quantification_value = 'existential', ''
+
+        concept_count = self.get_concept_count()
+        range_type, width = self.choose_collection(random_generator)
+        if range_type is None:
+            rule_range = '<sbvr-concept>%s</sbvr-concept>' % (
+                self.CONCEPT_NAME % random_generator.randrange(concept_count))
+        else:
+            rule_range = '<sbvr-%s>%s</sbvr-%s>' % (range_type, ''.join([
+                '<sbvr-concept>%s</sbvr-concept>' % (
+                    self.CONCEPT_NAME % random_generator.randrange(concept_count))
+                for _ in range(width)]), range_type)
+        return (self.VERB_NAME % random_generator.randrange(self.get_object_verb_count()),
+                quantification_type, quantification_value, rule_range)
+
+    def choose_collection(self, random_generator):
+        """
+        Returns a random choice between (None, 1), ('conjunction', conjunction_width) and
+        ('disjunction', disjunction_width), leaving out the collections narrower than two.
+        """
+        choices = [(None, 1)]
+        if self._conjunction_width > 1:
+            choices.append(('conjunction', self._conjunction_width))
+        if self._disjunction_width > 1:
+            choices.append(('disjunction', self._disjunction_width))
+        return random_generator.choice(choices)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description = 'Writes a synthetic SBVR specification.')
+    parser.add_argument('term_count', type = int)
+    parser.add_argument('output_file', help = "the file to write, or '-' for the standard output")
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--verb-ratio', type = float, default = 0.1)
+    parser.add_argument('--data-property-ratio', type = float, default = 0.2)
+    parser.add_argument('--synonym-ratio', type = float, default = 0.1)
+    parser.add_argument('--depth', type = int, default = 5)
+    parser.add_argument('--fan-out', type = int, default = 4)
+    parser.add_argument('--necessity-ratio', type = float, default = 0.3)
+    parser.add_argument('--definition-ratio', type = float, default = 0.1)
+    parser.add_argument('--conjunction-width', type = int, default = 2)
+    parser.add_argument('--disjunction-width', type = int, default = 2)
+    options = parser.parse_args(arguments)
+
+    try:
+        generator = SBVRWorkloadGenerator(
+            options.term_count, verb_ratio = options.verb_ratio,
+            data_property_ratio = options.data_property_ratio,
+            synonym_ratio = options.synonym_ratio, depth = options.depth,
+            fan_out = options.fan_out, necessity_ratio = options.necessity_ratio,
+            definition_ratio = options.definition_ratio,
+            conjunction_width = options.conjunction_width,
+            disjunction_width = options.disjunction_width, seed = options.seed)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if options.output_file == '-':
+        generator.write(sys.stdout)
+    else:
+        with open(options.output_file, 'w') as output_file:
+            generator.write(output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import os
+import resource
+import shutil
+import sqlite3
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class SpillingList:
+    """
+    A list that is appended to and iterated in order, which moves its items to a sqlite
+    database on disk once the resident memory of the process goes over a budget, so it can
+    hold more items than fit in memory.
+
+    Until the budget is crossed the items are kept in memory, and the resident memory is checked
+    every check_interval appends. From then on, the items are pickled to the database in batches
+    of batch_size, and iterating reads them back one at a time, followed by the items not yet
+    spilled. Items read back are copies: changing them does not change the stored items.
+    """
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_CHECK_INTERVAL = 1000
+    FILENAME = 'spill.sqlite'
+
+    _memory_budget = None
+    _directory = None
+    _batch_size = None
+    _check_interval = None
+    _items = None
+    _appended = 0
+    _spilled_count = 0
+    _connection = None
+    _database_directory = None
+
+    def __init__(self, memory_budget, directory=None, batch_size=DEFAULT_BATCH_SIZE,
+                 check_interval=DEFAULT_CHECK_INTERVAL):
+        """
+        Initializes an empty list that spills when the resident memory goes over the given
+        budget, in bytes, to a database in a new temporary directory inside the given one.
+        """
+        self._memory_budget = memory_budget
+        self._directory = directory
+        self._batch_size = batch_size
+        self._check_interval = check_interval
+        self._items = []
+        self._appended = 0
+        self._spilled_count = 0
+
+    @staticmethod
+    def get_rss():
+        """
+        Returns the resident memory of this process, in bytes. Where /proc is not available,
+        the peak resident memory is used instead.
+        """
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * resource.getpagesize()
+        except (IOError, OSError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def is_spilled(self):
+        return self._connection is not None
+
+    def get_spilled_count(self):
+        return self._spilled_count
+
+    def append(self, item):
+        self._items.append(item)
+        self._appended += 1
+        if self._connection is not None:
+            if len(self._items) >= self._batch_size:
+                self.spill()
+        elif self._appended % self._check_interval == 0 and self.get_rss() > self._memory_budget:
+            self.spill()
+
+    def spill(self):
+        """
+        Moves the items kept in memory to the database, creating it the first time.
+        """
+        if self._connection is None:
+            self._database_directory = tempfile.mkdtemp(dir = self._directory)
+            self._connection = sqlite3.connect(os.path.join(self._database_directory,
+                                                            self.FILENAME))
+            self._connection.execute('PRAGMA journal_mode = OFF')
+            self._connection.execute('PRAGMA synchronous = OFF')
+            self._connection.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, item BLOB)')
+        self._connection.executemany(
+            'INSERT INTO items (id, item) VALUES (?, ?)',
+            [(self._spilled_count + index, sqlite3.Binary(pickle.dumps(item, 2)))
+             for index, item in enumerate(self._items)])
+        self._connection.commit()
+        self._spilled_count += len(self._items)
+        self._items = []
+
+    def __len__(self):
+        return self._spilled_count + len(self._items)
+
+    def __iter__(self):
+        if self._connection is not None:
+            for row in self._connection.execute('SELECT item FROM items ORDER BY id'):
+                yield pickle.loads(bytes(row[0]))
+        for item in self._items:
+            yield item
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('SpillingList index out of range')
+        if index >= self._spilled_count:
+            return self._items[index - self._spilled_count]
+        row = self._connection.execute('SELECT item FROM items WHERE id = ?', (index,)).fetchone()
+        return pickle.loads(bytes(row[0]))
+
+    def close(self):
+        """
+        Removes all the items, deleting the database of the spilled ones.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            shutil.rmtree(self._database_directory)
+        self._items = []
+        self._spilled_count = 0
+        self._appended = 0
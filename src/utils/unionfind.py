@@ -0,0 +1,40 @@
+class UnionFind:
+    """
+    Disjoint sets over the integers from zero to size - 1, with path halving.
+    """
+    _parents = None
+
+    def __init__(self, size=0):
+        self._parents = list(range(size))
+
+    def add(self):
+        """
+        Adds a new element in a set of its own and returns it.
+        """
+        self._parents.append(len(self._parents))
+        return len(self._parents) - 1
+
+    def __len__(self):
+        return len(self._parents)
+
+    def find(self, element):
+        """
+        Returns the representative of the set of the given element.
+        """
+        parents = self._parents
+        while parents[element] != element:
+            parents[element] = parents[parents[element]]
+            element = parents[element]
+        return element
+
+    def union(self, first, second):
+        """
+        Joins the sets of the given elements. The representative of the first one remains
+        the representative of the joined set. Returns False if they were already joined.
+        """
+        first = self.find(first)
+        second = self.find(second)
+        if first == second:
+            return False
+        self._parents[second] = first
+        return True
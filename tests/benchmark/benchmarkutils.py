@@ -0,0 +1,56 @@
+import time
+from src.owl.owl_specification import OWLSpecification
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+def build_owl_specification(class_count, prefix='http://example.org/benchmark'):
+    """
+    Builds an owl specification with the given number of classes, mixing sub classes,
+    synonyms, single and compound necessities and definitions.
+    """
+    owl_specification = OWLSpecification(prefix)
+
+    for index in range(10):
+        owl_specification.add_object_property(OWLSpecification.OWLObjectPropertySpecification(
+            'verbo%d' % index, 'Clase%d' % index, 'Clase%d' % (index + 1)))
+
+    for index in range(class_count):
+        owl_class = OWLSpecification.OWLClassSpecification('Clase%d' % index)
+        if index > 0:
+            owl_class.add_parent_class('Clase%d' % ((index - 1) // 10))
+        if index % 3 == 0:
+            owl_class.add_synonym_equivalence('Sinonimo%d' % index)
+        if index % 4 == 0:
+            owl_class.add_parent_class_expression(build_logical_operation('single-clause', [
+                build_rule('verbo1', 'Clase%d' % (index // 2), 'at-least-N', '1')]))
+        if index % 5 == 0:
+            owl_class.add_parent_class_expression(build_logical_operation('conjunction', [
+                build_rule('verbo2', 'Clase%d' % (index // 3), 'at-least-N', '2'),
+                build_rule('verbo3', 'Clase%d' % (index // 4), 'at-least-N', '1')]))
+        if index % 6 == 0:
+            owl_class.add_equivalence_rule(build_logical_operation('single-clause', [
+                build_rule('verbo4',
+                           ['Clase%d' % (index // 2), 'Clase%d' % (index // 3), 'Clase%d' % (index // 5)],
+                           'existential', None)]))
+        if index % 7 == 0:
+            owl_class.add_equivalence_rule(build_logical_operation('conjunction', [
+                build_rule('verbo5', 'Clase%d' % (index // 2), 'existential', None),
+                build_rule('verbo6', ['Clase%d' % (index // 3), 'Clase%d' % (index // 4)],
+                           'existential', None, conjunction = True)]))
+        owl_specification.add_class_specification(owl_class)
+
+    return owl_specification
+
+
+def best_time(function, repeat=3):
+    """
+    Runs the function the given number of times and returns the best wall time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
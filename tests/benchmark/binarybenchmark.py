@@ -0,0 +1,57 @@
+"""
+Compares loading the ontology from the rdf/xml output (parsing it with ElementTree) with
+loading it from the binary serialization: opening it, reading a single class, and decoding it all.
+
+Usage: python -m tests.benchmark.binarybenchmark [class_count]
+"""
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from src.owl.owl_binary import OWLBinaryWriter, OWLBinaryReader
+from src.owl.owl_writer import OWLWriter
+from tests.benchmark.benchmarkutils import build_owl_specification, best_time
+
+
+def open_and_read_one(filename, position):
+    reader = OWLBinaryReader(filename)
+    reader.get_entity(position)
+    reader.close()
+
+
+def decode_all(filename):
+    reader = OWLBinaryReader(filename)
+    reader.to_owl_specification()
+    reader.close()
+
+
+def run(class_count):
+    owl_specification = build_owl_specification(class_count)
+    output_directory = tempfile.mkdtemp()
+    owl_filename = os.path.join(output_directory, 'ontology.owl')
+    binary_filename = os.path.join(output_directory, 'ontology.bin')
+
+    with open(owl_filename, 'w') as output_file:
+        OWLWriter(output_file).write_document(owl_specification.get_prefix(),
+                                              owl_specification.iter_owl_fragments())
+    with open(binary_filename, 'wb') as output_file:
+        OWLBinaryWriter().write(owl_specification, output_file)
+
+    parse_time = best_time(lambda: ET.parse(owl_filename))
+    one_time = best_time(lambda: open_and_read_one(binary_filename, class_count // 2))
+    all_time = best_time(lambda: decode_all(binary_filename))
+
+    print('classes:               %d' % class_count)
+    print('rdf/xml bytes:         %12d' % os.path.getsize(owl_filename))
+    print('binary bytes:          %12d' % os.path.getsize(binary_filename))
+    print('rdf/xml parse (s):     %12.4f' % parse_time)
+    print('binary one class (s):  %12.4f' % one_time)
+    print('binary decode all (s): %12.4f  (%.1fx)' % (all_time, parse_time / all_time))
+
+    os.remove(owl_filename)
+    os.remove(binary_filename)
+    os.rmdir(output_directory)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,50 @@
+"""
+Compares the pretty and the compact (minified) rdf/xml output: size in bytes, time to render
+and write the document, and time to parse it back with ElementTree.
+
+Usage: python -m tests.benchmark.compactbenchmark [class_count]
+"""
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from src.owl.owl_writer import OWLWriter
+from tests.benchmark.benchmarkutils import build_owl_specification, best_time
+
+
+def write_owl_file(owl_specification, filename, compact):
+    with open(filename, 'w') as output_file:
+        owl_writer = OWLWriter(output_file, compact = compact)
+        owl_writer.write_document('http://example.org/benchmark',
+                                  owl_specification.iter_owl_fragments(compact))
+
+
+def run(class_count):
+    owl_specification = build_owl_specification(class_count)
+    output_directory = tempfile.mkdtemp()
+
+    results = {}
+    for compact in (False, True):
+        filename = os.path.join(output_directory, 'compact.owl' if compact else 'pretty.owl')
+        write_time = best_time(lambda: write_owl_file(owl_specification, filename, compact))
+        parse_time = best_time(lambda: ET.parse(filename))
+        results[compact] = (os.path.getsize(filename), write_time, parse_time)
+        os.remove(filename)
+    os.rmdir(output_directory)
+
+    pretty_size, pretty_write_time, pretty_parse_time = results[False]
+    compact_size, compact_write_time, compact_parse_time = results[True]
+    print('classes:      %d' % class_count)
+    print('              %12s %12s %8s' % ('pretty', 'compact', 'saving'))
+    print('bytes:        %12d %12d %7.1f%%' % (
+        pretty_size, compact_size, 100.0 * (pretty_size - compact_size) / pretty_size))
+    print('write (s):    %12.3f %12.3f %7.1f%%' % (
+        pretty_write_time, compact_write_time,
+        100.0 * (pretty_write_time - compact_write_time) / pretty_write_time))
+    print('parse (s):    %12.3f %12.3f %7.1f%%' % (
+        pretty_parse_time, compact_parse_time,
+        100.0 * (pretty_parse_time - compact_parse_time) / pretty_parse_time))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
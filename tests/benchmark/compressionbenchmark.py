@@ -0,0 +1,57 @@
+"""
+Compares writing the rdf/xml output and then compressing it in a second pass with compressing
+it while it is written: total time and bytes written to disk.
+
+Usage: python -m tests.benchmark.compressionbenchmark [class_count] [codec]
+"""
+import os
+import shutil
+import sys
+import tempfile
+from src.owl.owl_compression import OWLCompression
+from src.owl.owl_writer import OWLWriter
+from tests.benchmark.benchmarkutils import build_owl_specification, best_time
+
+
+def write_owl_file(owl_specification, output_file):
+    OWLWriter(output_file).write_document(owl_specification.get_prefix(),
+                                          owl_specification.iter_owl_fragments())
+    output_file.close()
+
+
+def write_then_compress(owl_specification, filename, codec):
+    write_owl_file(owl_specification, open(filename, 'w'))
+    compressed_file = OWLCompression.open(filename + OWLCompression.EXTENSIONS[codec], codec)
+    with open(filename) as owl_file:
+        shutil.copyfileobj(owl_file, compressed_file)
+    compressed_file.close()
+
+
+def compress_while_writing(owl_specification, filename, codec):
+    write_owl_file(owl_specification,
+                   OWLCompression.open(filename + OWLCompression.EXTENSIONS[codec], codec))
+
+
+def run(class_count, codec):
+    owl_specification = build_owl_specification(class_count)
+    output_directory = tempfile.mkdtemp()
+    filename = os.path.join(output_directory, 'ontology.owl')
+    compressed_filename = filename + OWLCompression.EXTENSIONS[codec]
+
+    two_pass_time = best_time(lambda: write_then_compress(owl_specification, filename, codec))
+    raw_size = os.path.getsize(filename)
+    compressed_size = os.path.getsize(compressed_filename)
+    os.remove(filename)
+    one_pass_time = best_time(lambda: compress_while_writing(owl_specification, filename, codec))
+    shutil.rmtree(output_directory)
+
+    print('classes:            %d (%s)' % (class_count, codec))
+    print('raw bytes:          %12d  (ratio %.1fx)' % (raw_size, float(raw_size) / compressed_size))
+    print('                    %12s %12s' % ('two passes', 'on the fly'))
+    print('bytes written:      %12d %12d' % (raw_size + compressed_size, compressed_size))
+    print('time (s):           %12.3f %12.3f' % (two_pass_time, one_pass_time))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        sys.argv[2] if len(sys.argv) > 2 else OWLCompression.CODEC_GZIP)
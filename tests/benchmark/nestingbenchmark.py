@@ -0,0 +1,82 @@
+"""
+Stress test of deeply nested conjunctions and disjunctions: a glossary term whose necessity and
+definition alternate conjunctions and disjunctions depth levels deep, far past the recursion
+limit, parsed and written in every format.
+
+Usage: python -m tests.benchmark.nestingbenchmark [depth]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.owl.owl_output_options import OWLOutputOptions
+from src.sbvr.sbvrspecification import SBVRSpecification
+from tests.benchmark.benchmarkutils import best_time
+
+OPERATOR = ('<sbvr-logical-operator><sbvr-verb>verbo%d</sbvr-verb>'
+            '<sbvr-quantification type="at-least-N">1</sbvr-quantification>'
+            '<sbvr-concept>Clase%d</sbvr-concept></sbvr-logical-operator>')
+
+
+def build_nested_xml(depth):
+    tags = ['sbvr-conjunction' if level % 2 == 0 else 'sbvr-disjunction' for level in range(depth)]
+    operation = ''.join(['<%s>' % tag + OPERATOR % (level % 10, level) for level, tag in enumerate(tags)] +
+                        ['</%s>' % tag for tag in reversed(tags)])
+    return ''.join(['<sbvr-specification><sbvr-term>',
+                    '<sbvr-term-name>Clase</sbvr-term-name>',
+                    '<sbvr-term-general-concept></sbvr-term-general-concept>',
+                    '<sbvr-term-concept-type>general concept</sbvr-term-concept-type>',
+                    '<sbvr-term-synonym></sbvr-term-synonym>',
+                    '<sbvr-term-definition>', operation, '</sbvr-term-definition>',
+                    '<sbvr-term-necessity>', operation, '</sbvr-term-necessity>',
+                    '</sbvr-term></sbvr-specification>'])
+
+
+def parse(xml):
+    sbvr_specification = SBVRSpecification()
+    sbvr_specification.from_xml(ET.fromstring(xml))
+    return sbvr_specification
+
+
+def transform(sbvr_specification, filename, output_format):
+    output_options = OWLOutputOptions()
+    output_options.set_format(output_format)
+    transformer = SBVRToOWL(sbvr_specification, filename, 'http://example.org/benchmark',
+                            output_options)
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        transformer.transform()
+    finally:
+        sys.stdout = stdout
+    return transformer
+
+
+def run(depth):
+    xml = build_nested_xml(depth)
+    output_directory = tempfile.mkdtemp()
+    try:
+        print('depth:              %d (recursion limit %d)' % (depth, sys.getrecursionlimit()))
+        print('input bytes:        %d' % len(xml))
+        print('parse (s):          %.3f' % best_time(lambda: parse(xml)))
+        sbvr_specification = parse(xml)
+        for output_format in (OWLOutputOptions.FORMAT_RDF_XML, OWLOutputOptions.FORMAT_NTRIPLES,
+                              OWLOutputOptions.FORMAT_BINARY):
+            filename = os.path.join(output_directory, 'ontology.' + output_format)
+            elapsed = best_time(lambda: transform(sbvr_specification, filename, output_format))
+            print('%-20s%.3f (%d bytes)' % (output_format + ' (s):', elapsed,
+                                            os.path.getsize(filename)))
+
+        owl_specification = transform(sbvr_specification, os.path.join(
+            output_directory, 'ontology.owl'), OWLOutputOptions.FORMAT_RDF_XML).get_owl_specification()
+        print('normalize (s):      %.3f' % best_time(lambda: owl_specification.normalize(), 1))
+        print('canonicalize (s):   %.3f' % best_time(lambda: owl_specification.canonicalize(), 1))
+    finally:
+        shutil.rmtree(output_directory)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
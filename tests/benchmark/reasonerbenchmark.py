@@ -0,0 +1,40 @@
+"""
+Measures the time the subsumption reasoner takes to classify a generated specification, and
+how it grows with the number of classes: every tier is ten times the previous one. On one core,
+1k classes classified in 0.06s, 10k in 1.1s and 100k in 21s: the time per class grows with the
+size, and a million classes in seconds is not reached.
+
+Usage: python -m tests.benchmark.reasonerbenchmark [class_count] (default: 100000)
+"""
+import sys
+import time
+from src.owl.owl_reasoner import OWLReasoner
+from tests.benchmark.benchmarkutils import build_owl_specification
+
+
+def run(class_count):
+    tiers = []
+    tier = 1000
+    while tier < class_count:
+        tiers.append(tier)
+        tier *= 10
+    tiers.append(class_count)
+
+    print('%10s %10s %15s %14s %14s' % ('classes', 'nodes', 'inferred edges', 'classify (s)',
+                                        'per class (us)'))
+    for tier in tiers:
+        owl_specification = build_owl_specification(tier)
+
+        start = time.time()
+        reasoner = OWLReasoner(owl_specification)
+        reasoner.classify()
+        classify_time = time.time() - start
+
+        hierarchy = reasoner.get_hierarchy()
+        print('%10d %10d %15d %14.3f %14.1f' % (
+            tier, len(hierarchy), reasoner.get_inferred_edge_count(), classify_time,
+            classify_time / tier * 1e6))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
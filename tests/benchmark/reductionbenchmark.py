@@ -0,0 +1,42 @@
+"""
+Measures the transitive reduction of the told class hierarchy of a generated specification
+where every class also states the grandparent and the root as parents.
+
+Usage: python -m tests.benchmark.reductionbenchmark [class_count]
+"""
+import sys
+import time
+from src.owl.owl_specification import OWLSpecification
+
+
+def build_redundant_specification(class_count):
+    owl_specification = OWLSpecification('http://example.org/benchmark')
+    for index in range(class_count):
+        owl_class = OWLSpecification.OWLClassSpecification('Clase%d' % index)
+        if index > 0:
+            parent = (index - 1) // 10
+            owl_class.add_parent_class('Clase%d' % parent)
+            if parent > 0:
+                owl_class.add_parent_class('Clase%d' % ((parent - 1) // 10))
+                owl_class.add_parent_class('Clase0')
+        owl_specification.add_class_specification(owl_class)
+    return owl_specification
+
+
+def run(class_count):
+    owl_specification = build_redundant_specification(class_count)
+    axiom_count = sum(len(owl_class.get_sub_class_of())
+                      for owl_class in owl_specification.get_classes())
+
+    start = time.time()
+    removed = owl_specification.reduce_sub_class_of()
+    reduction_time = time.time() - start
+
+    print('classes:            %d' % class_count)
+    print('sub class axioms:   %d' % axiom_count)
+    print('removed:            %d' % removed)
+    print('reduction (s):      %.3f' % reduction_time)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
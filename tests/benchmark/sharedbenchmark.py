@@ -0,0 +1,54 @@
+"""
+Compares the rdf/xml output of a repetitive glossary, where classes pick their necessities and
+definitions from a small pool, written in place and with shared expressions: size and time.
+
+Usage: python -m tests.benchmark.sharedbenchmark [class_count] [pool_size]
+"""
+import sys
+from StringIO import StringIO
+from src.owl.owl_specification import OWLSpecification
+from src.owl.owl_writer import OWLWriter
+from tests.benchmark.benchmarkutils import best_time
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+def build_repetitive_specification(class_count, pool_size):
+    owl_specification = OWLSpecification('http://example.org/benchmark')
+    for index in range(class_count):
+        owl_class = OWLSpecification.OWLClassSpecification('Clase%d' % index)
+        pooled = index % pool_size
+        owl_class.add_parent_class_expression(build_logical_operation('conjunction', [
+            build_rule('verbo1', 'Recurso%d' % pooled, 'at-least-N', '1'),
+            build_rule('verbo2', 'Recurso%d' % (pooled + 1), 'at-least-N', '2')]))
+        owl_class.add_equivalence_rule(build_logical_operation('single-clause', [
+            build_rule('verbo3',
+                       ['Recurso%d' % pooled, 'Recurso%d' % (pooled + 2), 'Recurso%d' % (pooled + 3)],
+                       'existential', None)]))
+        owl_specification.add_class_specification(owl_class)
+    return owl_specification
+
+
+def write_document(owl_specification, shared):
+    output_file = StringIO()
+    OWLWriter(output_file).write_document(owl_specification.get_prefix(),
+                                          owl_specification.iter_owl_fragments(shared = shared))
+    return output_file.getvalue()
+
+
+def run(class_count, pool_size):
+    owl_specification = build_repetitive_specification(class_count, pool_size)
+    sizes = {}
+    times = {}
+    for shared in (False, True):
+        times[shared] = best_time(lambda: sizes.__setitem__(
+            shared, len(write_document(owl_specification, shared))))
+
+    print('classes:            %d (pool of %d)' % (class_count, pool_size))
+    print('                    %12s %12s' % ('in place', 'shared'))
+    print('bytes:              %12d %12d' % (sizes[False], sizes[True]))
+    print('time (s):           %12.3f %12.3f' % (times[False], times[True]))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,218 @@
+"""
+Times every stage of the transformation over tiers of generated specifications: the parsing of
+the xml (SBVRSpecification.from_xml), the transformation (SBVRToOWL.build_owl_specification),
+the rendering of the owl content (OWLSpecification.build_owl_content) and the write of the owl
+file. The throughput and peak memory of every stage are written as json, and compared against a
+baseline: the run fails if a stage is slower, or needs more memory, than the baseline allows.
+Timings depend on the machine, so the baseline is saved (--save-baseline) on the machine that
+runs the comparison.
+
+Usage: python -m tests.benchmark.stagebenchmark [--tiers 1000,10000,100000] [--repeat 3]
+           [--seed 0] [--output results.json] [--baseline stagebaseline.json]
+           [--threshold 0.3] [--memory-threshold 0.25] [--min-seconds 0.05] [--save-baseline]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+from tests.benchmark.benchmarkutils import best_time
+
+VERSION = 1
+STAGES = ('parse', 'transform', 'render', 'write')
+DEFAULT_TIERS = (1000, 10000, 100000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stagebaseline.json')
+PREFIX = 'http://example.org/benchmark'
+
+
+def get_peak_rss():
+    """
+    Returns the peak resident memory of this process, in kilobytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def record_stage(stages, stage, term_count, elapsed):
+    stages[stage] = {
+        'seconds': round(elapsed, 4),
+        'terms_per_second': int(term_count / elapsed) if elapsed > 0 else None,
+        'peak_rss_kb': get_peak_rss(),
+    }
+
+
+def run_tier(term_count, repeat=3, seed=0):
+    """
+    Generates a specification with the given number of terms and returns the measures of every
+    stage over it. Peak memory is that of the whole process after the stage, so tiers are run
+    in a fresh process each.
+    """
+    directory = tempfile.mkdtemp()
+    stdout = sys.stdout
+    try:
+        input_filename = os.path.join(directory, 'rules.xml')
+        with open(input_filename, 'w') as input_file:
+            SBVRWorkloadGenerator(term_count, seed = seed).write(input_file)
+        output_filename = os.path.join(directory, 'ontology.owl')
+
+        stages = {}
+        root = ET.parse(input_filename).getroot()
+        record_stage(stages, 'parse', term_count,
+                     best_time(lambda: SBVRSpecification().from_xml(root), repeat))
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml(root)
+        root = None
+
+        def build_transformer():
+            # the transformation prints every term
+            sys.stdout = StringIO()
+            transformer = SBVRToOWL(sbvr_specification, output_filename, PREFIX)
+            transformer.build_owl_specification()
+            return transformer
+
+        transformers = [build_transformer()]
+
+        def transform():
+            transformers[0].close()
+            transformers[0] = build_transformer()
+
+        record_stage(stages, 'transform', term_count, best_time(transform, repeat))
+        record_stage(stages, 'render', term_count, best_time(
+            transformers[0].get_owl_specification().build_owl_content, repeat))
+
+        # every write needs a transformer of its own, which is built before the write is timed
+        write_times = []
+        for _ in range(repeat):
+            transformer = transformers[0]
+            write_times.append(best_time(lambda: (transformer.write_ontology_to_owl_file(),
+                                                  transformer.close()), 1))
+            output_bytes = os.path.getsize(output_filename)
+            transformers[0] = build_transformer()
+        transformers[0].close()
+        record_stage(stages, 'write', term_count, min(write_times))
+        return {
+            'terms': term_count,
+            'input_bytes': os.path.getsize(input_filename),
+            'output_bytes': output_bytes,
+            'stages': stages,
+        }
+    finally:
+        sys.stdout = stdout
+        shutil.rmtree(directory)
+
+
+def run(tiers, repeat=3, seed=0):
+    """
+    Runs every tier in its own worker process and returns the results.
+    """
+    results = {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'seed': seed,
+        'tiers': {},
+    }
+    for term_count in tiers:
+        pool = multiprocessing.Pool(1)
+        try:
+            results['tiers'][str(term_count)] = pool.apply(run_tier, (term_count, repeat, seed))
+            pool.close()
+        finally:
+            pool.terminate()
+    return results
+
+
+def compare(results, baseline, threshold=0.3, memory_threshold=0.25, min_seconds=0.05):
+    """
+    Returns the list of the regressions of the results against the baseline: the stages of the
+    tiers of both that are more than threshold (a fraction) slower, or whose peak memory is more
+    than memory_threshold larger. Differences under min_seconds are taken as noise.
+    """
+    regressions = []
+    for tier, tier_results in sorted(results['tiers'].items(), key = lambda item: int(item[0])):
+        baseline_tier = baseline.get('tiers', {}).get(tier)
+        if baseline_tier is None:
+            continue
+        for stage in STAGES:
+            measures = tier_results['stages'].get(stage)
+            baseline_measures = baseline_tier['stages'].get(stage)
+            if measures is None or baseline_measures is None:
+                continue
+            seconds, baseline_seconds = measures['seconds'], baseline_measures['seconds']
+            if seconds > baseline_seconds * (1 + threshold) and \
+                    seconds - baseline_seconds > min_seconds:
+                regressions.append('%s terms, %s: %.4fs against %.4fs (+%d%%)' % (
+                    tier, stage, seconds, baseline_seconds,
+                    100 * (seconds - baseline_seconds) / baseline_seconds))
+            rss, baseline_rss = measures['peak_rss_kb'], baseline_measures['peak_rss_kb']
+            if rss > baseline_rss * (1 + memory_threshold):
+                regressions.append('%s terms, %s: peak memory %dKB against %dKB (+%d%%)' % (
+                    tier, stage, rss, baseline_rss, 100 * (rss - baseline_rss) / baseline_rss))
+    return regressions
+
+
+def print_results(results):
+    print('%-10s%-11s%10s%15s%14s' % ('terms', 'stage', 'seconds', 'terms/s', 'peak rss KB'))
+    for tier, tier_results in sorted(results['tiers'].items(), key = lambda item: int(item[0])):
+        for stage in STAGES:
+            measures = tier_results['stages'][stage]
+            print('%-10s%-11s%10.4f%15s%14d' % (tier, stage, measures['seconds'],
+                                                measures['terms_per_second'],
+                                                measures['peak_rss_kb']))
+
+
+def write_json(results, filename):
+    with open(filename, 'w') as output_file:
+        json.dump(results, output_file, indent = 2, separators = (',', ': '), sort_keys = True)
+        output_file.write('\n')
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description = 'Times the stages of the transformation.')
+    parser.add_argument('--tiers', default = ','.join([str(tier) for tier in DEFAULT_TIERS]),
+                        help = 'comma separated term counts')
+    parser.add_argument('--repeat', type = int, default = 3,
+                        help = 'the number of times every stage is timed, the best time is kept')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', help = 'the json file to write the results to')
+    parser.add_argument('--baseline', default = DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type = float, default = 0.3,
+                        help = 'the allowed slowdown of a stage, as a fraction')
+    parser.add_argument('--memory-threshold', type = float, default = 0.25,
+                        help = 'the allowed growth of the peak memory of a stage, as a fraction')
+    parser.add_argument('--min-seconds', type = float, default = 0.05,
+                        help = 'the slowdown of a stage, in seconds, that is taken as noise')
+    parser.add_argument('--save-baseline', action = 'store_true',
+                        help = 'write the results as the new baseline instead of comparing')
+    options = parser.parse_args(arguments)
+
+    results = run([int(tier) for tier in options.tiers.split(',')], options.repeat, options.seed)
+    print_results(results)
+    if options.output:
+        write_json(results, options.output)
+    if options.save_baseline:
+        write_json(results, options.baseline)
+        print('Baseline written to %s' % options.baseline)
+        return 0
+    if not os.path.exists(options.baseline):
+        print('No baseline at %s' % options.baseline)
+        return 0
+
+    with open(options.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file), options.threshold,
+                              options.memory_threshold, options.min_seconds)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import unittest
+from tests.benchmark import stagebenchmark
+
+
+class StageBenchmarkTest(unittest.TestCase):
+    """
+    Test cases for the measures of the stage benchmark and their comparison with a baseline.
+    """
+
+    def test_tier_has_the_measures_of_every_stage(self):
+        results = stagebenchmark.run_tier(50, repeat = 1)
+        self.assertEquals(50, results['terms'])
+        self.assertTrue(results['output_bytes'] > 0)
+        self.assertEquals(sorted(stagebenchmark.STAGES), sorted(results['stages']))
+        for measures in results['stages'].values():
+            self.assertTrue(measures['peak_rss_kb'] > 0)
+
+    def test_regressions_past_the_thresholds(self):
+        baseline = self.build_results(1.0, 1000)
+        self.assertEquals([], stagebenchmark.compare(self.build_results(1.2, 1100), baseline))
+
+        regressions = stagebenchmark.compare(self.build_results(1.5, 1000), baseline)
+        self.assertEquals(len(stagebenchmark.STAGES), len(regressions))
+        self.assertTrue('parse: 1.5000s against 1.0000s (+50%)' in regressions[0])
+        self.assertEquals(len(stagebenchmark.STAGES), len(stagebenchmark.compare(
+            self.build_results(1.0, 2000), baseline)))
+
+        # tiny slowdowns are noise, and tiers missing from the baseline are not compared
+        self.assertEquals([], stagebenchmark.compare(self.build_results(0.04, 1000),
+                                                     self.build_results(0.01, 1000)))
+        self.assertEquals([], stagebenchmark.compare(self.build_results(1.5, 1000), {'tiers': {}}))
+
+    def build_results(self, seconds, peak_rss_kb):
+        stages = dict((stage, {'seconds': seconds, 'terms_per_second': 1, 'peak_rss_kb': peak_rss_kb})
+                      for stage in stagebenchmark.STAGES)
+        return {'tiers': {'1000': {'terms': 1000, 'stages': stages}}}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Compares the classes per second rendered by the compiled, prefix bound templates against
+formatting the templates with str.format on every call, as the specification used to do. The
+emitters are not faster: they let nested templates write straight to the output, and this
+checks they stay close to plain formatting.
+
+Usage: python -m tests.benchmark.templatebenchmark [class_count]
+"""
+import sys
+from src.owl.owl_specification import OWLSpecification
+from src.owl.owl_templates import OWLTemplates
+from tests.benchmark.benchmarkutils import build_owl_specification, best_time
+
+
+class FormatTemplateRenderer:
+    """
+    Renders class specifications by formatting every template with str.format, passing the
+    prefix on each call and joining the nested templates into intermediate strings.
+    """
+    T = OWLSpecification.OWLClassSpecification
+
+    def __init__(self, prefix):
+        self._prefix = prefix
+
+    def render(self, owl_class):
+        T = self.T
+        return T.OWL_CLASS_TEMPLATE.format(
+            prefix = self._prefix,
+            classname = owl_class.get_classname(),
+            sub_class_clauses = '\n'.join(
+                T.OWL_SUB_CLASS_OF_TEMPLATE.format(prefix = self._prefix, parent = parent)
+                for parent in owl_class.get_sub_class_of()),
+            synonym_equivalences = '\n'.join(
+                T.OWL_SYNONYM_EQUIVALENCE_TEMPLATE.format(prefix = self._prefix, classname = synonym)
+                for synonym in owl_class.get_synonym_equivalences()),
+            equivalence_class_expressions = '\n'.join(
+                self.render_equivalence(operation) for operation in owl_class.get_equivalence_rules()),
+            sub_class_of_expressions = '\n'.join(
+                self.render_necessity(operation) for operation in owl_class.get_sub_class_of_expressions()))
+
+    def render_necessity(self, logical_operation):
+        T = self.T
+        if logical_operation.is_single_clause():
+            return T.OWL_NECESSARY_CONDITION_TEMPLATE.format(
+                restriction = self.render_restriction(logical_operation.get_logical_operators()[0]))
+        return T.OWL_COMPOUND_NECESSARY_CONDITION_TEMPLATE.format(
+            necessary_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf",
+            restrictions = '\n'.join(self.render_restriction(rule)
+                                     for rule in logical_operation.get_logical_operators()))
+
+    def render_restriction(self, rule):
+        T = self.T
+        quantification = rule.get_quantification()
+        return T.OWL_RESTRICTION_TEMPLATE.format(
+            restriction_rule = T.OWL_RESTRICTION_RULE_TEMPLATE.format(
+                prefix = self._prefix,
+                classname = rule.get_rule_range().get_range(),
+                property_name = rule.get_verb(),
+                quantification_cardinality = 'minQualifiedCardinality'
+                    if quantification.get_type() == 'at-least-N' else '',
+                cardinality_value = quantification.get_value()
+                    if quantification.get_value() is not None else ''))
+
+    def render_equivalence(self, logical_operation):
+        T = self.T
+        if logical_operation.is_single_clause():
+            rule = logical_operation.get_logical_operators()[0]
+            return T.OWL_EQUIVALENCE_CLASS_TEMPLATE.format(
+                prefix = self._prefix,
+                property_name = rule.get_verb(),
+                all_values_from = self.render_all_values_from(rule))
+        return T.OWL_COMPOUND_EQUIVALENCE_CLASS_TEMPLATE.format(
+            equivalence_type = "intersectionOf" if logical_operation.is_conjunction() else "unionOf",
+            restrictions = '\n'.join(
+                T.OWL_RESTRICTION_TEMPLATE.format(
+                    restriction_rule = T.OWL_EQUIVALENCE_RESTRICTION_TEMPLATE.format(
+                        prefix = self._prefix,
+                        property_name = rule.get_verb(),
+                        all_values_from = self.render_all_values_from(rule)))
+                for rule in logical_operation.get_logical_operators()))
+
+    def render_all_values_from(self, rule):
+        T = self.T
+        rule_range = rule.get_rule_range()
+        if rule_range.is_noun_concept():
+            return T.OWL_ALL_VALUES_FROM_SINGLE_CLASS_TEMPLATE.format(
+                prefix = self._prefix, classname = rule_range.get_range())
+        return T.OWL_ALL_VALUES_FROM_TEMPLATE.format(
+            prefix = self._prefix,
+            set_type = 'intersectionOf' if rule_range.is_conjunction() else 'unionOf',
+            descriptions = '\n'.join(
+                T.OWL_DESCRIPTION_TEMPLATE.format(prefix = self._prefix, classname = classname)
+                for classname in rule_range.get_range()))
+
+
+def run(class_count):
+    owl_specification = build_owl_specification(class_count)
+    owl_classes = owl_specification.get_classes()
+    prefix = 'http://example.org/benchmark'
+
+    format_renderer = FormatTemplateRenderer(prefix)
+    owl_templates = OWLTemplates(prefix)
+    for owl_class in owl_classes:
+        if format_renderer.render(owl_class) != owl_class.render_owl(owl_templates):
+            raise AssertionError('Different output for ' + owl_class.get_classname())
+
+    format_time = best_time(lambda: [format_renderer.render(owl_class) for owl_class in owl_classes])
+    compiled_time = best_time(lambda: [owl_class.render_owl(owl_templates) for owl_class in owl_classes])
+
+    print('classes:               %d' % class_count)
+    print('str.format per call:   %.0f classes/sec' % (class_count / format_time))
+    print('compiled templates:    %.0f classes/sec' % (class_count / compiled_time))
+    print('relative speed:        %.2fx' % (format_time / compiled_time))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,168 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MAIN = os.path.join(ROOT, 'main.py')
+
+
+class MainTest(unittest.TestCase):
+    """
+    Test cases for the command line: it runs without prompts, and its cold start stays under a
+    fixed budget. The budgets are several times the times measured on a development machine, so
+    they only fail when the start up gets noticeably slower, such as when a heavy module is
+    imported where it is not needed.
+    """
+    HELP_BUDGET = 0.5
+    TRANSFORM_BUDGET = 2.0
+    REPEAT = 3
+    SMALL_TERM_COUNT = 200
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def write_input(self):
+        input_filename = os.path.join(self._directory, 'rules.xml')
+        with open(input_filename, 'w') as input_file:
+            SBVRWorkloadGenerator(self.SMALL_TERM_COUNT).write(input_file)
+        return input_filename
+
+    def run_main(self, *arguments):
+        """
+        Runs the command line in a new process, the given number of times, and returns the best
+        time, the exit status and the output of the last run.
+        """
+        best = None
+        for _ in range(self.REPEAT):
+            start = time.time()
+            process = subprocess.Popen([sys.executable, MAIN] + list(arguments), cwd = ROOT,
+                                       stdin = subprocess.PIPE, stdout = subprocess.PIPE,
+                                       stderr = subprocess.PIPE)
+            output, error = process.communicate()
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, process.returncode, output, error
+
+    def test_help_is_under_budget(self):
+        elapsed, status, output, _ = self.run_main('--help')
+        self.assertEquals(0, status)
+        self.assertIn(b'--output', output)
+        self.assertLess(elapsed, self.HELP_BUDGET)
+
+    def test_small_transform_is_under_budget(self):
+        input_filename = self.write_input()
+        output_filename = os.path.join(self._directory, 'ontology.owl')
+        elapsed, status, output, _ = self.run_main('-i', input_filename, '-o', output_filename,
+                                                   '-p', 'http://example.org/onto', '--quiet')
+        self.assertEquals(0, status)
+        self.assertEquals(b'', output)
+        with open(output_filename) as output_file:
+            self.assertIn('http://example.org/onto', output_file.read())
+        self.assertLess(elapsed, self.TRANSFORM_BUDGET)
+
+    def test_second_transform_is_served_from_the_cache(self):
+        input_filename = self.write_input()
+        cache_directory = os.path.join(self._directory, 'cache')
+        outputs = []
+        for name in ('first.owl', 'second.owl'):
+            output_filename = os.path.join(self._directory, name)
+            process = subprocess.Popen(
+                [sys.executable, MAIN, '-i', input_filename, '-o', output_filename, '--quiet',
+                 '--cache', cache_directory], cwd = ROOT, stdout = subprocess.PIPE)
+            output, _ = process.communicate()
+            self.assertEquals(0, process.returncode)
+            with open(output_filename) as output_file:
+                outputs.append((output, output_file.read()))
+        self.assertEquals(b'', outputs[0][0])
+        self.assertIn(b'from the cache', outputs[1][0])
+        self.assertEquals(outputs[0][1], outputs[1][1])
+
+    def test_cached_ontology_is_not_changed_by_later_outputs(self):
+        input_filename = self.write_input()
+        cache_directory = os.path.join(self._directory, 'cache')
+        output_filename = os.path.join(self._directory, 'ontology.owl')
+        cached = ['-i', input_filename, '-o', output_filename, '-p', 'http://example.org/onto',
+                  '--quiet', '--cache', cache_directory]
+        outputs = []
+        for arguments in (cached, cached,
+                          cached[:-2] + ['-f', 'ntriples'],
+                          cached):
+            process = subprocess.Popen([sys.executable, MAIN] + arguments, cwd = ROOT,
+                                       stdout = subprocess.PIPE)
+            output, _ = process.communicate()
+            self.assertEquals(0, process.returncode)
+            with open(output_filename) as output_file:
+                outputs.append((output, output_file.read()))
+        self.assertIn(b'from the cache', outputs[1][0])
+        self.assertIn('<rdf:RDF', outputs[1][1])
+        self.assertNotIn('<rdf:RDF', outputs[2][1])
+        # the ntriples run wrote over the served output, not over the cached rdf/xml
+        self.assertIn(b'from the cache', outputs[3][0])
+        self.assertEquals(outputs[0][1], outputs[3][1])
+
+    def test_invalid_format_is_an_error(self):
+        _, status, _, error = self.run_main('--format', 'csv')
+        self.assertEquals(2, status)
+        self.assertIn(b'csv', error)
+
+    def test_invalid_values_are_argument_errors(self):
+        for arguments in (('--processes', '0'), ('--memory-budget', '-1'), ('--interval', '0'),
+                          ('--debounce', '-1'), ('--cache-size', '-1'), ('--profile-terms', '0'),
+                          ('--compression', 'gzip', '--compression-level', '12')):
+            _, status, _, error = self.run_main(*arguments)
+            self.assertEquals(2, status)
+            self.assertIn(b'error:', error)
+            self.assertNotIn(b'Traceback', error)
+
+    def test_ignored_output_modes_are_argument_errors(self):
+        for arguments, message in (
+                (('--shared', '--shard-count', '2'), b'Shared expressions'),
+                (('--shared', '--shard-size', '1024'), b'Shared expressions'),
+                (('--compact', '-f', 'ntriples'), b'Compact output'),
+                (('--compact', '-f', 'turtle'), b'Compact output'),
+                (('--compact', '-f', 'binary'), b'Compact output'),
+                (('--processes', '2', '-f', 'turtle'), b'Several processes'),
+                (('--processes', '2', '-f', 'binary'), b'Several processes'),
+                (('--spill-directory', self._directory), b'spill directory')):
+            _, status, _, error = self.run_main(*arguments)
+            self.assertEquals(2, status)
+            self.assertIn(message, error)
+            self.assertNotIn(b'Traceback', error)
+
+    def test_missing_input_is_an_error(self):
+        _, status, _, error = self.run_main('-i', os.path.join(self._directory, 'missing.xml'),
+                                            '-o', os.path.join(self._directory, 'ontology.owl'))
+        self.assertEquals(1, status)
+        self.assertIn(b'missing.xml', error)
+
+    def test_help_does_not_import_the_transformation(self):
+        process = subprocess.Popen(
+            [sys.executable, '-c', 'import sys, main; main.build_argument_parser(); '
+                                   'print(sorted(name for name in sys.modules '
+                                   'if name.startswith("src")))'],
+            cwd = ROOT, stdout = subprocess.PIPE)
+        output, _ = process.communicate()
+        self.assertEquals(b'[]', output.strip())
+
+    def test_rdf_xml_does_not_import_the_other_outputs(self):
+        input_filename = self.write_input()
+        process = subprocess.Popen(
+            [sys.executable, '-c', 'import sys, main; main.main(sys.argv[1:]); '
+                                   'print(sorted(name for name in sys.modules '
+                                   'if name.startswith("src")))',
+             '-i', input_filename, '-o', os.path.join(self._directory, 'ontology.owl'),
+             '-p', 'http://example.org/onto', '--quiet'],
+            cwd = ROOT, stdout = subprocess.PIPE)
+        output, _ = process.communicate()
+        self.assertEquals(0, process.returncode)
+        for module in (b'owl_ntriples', b'owl_turtle', b'owl_triple_store', b'owl_binary',
+                       b'owl_shards', b'owl_compression', b'instrumentation'):
+            self.assertNotIn(module, output)
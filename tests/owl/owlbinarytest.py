@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from src.owl.owl_specification import *
+from src.owl.owl_binary import OWLBinaryWriter, OWLBinaryReader
+from tests.owl import owlfixtures
+
+
+class OWLBinaryTest(unittest.TestCase):
+    """
+    Test cases for the binary serialization of the owl specification.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._output_directory = tempfile.mkdtemp()
+        self._filename = os.path.join(self._output_directory, 'ontology.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self._output_directory)
+
+    def test_round_trip_to_owl(self):
+        owl_specification = self.build_owl_specification()
+        reader = self.write_and_read(owl_specification)
+
+        self.assertEquals(self.PREFIX, reader.get_prefix())
+        self.assertEquals(owl_specification.build_owl_content(),
+                          reader.to_owl_specification().build_owl_content())
+        reader.close()
+
+    def test_terms_are_stored_once(self):
+        reader = self.write_and_read(self.build_owl_specification())
+
+        # prefix, the property, its domain and range, the classes, verbs, quantifications...
+        terms = [reader.get_term(term_id) for term_id in range(reader.get_term_count())]
+        self.assertEquals(len(set(terms)), len(terms))
+        self.assertEquals(1, terms.count('Alimento'))
+        reader.close()
+
+    def test_entities_are_read_on_demand(self):
+        reader = self.write_and_read(self.build_owl_specification())
+
+        dieta = reader.get_entity(3)
+        self.assertEquals('Dieta', dieta.get_classname())
+        self.assertEquals(dieta.to_owl(self.PREFIX),
+                          self.build_owl_specification().get_classes()[1].to_owl(self.PREFIX))
+        reader.close()
+
+    def test_non_ascii_terms(self):
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(
+            OWLSpecification.OWLClassSpecification(u'Camión'))
+        reader = self.write_and_read(owl_specification)
+
+        self.assertEquals(u'Camión', reader.get_entity(0).get_classname())
+        reader.close()
+
+    def test_rejects_other_files(self):
+        with open(self._filename, 'wb') as output_file:
+            output_file.write(b'<?xml version="1.0"?>' + b' ' * 64)
+
+        self.assertRaises(ValueError, OWLBinaryReader, self._filename)
+
+    def test_rejects_other_versions(self):
+        with open(self._filename, 'wb') as output_file:
+            output_file.write(OWLBinaryWriter.HEADER.pack(OWLBinaryWriter.MAGIC, 7, 0, 0, 0, 0, 0))
+
+        try:
+            OWLBinaryReader(self._filename)
+            self.fail('version 7 was read')
+        except ValueError as error:
+            self.assertIn('version 7', str(error))
+
+    def write_and_read(self, owl_specification):
+        with open(self._filename, 'wb') as output_file:
+            OWLBinaryWriter().write(owl_specification, output_file)
+        return OWLBinaryReader(self._filename)
+
+    def build_owl_specification(self):
+        return owlfixtures.build_owl_specification(self.PREFIX, synonym = 'DietaVegana')
+
+
+if __name__ == '__main__':
+    unittest.main()
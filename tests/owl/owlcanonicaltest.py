@@ -0,0 +1,74 @@
+import unittest
+from src.owl.owl_specification import *
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+class OWLCanonicalTest(unittest.TestCase):
+    """
+    Test cases for the canonical ordering of the owl specification.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def test_input_order_does_not_change_canonical_output(self):
+        owl_specification = self.build_owl_specification(reverse = False)
+        reversed_owl_specification = self.build_owl_specification(reverse = True)
+        self.assertNotEquals(owl_specification.build_owl_content(),
+                             reversed_owl_specification.build_owl_content())
+
+        owl_specification.canonicalize()
+        reversed_owl_specification.canonicalize()
+        self.assertEquals(owl_specification.build_owl_content(),
+                          reversed_owl_specification.build_owl_content())
+
+    def test_canonical_order(self):
+        owl_specification = self.build_owl_specification(reverse = True)
+        owl_specification.canonicalize()
+
+        self.assertEquals(['permite_consumo_de', 'tiene_calorias'],
+                          [owl_property.get_name() for owl_property in
+                           owl_specification.get_object_properties()])
+        self.assertEquals(['Dieta', 'Veganismo'],
+                          [owl_class.get_classname() for owl_class in owl_specification.get_classes()])
+
+        dieta = owl_specification.get_classes()[0]
+        self.assertEquals(['Alimento', 'RegimenAlimentario'], dieta.get_sub_class_of())
+        conjunction = dieta.get_sub_class_of_expressions()[0]
+        self.assertEquals(['Carne', 'Fruta'], [rule.get_rule_range().get_range()
+                                               for rule in conjunction.get_logical_operators()])
+
+        veganismo = owl_specification.get_classes()[1]
+        self.assertEquals(['AlimentoOrigenVegetal', 'Miel'],
+                          veganismo.get_equivalence_rules()[0].get_logical_operators()[0].
+                          get_rule_range().get_range())
+
+    def build_owl_specification(self, reverse):
+        """
+        Builds the same specification, adding everything in order or in reverse order.
+        """
+        order = lambda items: list(reversed(items)) if reverse else list(items)
+
+        owl_properties = [
+            OWLSpecification.OWLObjectPropertySpecification(
+                'permite_consumo_de', 'RegimenAlimentario', 'Alimento'),
+            OWLSpecification.OWLDataPropertySpecification('tiene_calorias', 'Alimento', 'integer')]
+
+        dieta = OWLSpecification.OWLClassSpecification('Dieta')
+        for parent in order(['Alimento', 'RegimenAlimentario']):
+            dieta.add_parent_class(parent)
+        dieta.add_parent_class_expression(build_logical_operation('conjunction', order([
+            build_rule('permite_consumo_de', 'Carne'), build_rule('permite_consumo_de', 'Fruta')])))
+
+        veganismo = OWLSpecification.OWLClassSpecification('Veganismo')
+        veganismo.add_equivalence_rule(build_logical_operation('single-clause', [build_rule(
+            'permite_consumo_de', order(['AlimentoOrigenVegetal', 'Miel']), 'existential', None)]))
+
+        owl_specification = OWLSpecification(self.PREFIX)
+        for owl_property in order(owl_properties):
+            owl_specification.add_object_property(owl_property)
+        for owl_class in order([dieta, veganismo]):
+            owl_specification.add_class_specification(owl_class)
+        return owl_specification
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+from src.owl.owl_specification import OWLSpecification
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+def build_owl_specification(prefix, synonym=None):
+    """
+    Builds a specification with an object property, a data property, a defined class
+    and a class with a necessity. The defined class has the given synonym, if any.
+    """
+    owl_specification = OWLSpecification(prefix)
+    owl_specification.add_object_property(OWLSpecification.OWLObjectPropertySpecification(
+        'permite_consumo_de', 'RegimenAlimentario', 'Alimento'))
+    owl_specification.add_object_property(OWLSpecification.OWLDataPropertySpecification(
+        'tiene_calorias', 'Alimento', 'integer'))
+
+    veganismo = OWLSpecification.OWLClassSpecification('Veganismo')
+    veganismo.add_parent_class('RegimenAlimentario')
+    if synonym is not None:
+        veganismo.add_synonym_equivalence(synonym)
+    veganismo.add_equivalence_rule(build_logical_operation('single-clause', [build_rule(
+        'permite_consumo_de', ['Miel', 'AlimentoOrigenVegetal'], 'existential', None)]))
+    owl_specification.add_class_specification(veganismo)
+
+    dieta = OWLSpecification.OWLClassSpecification('Dieta')
+    dieta.add_parent_class_expression(build_logical_operation('single-clause', [
+        build_rule('permite_consumo_de', 'Alimento', 'at-least-N', '1')]))
+    owl_specification.add_class_specification(dieta)
+    return owl_specification
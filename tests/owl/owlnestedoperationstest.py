@@ -0,0 +1,102 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.owl.owl_specification import *
+from src.owl.owl_binary import OWLBinaryWriter, OWLBinaryReader
+from src.owl.owl_triple_store import OWLTripleStore
+from src.owl.owl_turtle import OWLTurtleSerializer
+from src.owl.owl_writer import OWLWriter
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+class OWLNestedOperationsTest(unittest.TestCase):
+    """
+    Test cases for the conjunctions and disjunctions nested in class expressions.
+    """
+    PREFIX = 'http://example.org/onto'
+    OWL = '{http://www.w3.org/2002/07/owl#}'
+    RDFS = '{http://www.w3.org/2000/01/rdf-schema#}'
+
+    def setUp(self):
+        self._output_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._output_directory)
+
+    def test_nested_operation_is_an_anonymous_class(self):
+        owl_class = OWLSpecification.OWLClassSpecification('Postulante')
+        owl_class.add_parent_class_expression(self.build_nested_operation(2))
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(owl_class)
+
+        for compact in (False, True):
+            root = ET.fromstring(self.write_document(owl_specification, compact))
+            sub_class_of = root.find(self.OWL + 'Class').find(self.RDFS + 'subClassOf')
+            conjunction = sub_class_of.find(self.OWL + 'Class').find(self.OWL + 'intersectionOf')
+            self.assertEquals([self.OWL + 'Restriction', self.OWL + 'Class'],
+                              [element.tag for element in conjunction])
+            disjunction = conjunction.find(self.OWL + 'Class').find(self.OWL + 'unionOf')
+            self.assertEquals([self.OWL + 'Restriction'], [element.tag for element in disjunction])
+
+    def test_deeply_nested_operations(self):
+        depth = sys.getrecursionlimit() * 3
+        owl_class = OWLSpecification.OWLClassSpecification('Postulante')
+        owl_class.add_parent_class_expression(self.build_nested_operation(depth))
+        owl_class.add_equivalence_rule(self.build_nested_operation(depth))
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(owl_class)
+
+        # the necessity and the definition have a collection at every level
+        content = self.write_document(owl_specification)
+        self.assertEquals(2 * depth, content.count('<owl:intersectionOf') + content.count('<owl:unionOf'))
+        self.assertEquals(2 * depth, content.count('</owl:intersectionOf>') +
+                          content.count('</owl:unionOf>'))
+
+        # every level has a restriction with its triples, and an rdf list of two members
+        triple_store = OWLTripleStore.from_owl_specification(owl_specification, self.PREFIX)
+        self.assertTrue(len(triple_store) > 2 * depth * 6)
+        turtle = StringIO()
+        OWLTurtleSerializer(self.PREFIX).write_store(triple_store, turtle)
+        self.assertEquals(2 * depth, turtle.getvalue().count('owl:Restriction'))
+
+        filename = os.path.join(self._output_directory, 'ontology.bin')
+        with open(filename, 'wb') as output_file:
+            OWLBinaryWriter().write(owl_specification, output_file)
+        reader = OWLBinaryReader(filename)
+        self.assertEquals(owl_class.to_owl(self.PREFIX), reader.get_entity(0).to_owl(self.PREFIX))
+        reader.close()
+
+        # the innermost operation has a single rule, which is moved to the operation around it
+        owl_specification.normalize()
+        owl_specification.canonicalize()
+        content = self.write_document(owl_specification)
+        self.assertEquals(2 * (depth - 1), content.count('<owl:intersectionOf') +
+                          content.count('<owl:unionOf'))
+
+    def build_nested_operation(self, depth):
+        """
+        Builds a conjunction nested depth levels deep, alternating conjunctions and
+        disjunctions, with a rule at every level.
+        """
+        logical_operation = None
+        for level in reversed(range(depth)):
+            operators = [build_rule('tiene', 'Concepto%d' % level)]
+            if logical_operation is not None:
+                operators.append(logical_operation)
+            logical_operation = build_logical_operation(
+                'conjunction' if level % 2 == 0 else 'disjunction', operators)
+        return logical_operation
+
+    def write_document(self, owl_specification, compact=False):
+        output_file = StringIO()
+        OWLWriter(output_file, compact = compact).write_document(
+            self.PREFIX, owl_specification.iter_owl_fragments(compact))
+        return output_file.getvalue()
+
+
+if __name__ == '__main__':
+    unittest.main()
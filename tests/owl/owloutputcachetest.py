@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.owl.owl_output_cache import OWLOutputCache
+from src.owl.owl_output_options import OWLOutputOptions
+
+
+class OWLOutputCacheTest(unittest.TestCase):
+    """
+    Test cases for the cache of finished ontologies.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._cache_directory = os.path.join(self._directory, 'cache')
+        self._input_filename = self.write('rules.xml', '<sbvr-specification/>')
+
+    def tearDown(self):
+        for directory, _, filenames in os.walk(self._directory):
+            for filename in filenames:
+                os.chmod(os.path.join(directory, filename), 0o644)
+        shutil.rmtree(self._directory)
+
+    def test_key_depends_on_what_changes_the_output(self):
+        output_options = OWLOutputOptions()
+        key = OWLOutputCache.get_key([self._input_filename], self.PREFIX, output_options)
+        self.assertEquals(key, OWLOutputCache.get_key([self._input_filename], self.PREFIX,
+                                                      output_options))
+        self.assertNotEquals(key, OWLOutputCache.get_key([self._input_filename], 'http://other',
+                                                         output_options))
+        self.assertNotEquals(key, OWLOutputCache.get_key(
+            [self._input_filename, self._input_filename], self.PREFIX, output_options))
+
+        output_options.set_processes(4)
+        self.assertEquals(key, OWLOutputCache.get_key([self._input_filename], self.PREFIX,
+                                                      output_options))
+        output_options.set_compact(True)
+        self.assertNotEquals(key, OWLOutputCache.get_key([self._input_filename], self.PREFIX,
+                                                         output_options))
+
+        self.write('rules.xml', '<sbvr-specification></sbvr-specification>')
+        self.assertNotEquals(key, OWLOutputCache.get_key([self._input_filename], self.PREFIX,
+                                                         OWLOutputOptions()))
+
+    def test_hits_are_served_by_copy(self):
+        cache = OWLOutputCache(self._cache_directory)
+        output_filename = self.write('ontology.owl', 'ontology')
+        self.assertFalse(cache.fetch('ab' * 32, output_filename))
+        cache.store('ab' * 32, output_filename)
+        os.remove(output_filename)
+
+        self.assertTrue(cache.fetch('ab' * 32, output_filename))
+        self.assertFalse(os.path.samefile(cache.get_filename('ab' * 32), output_filename))
+        self.assertEquals('ontology', self.read(output_filename))
+
+        # writing over a served output never changes the cached file
+        self.write('ontology.owl', 'another ontology')
+        self.assertEquals('ontology', self.read(cache.get_filename('ab' * 32)))
+
+    def test_hard_linked_output_is_replaced_not_written_through(self):
+        cache = OWLOutputCache(self._cache_directory)
+        cache.store('ab' * 32, self.write('ontology.owl', 'ontology'))
+        cache.store('cd' * 32, self.write('ontology.owl', 'another ontology'))
+        # an output served by hard link by a previous version of the cache
+        output_filename = os.path.join(self._directory, 'linked.owl')
+        os.link(cache.get_filename('ab' * 32), output_filename)
+
+        self.assertTrue(cache.fetch('cd' * 32, output_filename))
+        self.assertEquals('another ontology', self.read(output_filename))
+        self.assertEquals('ontology', self.read(cache.get_filename('ab' * 32)))
+
+    def test_least_recently_used_are_evicted_over_the_size_cap(self):
+        cache = OWLOutputCache(self._cache_directory, max_size = 20)
+        output_filename = self.write('ontology.owl', 'x' * 10)
+        keys = ['%064d' % index for index in range(3)]
+        cache.store(keys[0], output_filename)
+        cache.store(keys[1], output_filename)
+        os.utime(cache.get_filename(keys[0]), (100, 100))
+        os.utime(cache.get_filename(keys[1]), (200, 200))
+        self.assertTrue(cache.fetch(keys[0], os.path.join(self._directory, 'hit.owl')))
+
+        cache.store(keys[2], output_filename)
+        self.assertEquals(20, cache.get_size())
+        self.assertTrue(os.path.exists(cache.get_filename(keys[0])))
+        self.assertFalse(os.path.exists(cache.get_filename(keys[1])))
+        self.assertTrue(os.path.exists(cache.get_filename(keys[2])))
+
+    def write(self, filename, content):
+        path = os.path.join(self._directory, filename)
+        with open(path, 'w') as output_file:
+            output_file.write(content)
+        return path
+
+    def read(self, filename):
+        with open(filename) as input_file:
+            return input_file.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
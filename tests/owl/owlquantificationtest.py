@@ -0,0 +1,82 @@
+import unittest
+import xml.etree.ElementTree as ET
+from src.owl.owl_specification import *
+from src.owl.owl_triple_store import OWLTripleStore
+from src.owl.owl_triples import OWLTripleBuilder
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+class OWLQuantificationTest(unittest.TestCase):
+    """
+    Test cases for the restrictions written for every kind of quantification of a necessity.
+    """
+    PREFIX = 'http://example.org/onto'
+    OWL = '{http://www.w3.org/2002/07/owl#}'
+    RDF = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+    RDFS = '{http://www.w3.org/2000/01/rdf-schema#}'
+
+    def test_cardinality_restrictions(self):
+        for quantification_type, value, cardinality, expected_value in (
+                ('at-least-N', '2', 'minQualifiedCardinality', '2'),
+                ('at-most-N', '3', 'maxQualifiedCardinality', '3'),
+                ('exactly-N', '1', 'qualifiedCardinality', '1')):
+            restriction = self.write_restriction(quantification_type, value, 'Fruta')
+            self.assertEquals(self.PREFIX + '#Fruta',
+                              restriction.find(self.OWL + 'onClass').get(self.RDF + 'resource'))
+            self.assertEquals(expected_value, restriction.find(self.OWL + cardinality).text.strip())
+
+    def test_range_is_an_intersection_of_restrictions(self):
+        range_class = self.write_restriction('at-least-N-and-at-most-M', '1..4', 'Fruta')
+        restrictions = list(range_class.find(self.OWL + 'intersectionOf'))
+        self.assertEquals(['1', '4'], [
+            restrictions[0].find(self.OWL + 'minQualifiedCardinality').text.strip(),
+            restrictions[1].find(self.OWL + 'maxQualifiedCardinality').text.strip()])
+
+    def test_existential_and_universal_restrictions(self):
+        restriction = self.write_restriction('existential', None, ['Fruta', 'Verdura'])
+        collection = restriction.find(self.OWL + 'someValuesFrom').find(self.OWL + 'Class')
+        self.assertEquals(2, len(list(collection.find(self.OWL + 'unionOf'))))
+
+        restriction = self.write_restriction('universal', None, 'Fruta')
+        self.assertEquals(self.PREFIX + '#Fruta',
+                          restriction.find(self.OWL + 'allValuesFrom').get(self.RDF + 'resource'))
+
+    def test_triples_of_every_quantification(self):
+        for quantification_type, value, predicate, count in (
+                ('at-least-N', '2', 'minQualifiedCardinality', 1),
+                ('exactly-N', '1', 'qualifiedCardinality', 1),
+                ('at-least-N-and-at-most-M', '1..4', 'maxQualifiedCardinality', 1),
+                ('existential', None, 'someValuesFrom', 1),
+                ('universal', None, 'allValuesFrom', 1)):
+            triple_store = OWLTripleStore.from_owl_specification(
+                self.build_owl_specification(quantification_type, value, 'Fruta'), self.PREFIX)
+            predicates = [triple[1] for triple in triple_store.iter_triples()]
+            self.assertEquals(count, predicates.count('<' + OWLTripleBuilder.OWL + predicate + '>'))
+
+    def test_necessity_without_value_is_rejected(self):
+        owl_specification = self.build_owl_specification('at-least-N', None, 'Fruta')
+        self.assertRaises(ValueError, owl_specification.build_owl_content)
+
+    def write_restriction(self, quantification_type, value, noun_concepts):
+        """
+        Writes a class with a necessity and returns the element of its restriction.
+        """
+        owl_specification = self.build_owl_specification(quantification_type, value, noun_concepts)
+        root = ET.fromstring(owl_specification.build_owl_content().join(
+            ['<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+             'xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#" '
+             'xmlns:owl="http://www.w3.org/2002/07/owl#">', '</rdf:RDF>']).replace(
+            '&xsd;', 'http://www.w3.org/2001/XMLSchema#'))
+        return list(root.find(self.OWL + 'Class').find(self.RDFS + 'subClassOf'))[0]
+
+    def build_owl_specification(self, quantification_type, value, noun_concepts):
+        owl_class = OWLSpecification.OWLClassSpecification('Vegano')
+        owl_class.add_parent_class_expression(build_logical_operation('single-clause', [
+            build_rule('consume', noun_concepts, quantification_type, value)]))
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(owl_class)
+        return owl_specification
+
+
+if __name__ == '__main__':
+    unittest.main()
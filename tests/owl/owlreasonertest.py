@@ -0,0 +1,131 @@
+import unittest
+from src.owl.owl_specification import *
+from src.owl.owl_reasoner import OWLReasoner
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.rule import Rule
+
+
+class OWLReasonerTest(unittest.TestCase):
+    """
+    Test cases for the subsumption reasoner.
+    """
+
+    def setUp(self):
+        self._owl_specification = OWLSpecification('http://example.org/onto')
+
+    def test_told_hierarchy_is_transitive(self):
+        self.add_class('Manzana', ['Fruta'])
+        self.add_class('Fruta', ['Alimento'])
+        self.add_class('Verdura', ['Alimento'])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertTrue(reasoner.is_subclass_of('Manzana', 'Alimento'))
+        self.assertFalse(reasoner.is_subclass_of('Manzana', 'Verdura'))
+        self.assertEquals(['Alimento', 'Fruta'], reasoner.get_superclasses('Manzana'))
+        self.assertEquals(['Fruta'], reasoner.get_superclasses('Manzana', direct = True))
+
+    def test_synonyms_and_cycles_are_equivalent(self):
+        self.add_class('Comida', ['Alimento'], synonyms = ['Vianda'])
+        self.add_class('Alimento', ['Comida'])
+        self.add_class('Fruta', ['Vianda'])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertEquals(['Alimento', 'Comida', 'Vianda'],
+                          reasoner.get_equivalent_classes('Comida'))
+        self.assertTrue(reasoner.is_subclass_of('Fruta', 'Alimento'))
+        self.assertEquals({'Alimento': [], 'Fruta': ['Alimento']}, reasoner.get_hierarchy())
+
+    def test_structural_subsumption_of_definitions(self):
+        # Vegano == permite_consumo_de only Vegetal
+        # Frugivoro == permite_consumo_de only Fruta, and Fruta is a Vegetal
+        self.add_class('Fruta', ['Vegetal'])
+        self.add_class('Vegano', [], [self.build_definition([('permite_consumo_de', 'Vegetal')])])
+        self.add_class('Frugivoro', [], [self.build_definition([('permite_consumo_de', 'Fruta')])])
+        self.add_class('Crudivoro', [], [self.build_definition([('come', 'Fruta')])])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertTrue(reasoner.is_subclass_of('Frugivoro', 'Vegano'))
+        self.assertFalse(reasoner.is_subclass_of('Vegano', 'Frugivoro'))
+        self.assertFalse(reasoner.is_subclass_of('Crudivoro', 'Vegano'))
+        self.assertEquals(1, reasoner.get_inferred_edge_count())
+
+    def test_union_fillers_are_compared_member_by_member(self):
+        # Omnivoro == come only (Vegetal or Carne)
+        # Mixto == come only (Fruta or Carne), and Fruta is a Vegetal
+        # Goloso == come only (Fruta or Dulce)
+        self.add_class('Fruta', ['Vegetal'])
+        self.add_class('Omnivoro', [], [self.build_definition(
+            [('come', Rule.RuleRange.set_disjunction, ['Vegetal', 'Carne'])])])
+        self.add_class('Mixto', [], [self.build_definition(
+            [('come', Rule.RuleRange.set_disjunction, ['Fruta', 'Carne'])])])
+        self.add_class('Goloso', [], [self.build_definition(
+            [('come', Rule.RuleRange.set_disjunction, ['Fruta', 'Dulce'])])])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertTrue(reasoner.is_subclass_of('Mixto', 'Omnivoro'))
+        self.assertFalse(reasoner.is_subclass_of('Omnivoro', 'Mixto'))
+        self.assertFalse(reasoner.is_subclass_of('Goloso', 'Omnivoro'))
+
+    def test_inherited_restrictions_and_intersections(self):
+        # Atleta == entrena only Deporte and come only Proteina
+        # Corredor is a Deportista (entrena only Carrera) with come only (Carne and Proteina)
+        # Nadador == come only (Carne or Proteina), so Atleta is a Nadador
+        self.add_class('Carrera', ['Deporte'])
+        self.add_class('Atleta', [], [self.build_definition(
+            [('entrena', 'Deporte'), ('come', 'Proteina')], 'conjunction')])
+        self.add_class('Deportista', [], [self.build_definition([('entrena', 'Carrera')])])
+        self.add_class('Corredor', ['Deportista'], [self.build_definition(
+            [('come', Rule.RuleRange.set_conjunction, ['Carne', 'Proteina'])])])
+        self.add_class('Nadador', [], [self.build_definition(
+            [('come', Rule.RuleRange.set_disjunction, ['Carne', 'Proteina'])])])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertTrue(reasoner.is_subclass_of('Corredor', 'Atleta'))
+        self.assertFalse(reasoner.is_subclass_of('Nadador', 'Atleta'))
+        self.assertTrue(reasoner.is_subclass_of('Atleta', 'Nadador'))
+        self.assertEquals(['Atleta', 'Deportista'],
+                          reasoner.get_superclasses('Corredor', direct = True))
+
+    def test_inferred_subsumptions_enable_more(self):
+        # B == p only C; X == p only D, D == q only E, C == q only E: D and C are equivalent,
+        # so X is a sub class of B (and the other way around)
+        self.add_class('B', [], [self.build_definition([('p', 'C')])])
+        self.add_class('X', [], [self.build_definition([('p', 'D')])])
+        self.add_class('C', [], [self.build_definition([('q', 'E')])])
+        self.add_class('D', [], [self.build_definition([('q', 'E')])])
+        reasoner = OWLReasoner(self._owl_specification)
+
+        self.assertEquals(['C', 'D'], reasoner.get_equivalent_classes('D'))
+        self.assertEquals(['B', 'X'], reasoner.get_equivalent_classes('X'))
+
+    def add_class(self, classname, parents, definitions=None, synonyms=None):
+        owl_class = OWLSpecification.OWLClassSpecification(classname)
+        for parent in parents:
+            owl_class.add_parent_class(parent)
+        for definition in definitions or []:
+            owl_class.add_equivalence_rule(definition)
+        for synonym in synonyms or []:
+            owl_class.add_synonym_equivalence(synonym)
+        self._owl_specification.add_class_specification(owl_class)
+
+    def build_definition(self, restrictions, logical_operation_type='single-clause'):
+        """
+        Builds a definition with a rule for each (verb, noun concept) or
+        (verb, range setter, noun concepts) restriction.
+        """
+        logical_operation = LogicalOperation(logical_operation_type)
+        for restriction in restrictions:
+            rule_range = Rule.RuleRange()
+            if len(restriction) == 2:
+                rule_range.set_noun_concept(restriction[1])
+            else:
+                restriction[1](rule_range, restriction[2])
+            rule = Rule()
+            rule.set_verb(restriction[0])
+            rule.set_rule_range(rule_range)
+            logical_operation.add_logical_operator(rule)
+        return logical_operation
+
+
+if __name__ == '__main__':
+    unittest.main()
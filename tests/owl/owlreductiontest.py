@@ -0,0 +1,61 @@
+import unittest
+from src.owl.owl_specification import *
+from src.utils.graphutils import GraphUtils
+
+
+class OWLReductionTest(unittest.TestCase):
+    """
+    Test cases for the transitive reduction of the told class hierarchy.
+    """
+
+    def test_implied_parents_are_removed(self):
+        owl_specification = self.build_owl_specification([
+            ('Manzana', ['Fruta', 'Alimento', 'Vegetal']),
+            ('Fruta', ['Vegetal']),
+            ('Vegetal', ['Alimento'])])
+
+        self.assertEquals(2, owl_specification.reduce_sub_class_of())
+        self.assertEquals({'Manzana': ['Fruta'], 'Fruta': ['Vegetal'], 'Vegetal': ['Alimento']},
+                          self.get_parents(owl_specification))
+
+    def test_repeated_parents_are_removed(self):
+        owl_specification = self.build_owl_specification([
+            ('Manzana', ['Fruta', 'Fruta']),
+            ('Manzana', ['Fruta', 'Alimento'])])
+
+        self.assertEquals(2, owl_specification.reduce_sub_class_of())
+        self.assertEquals([['Fruta'], ['Alimento']],
+                          [owl_class.get_sub_class_of() for owl_class in owl_specification.get_classes()])
+
+    def test_cycles_are_kept(self):
+        # Comida and Vianda are equivalent, so Fruta needs only one of them
+        owl_specification = self.build_owl_specification([
+            ('Comida', ['Vianda']),
+            ('Vianda', ['Comida', 'Sustancia']),
+            ('Fruta', ['Comida', 'Vianda', 'Sustancia'])])
+
+        self.assertEquals(2, owl_specification.reduce_sub_class_of())
+        self.assertEquals({'Comida': ['Vianda'], 'Vianda': ['Comida', 'Sustancia'],
+                           'Fruta': ['Comida']}, self.get_parents(owl_specification))
+
+    def test_reduction_of_a_dag(self):
+        # 0 -> 1 -> 3, 0 -> 2 -> 3, 0 -> 3, 2 -> 4 -> 3
+        reduction = GraphUtils.transitive_reduction(5, [[1, 2, 3], [3], [3, 4], None, [3]])
+        self.assertEquals([[1, 2], [3], [4], None, [3]], reduction)
+
+    def build_owl_specification(self, classes):
+        owl_specification = OWLSpecification('http://example.org/onto')
+        for classname, parents in classes:
+            owl_class = OWLSpecification.OWLClassSpecification(classname)
+            for parent in parents:
+                owl_class.add_parent_class(parent)
+            owl_specification.add_class_specification(owl_class)
+        return owl_specification
+
+    def get_parents(self, owl_specification):
+        return dict((owl_class.get_classname(), owl_class.get_sub_class_of())
+                    for owl_class in owl_specification.get_classes())
+
+
+if __name__ == '__main__':
+    unittest.main()
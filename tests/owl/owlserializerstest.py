@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+from src.owl.owl_specification import *
+from src.owl.owl_triples import OWLTripleBuilder
+from src.owl.owl_ntriples import OWLNTriplesSerializer
+from src.owl.owl_turtle import OWLTurtleSerializer
+from tests.owl.owlfixtures import build_owl_specification
+
+
+class OWLSerializersTest(unittest.TestCase):
+    """
+    Test cases for the n-triples and turtle serializers.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._output_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._output_directory)
+
+    def test_iri_escapes_invalid_characters(self):
+        triple_builder = OWLTripleBuilder(self.PREFIX)
+
+        self.assertEquals('<http://example.org/onto#permite%20consumo%20de>',
+                          triple_builder.iri('permite consumo de'))
+
+    def test_ntriples_class_with_definition(self):
+        lines = self.write_ntriples(build_owl_specification(self.PREFIX)).splitlines()
+
+        self.assertTrue('<http://example.org/onto#Veganismo> '
+                        '<http://www.w3.org/2000/01/rdf-schema#subClassOf> '
+                        '<http://example.org/onto#RegimenAlimentario> .' in lines)
+        self.assertTrue('_:e2b1 <http://www.w3.org/2002/07/owl#onProperty> '
+                        '<http://example.org/onto#permite_consumo_de> .' in lines)
+        self.assertTrue('_:e2b3 <http://www.w3.org/1999/02/22-rdf-syntax-ns#first> '
+                        '<http://example.org/onto#Miel> .' in lines)
+        self.assertTrue('_:e3b1 <http://www.w3.org/2002/07/owl#minQualifiedCardinality> '
+                        '"1"^^<http://www.w3.org/2001/XMLSchema#nonNegativeInteger> .' in lines)
+
+    def test_ontology_is_declared(self):
+        lines = self.write_ntriples(build_owl_specification(self.PREFIX)).splitlines()
+        self.assertEquals('<http://example.org/onto> '
+                          '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> '
+                          '<http://www.w3.org/2002/07/owl#Ontology> .', lines[0])
+
+        output_file = StringIO()
+        OWLTurtleSerializer(self.PREFIX).write(build_owl_specification(self.PREFIX), output_file)
+        self.assertTrue('<http://example.org/onto> a owl:Ontology .' in output_file.getvalue())
+
+    def test_relative_prefix_is_rejected(self):
+        self.assertRaises(ValueError, OWLNTriplesSerializer, '')
+        self.assertRaises(ValueError, OWLTurtleSerializer, 'onto')
+
+    def test_ntriples_parallel_chunks_keep_order(self):
+        owl_specification = build_owl_specification(self.PREFIX)
+        output_file = StringIO()
+        OWLNTriplesSerializer(self.PREFIX).write(owl_specification, output_file,
+                                                 processes = 2, chunk_size = 1)
+
+        self.assertEquals(self.write_ntriples(owl_specification), output_file.getvalue())
+
+    def test_ntriples_shards_concatenate(self):
+        owl_specification = build_owl_specification(self.PREFIX)
+        filenames = [os.path.join(self._output_directory, 'shard%d.nt' % index) for index in range(3)]
+        OWLNTriplesSerializer(self.PREFIX).write_shards(owl_specification, filenames)
+
+        content = ''
+        for filename in filenames:
+            with open(filename) as shard_file:
+                content += shard_file.read()
+        self.assertEquals(self.write_ntriples(owl_specification), content)
+
+    def test_turtle_nests_blank_nodes_and_collections(self):
+        output_file = StringIO()
+        OWLTurtleSerializer(self.PREFIX).write(build_owl_specification(self.PREFIX), output_file)
+        content = output_file.getvalue()
+
+        self.assertTrue('@prefix : <http://example.org/onto#> .' in content)
+        self.assertTrue(':permite_consumo_de a owl:ObjectProperty ;\n'
+                        '    rdfs:range :Alimento ;\n'
+                        '    rdfs:domain :RegimenAlimentario .' in content)
+        self.assertTrue('owl:allValuesFrom [\n'
+                        '            a owl:Class ;\n'
+                        '            owl:unionOf ( :Miel :AlimentoOrigenVegetal )\n'
+                        '        ]' in content)
+        self.assertTrue('owl:minQualifiedCardinality "1"^^xsd:nonNegativeInteger' in content)
+
+    def write_ntriples(self, owl_specification):
+        output_file = StringIO()
+        OWLNTriplesSerializer(self.PREFIX).write(owl_specification, output_file)
+        return output_file.getvalue()
+
+
+if __name__ == '__main__':
+    unittest.main()
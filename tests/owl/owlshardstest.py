@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from src.owl.owl_specification import *
+from src.owl.owl_output_options import OWLOutputOptions
+from src.owl.owl_shards import OWLShardWriter
+
+
+class OWLShardsTest(unittest.TestCase):
+    """
+    Test cases for the sharded rdf/xml output.
+    """
+    PREFIX = 'http://example.org/onto'
+    OWL = '{http://www.w3.org/2002/07/owl#}'
+    RDF = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+
+    def setUp(self):
+        self._output_directory = tempfile.mkdtemp()
+        self._root_filename = os.path.join(self._output_directory, 'ontology.owl')
+
+    def tearDown(self):
+        shutil.rmtree(self._output_directory)
+
+    def test_partition_by_subtree_keeps_subtrees_together(self):
+        groups = OWLShardWriter(self.build_owl_specification()).partition_by_subtree(2)
+
+        classnames = [[owl_class.get_classname() for owl_class in group] for group in groups]
+        self.assertEquals([['Alimento', 'Fruta', 'Manzana', 'Pera'], ['Regimen', 'Dieta']],
+                          classnames)
+
+    def test_write_by_subtree(self):
+        shard_filenames = OWLShardWriter(self.build_owl_specification()).write_by_subtree(
+            self._root_filename, 2)
+
+        self.assertEquals(['ontology-properties.owl', 'ontology-1.owl', 'ontology-2.owl'],
+                          [os.path.basename(filename) for filename in shard_filenames])
+        self.assertEquals([self.PREFIX + '/' + os.path.basename(filename)
+                           for filename in shard_filenames],
+                          self.get_imports(self._root_filename))
+        self.assertEquals([self.PREFIX + '/ontology-properties.owl'],
+                          self.get_imports(shard_filenames[1]))
+        self.assertEquals(['Regimen', 'Dieta'], self.get_classnames(shard_filenames[2]))
+
+    def test_write_by_size(self):
+        owl_specification = self.build_owl_specification()
+        fragment_size = len(owl_specification.get_classes()[0].to_owl(self.PREFIX))
+        shard_filenames = OWLShardWriter(owl_specification).write_by_size(
+            self._root_filename, 2 * fragment_size + 1)
+
+        classnames = []
+        for filename in shard_filenames[1:]:
+            self.assertTrue(len(self.get_classnames(filename)) <= 2)
+            classnames.extend(self.get_classnames(filename))
+        self.assertEquals([owl_class.get_classname() for owl_class in owl_specification.get_classes()],
+                          classnames)
+        self.assertEquals(len(shard_filenames), len(self.get_imports(self._root_filename)))
+
+    def test_partition_by_subtree_splits_big_subtrees(self):
+        groups = OWLShardWriter(self.build_owl_specification()).partition_by_subtree(3)
+        self.assertEquals([['Fruta', 'Manzana', 'Pera'], ['Regimen', 'Dieta'], ['Alimento']],
+                          [[owl_class.get_classname() for owl_class in group] for group in groups])
+
+        # a single hierarchy, whose root is not a class of the specification
+        owl_specification = OWLSpecification(self.PREFIX)
+        for classname, parent in [('Alimento', 'Cosa'), ('Fruta', 'Alimento'),
+                                  ('Regimen', 'Cosa'), ('Dieta', 'Regimen')]:
+            owl_class = OWLSpecification.OWLClassSpecification(classname)
+            owl_class.add_parent_class(parent)
+            owl_specification.add_class_specification(owl_class)
+        groups = OWLShardWriter(owl_specification).partition_by_subtree(2)
+        self.assertEquals([['Alimento', 'Fruta'], ['Regimen', 'Dieta']],
+                          [[owl_class.get_classname() for owl_class in group] for group in groups])
+
+    def test_write_by_size_with_processes_cuts_between_classes(self):
+        owl_specification = OWLSpecification(self.PREFIX)
+        for index in range(60):
+            owl_class = OWLSpecification.OWLClassSpecification('Clase%d' % index)
+            owl_class.add_parent_class('Clase%d' % (index // 2))
+            owl_specification.add_class_specification(owl_class)
+        fragment_size = len(owl_specification.get_classes()[0].to_owl(self.PREFIX))
+
+        shards = []
+        for processes in (1, 3):
+            shard_filenames = OWLShardWriter(owl_specification).write_by_size(
+                self._root_filename, 5 * fragment_size + 1, processes)
+            shards.append([self.get_classnames(filename) for filename in shard_filenames[1:]])
+        self.assertEquals(shards[0], shards[1])
+        self.assertTrue(len(shards[1]) >= 10)
+
+    def test_shard_options_are_validated(self):
+        self.assertRaises(ValueError, OWLOutputOptions().set_shard_count, 0)
+        self.assertRaises(ValueError, OWLOutputOptions().set_shard_size, 0)
+        output_options = OWLOutputOptions()
+        output_options.set_shard_count(2)
+        self.assertRaises(ValueError, output_options.set_shard_size, 1024)
+
+        output_options.check_prefix(self.PREFIX)
+        self.assertRaises(ValueError, output_options.check_prefix, '')
+        self.assertRaises(ValueError, output_options.check_prefix, 'onto')
+        OWLOutputOptions().check_prefix('')
+
+    def get_imports(self, filename):
+        ontology = ET.parse(filename).getroot().find(self.OWL + 'Ontology')
+        return [element.get(self.RDF + 'resource') for element in ontology.findall(self.OWL + 'imports')]
+
+    def get_classnames(self, filename):
+        return [element.get(self.RDF + 'about').split('#')[1]
+                for element in ET.parse(filename).getroot().findall(self.OWL + 'Class')]
+
+    def build_owl_specification(self):
+        """
+        Builds a specification with an object property and two class hierarchies, one of
+        them with four classes and the other one with two.
+        """
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_object_property(OWLSpecification.OWLObjectPropertySpecification(
+            'permite_consumo_de', 'Regimen', 'Alimento'))
+        for classname, parent in [('Alimento', None), ('Fruta', 'Alimento'), ('Regimen', None),
+                                  ('Manzana', 'Fruta'), ('Dieta', 'Regimen'), ('Pera', 'Fruta')]:
+            owl_class = OWLSpecification.OWLClassSpecification(classname)
+            if parent is not None:
+                owl_class.add_parent_class(parent)
+            owl_specification.add_class_specification(owl_class)
+        return owl_specification
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import copy
+import unittest
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.owl.owl_specification import *
+from src.owl.owl_shared_expressions import OWLSharedExpressions
+from src.owl.owl_writer import OWLWriter
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+class OWLSharedExpressionsTest(unittest.TestCase):
+    """
+    Test cases for the sharing of repeated restrictions and collections.
+    """
+    PREFIX = 'http://example.org/onto'
+    SHARED_CLASS = PREFIX + '#SharedExpression'
+    NODE_ID = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}nodeID'
+    ABOUT = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about'
+    RESOURCE = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}resource'
+    DESCRIPTION = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description'
+
+    def test_repeated_expressions_are_shared(self):
+        owl_specification = self.build_owl_specification()
+        shared_expressions = OWLSharedExpressions.from_owl_specification(owl_specification)
+
+        # the necessity, the definition of Vegano and Vegetariano, and the collection of the
+        # definition of Frugivoro, which is also in the shared definition
+        self.assertEquals(3, len(shared_expressions))
+        shared_content = self.write_document(owl_specification, shared = True)
+        self.assertEquals(3, shared_content.count('<owl:Restriction'))
+        self.assertEquals(1, shared_content.count('<owl:unionOf'))
+        self.assertTrue(len(shared_content) < len(self.write_document(owl_specification)))
+
+    def test_shared_document_has_the_same_expressions(self):
+        owl_specification = self.build_owl_specification()
+        for compact in (False, True):
+            expected = ET.fromstring(self.write_document(owl_specification, compact = compact))
+            shared = ET.fromstring(self.write_document(owl_specification, compact = compact,
+                                                       shared = True))
+            self.assertEquals(self.xml_structure(expected),
+                              self.xml_structure(self.expand_shared_classes(shared)))
+
+    def test_no_blank_node_is_referred_to_twice(self):
+        owl_specification = self.build_owl_specification()
+        root = ET.fromstring(self.write_document(owl_specification, shared = True))
+        counts = self.count_blank_node_objects(root)
+        self.assertTrue(counts)
+        self.assertEquals([], [node for node, count in counts.items() if count > 1])
+        self.assertEquals(3, len([element for element in root
+                                  if (element.get(self.ABOUT) or '').startswith(self.SHARED_CLASS)]))
+
+    def test_shared_classes_do_not_take_the_names_of_the_specification(self):
+        owl_specification = self.build_owl_specification()
+        owl_specification.add_class_specification(
+            OWLSpecification.OWLClassSpecification('SharedExpression1'))
+        root = ET.fromstring(self.write_document(owl_specification, shared = True))
+        abouts = [element.get(self.ABOUT) for element in root
+                  if (element.get(self.ABOUT) or '').startswith(self.SHARED_CLASS)]
+        self.assertEquals([self.SHARED_CLASS + suffix for suffix in ('1', '2', '3', '4')], abouts)
+
+    def test_unique_expressions_are_not_shared(self):
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(self.build_owl_class(
+            'Vegano', necessities = [('permite_consumo_de', 'AlimentoVegetal')]))
+        owl_specification.add_class_specification(self.build_owl_class(
+            'Carnivoro', necessities = [('permite_consumo_de', 'Carne')]))
+
+        self.assertEquals(0, len(OWLSharedExpressions.from_owl_specification(owl_specification)))
+        self.assertEquals(self.write_document(owl_specification),
+                          self.write_document(owl_specification, shared = True))
+
+    def build_owl_specification(self):
+        owl_specification = OWLSpecification(self.PREFIX)
+        for classname in ('Vegano', 'Vegetariano'):
+            owl_specification.add_class_specification(self.build_owl_class(
+                classname,
+                necessities = [('es_seguido_por', 'Persona')],
+                definitions = [('permite_consumo_de', ['Fruta', 'Verdura'])]))
+        owl_specification.add_class_specification(self.build_owl_class(
+            'Frugivoro', definitions = [('consume', ['Fruta', 'Verdura'])]))
+        return owl_specification
+
+    def build_owl_class(self, classname, necessities=(), definitions=()):
+        """
+        Builds a class with a necessity for every (verb, noun concept) and a definition for
+        every (verb, disjunction of noun concepts).
+        """
+        owl_class = OWLSpecification.OWLClassSpecification(classname)
+        for verb, noun_concept in necessities:
+            owl_class.add_parent_class_expression(build_logical_operation('single-clause', [
+                build_rule(verb, noun_concept)]))
+        for verb, noun_concepts in definitions:
+            owl_class.add_equivalence_rule(build_logical_operation('single-clause', [
+                build_rule(verb, noun_concepts, None, None)]))
+        return owl_class
+
+    def write_document(self, owl_specification, compact=False, shared=False):
+        output_file = StringIO()
+        OWLWriter(output_file, compact = compact).write_document(
+            self.PREFIX, owl_specification.iter_owl_fragments(compact, shared = shared))
+        return output_file.getvalue()
+
+    def expand_shared_classes(self, root):
+        """
+        Removes the classes of the shared expressions and writes a copy of their expression in
+        place of every reference to them.
+        """
+        definitions = dict((element.get(self.ABOUT), element[0][0]) for element in list(root)
+                           if (element.get(self.ABOUT) or '').startswith(self.SHARED_CLASS))
+        for element in list(root):
+            if element.get(self.ABOUT) in definitions:
+                root.remove(element)
+        self.expand_references(root, definitions)
+        return root
+
+    def expand_references(self, element, definitions):
+        for index, child in enumerate(list(element)):
+            if child.tag == self.DESCRIPTION and child.get(self.ABOUT) in definitions:
+                expanded = copy.deepcopy(definitions[child.get(self.ABOUT)])
+                element.remove(child)
+                element.insert(index, expanded)
+                child = expanded
+            elif child.get(self.RESOURCE) in definitions:
+                expanded = copy.deepcopy(definitions[child.get(self.RESOURCE)])
+                del child.attrib[self.RESOURCE]
+                child.append(expanded)
+            self.expand_references(child, definitions)
+
+    def count_blank_node_objects(self, root):
+        """
+        Returns the number of triples every blank node of the rdf/xml document is the object of.
+        """
+        counts = {}
+        blank_nodes = []
+
+        def node_subject(node):
+            if node.get(self.ABOUT) is not None:
+                return node.get(self.ABOUT)
+            if node.get(self.NODE_ID) is not None:
+                return '_:' + node.get(self.NODE_ID)
+            blank_nodes.append(node)
+            return '_:%d' % len(blank_nodes)
+
+        def add_object(subject):
+            if subject.startswith('_:'):
+                counts[subject] = counts.get(subject, 0) + 1
+
+        def walk_node(node):
+            subject = node_subject(node)
+            for property_element in node:
+                if property_element.get(self.RESOURCE) is not None:
+                    continue
+                if property_element.get(self.NODE_ID) is not None:
+                    add_object('_:' + property_element.get(self.NODE_ID))
+                    continue
+                # a collection is a list of blank nodes, each the object of a single triple,
+                # whose rdf:first are the nested nodes
+                for nested_node in property_element:
+                    add_object(walk_node(nested_node))
+            return subject
+
+        for node in root:
+            walk_node(node)
+        return counts
+
+    def xml_structure(self, element):
+        return [(node.tag, sorted(node.attrib.items()), (node.text or '').strip())
+                for node in element.iter()]
+
+
+if __name__ == '__main__':
+    unittest.main()
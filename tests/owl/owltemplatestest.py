@@ -0,0 +1,95 @@
+import unittest
+from src.owl.owl_specification import *
+from src.owl.owl_templates import OWLTemplates, compact_xml
+
+
+class OWLTemplatesTest(unittest.TestCase):
+    """
+    Test cases for the compiled owl templates.
+    """
+
+    def test_compile_binds_prefix(self):
+        template = OWLSpecification.OWLClassSpecification.OWL_SUB_CLASS_OF_TEMPLATE
+        emit = OWLTemplates('http://example.org/onto').compile(template)
+
+        self.assertEquals(template.format(prefix = 'http://example.org/onto', parent = 'Alimento'),
+                          self.render(emit, parent = 'Alimento'))
+
+    def test_compile_keeps_percent_signs(self):
+        emit = OWLTemplates('http://example.org/100%').compile('<a x="{prefix}#{name}" y="5%"/>')
+
+        self.assertEquals('<a x="http://example.org/100%#50%" y="5%"/>', self.render(emit, name = '50%'))
+
+    def test_compile_keeps_braces_of_the_prefix(self):
+        emit = OWLTemplates('http://example.org/{onto}').compile('<a x="{prefix}#{name}"/>')
+
+        self.assertEquals('<a x="http://example.org/{onto}#{b}"/>', self.render(emit, name = '{b}'))
+
+    def test_compile_positional_fields_in_order_of_appearance(self):
+        emit = OWLTemplates('').compile('<{tag} a="{value}"></{tag}>')
+
+        self.assertEquals('<b a="1"></b>', self.render(emit, 'b', '1'))
+
+    def test_compile_slots_write_to_output(self):
+        emit = OWLTemplates('').compile('<a>{inner}</a><b>{empty}</b>', ('inner', 'empty'))
+        inner = lambda write: write('<c/>')
+
+        self.assertEquals('<a><c/></a><b></b>', self.render(emit, inner = inner, empty = None))
+
+    def test_of_compiles_class_templates(self):
+        owl_templates = OWLTemplates('')
+        templates = owl_templates.of(OWLSpecification.OWLObjectPropertySpecification)
+
+        self.assertTrue(templates is owl_templates.of(OWLSpecification.OWLObjectPropertySpecification))
+        self.assertEquals(
+            OWLSpecification.OWLObjectPropertySpecification.OWL_OBJECT_PROPERTY_TEMPLATE.format(
+                prefix = '', op_name = 'come', op_domain = 'Persona', op_range = 'Alimento'),
+            self.render(templates.OWL_OBJECT_PROPERTY_TEMPLATE,
+                        op_name = 'come', op_domain = 'Persona', op_range = 'Alimento'))
+
+    def test_for_prefix_is_shared(self):
+        self.assertTrue(OWLTemplates.for_prefix('http://a') is OWLTemplates.for_prefix('http://a'))
+        self.assertFalse(OWLTemplates.for_prefix('http://a') is OWLTemplates.for_prefix('http://b'))
+
+    def test_for_prefix_keeps_the_most_recently_used_prefixes(self):
+        owl_templates = OWLTemplates.for_prefix('http://a')
+        for index in range(OWLTemplates.MAX_SHARED_PREFIXES - 1):
+            OWLTemplates.for_prefix('http://b%d' % index)
+        self.assertTrue(owl_templates is OWLTemplates.for_prefix('http://a'))
+        for index in range(OWLTemplates.MAX_SHARED_PREFIXES):
+            OWLTemplates.for_prefix('http://c%d' % index)
+        self.assertEquals(OWLTemplates.MAX_SHARED_PREFIXES, len(OWLTemplates._templates_by_prefix))
+        self.assertFalse(owl_templates is OWLTemplates.for_prefix('http://a'))
+
+    def test_compact_xml(self):
+        self.assertEquals('<a x="1" y="2"><b>1</b></a>',
+                          compact_xml('\n    <a x="1"\n       y="2">\n        <b>\n  1\n  </b>\n</a>\n   '))
+        self.assertEquals(' rdf:parseType="Collection">', compact_xml(' rdf:parseType="Collection">\n   '))
+
+    def test_compact_compile_removes_whitespace_and_separators(self):
+        templates = OWLTemplates('', compact = True).of(OWLSpecification.OWLClassSpecification)
+
+        self.assertEquals('', templates.separator)
+        self.assertEquals('<rdf:Description rdf:about="#Miel"/>',
+                          self.render(templates.OWL_DESCRIPTION_TEMPLATE, classname = 'Miel'))
+        self.assertEquals('<owl:allValuesFrom rdf:resource="#Miel"/>',
+                          self.render(templates.OWL_ALL_VALUES_FROM_SINGLE_CLASS_TEMPLATE,
+                                      classname = 'Miel'))
+
+    def test_compact_empty_class_uses_simple_template(self):
+        owl_class = OWLSpecification.OWLClassSpecification('Alimento')
+
+        self.assertEquals('<owl:Class rdf:about="#Alimento" />',
+                          owl_class.render_owl(OWLTemplates('', compact = True)))
+
+    def render(self, emit, *args, **kwargs):
+        """
+        Renders the emitter into a string.
+        """
+        output = []
+        emit(output.append, *args, **kwargs)
+        return ''.join(output)
+
+
+if __name__ == '__main__':
+    unittest.main()
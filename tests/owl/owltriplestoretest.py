@@ -0,0 +1,70 @@
+import unittest
+from src.owl.owl_specification import *
+from src.owl.owl_triples import OWLTripleBuilder
+from src.owl.owl_triple_store import OWLTripleStore
+
+
+class OWLTripleStoreTest(unittest.TestCase):
+    """
+    Test cases for the indexed triple store.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_object_property(OWLSpecification.OWLObjectPropertySpecification(
+            'permite_consumo_de', 'Regimen', 'Alimento'))
+        for classname, parent in [('Fruta', 'Alimento'), ('Verdura', 'Alimento'),
+                                  ('Fruta', 'Alimento')]:
+            owl_class = OWLSpecification.OWLClassSpecification(classname)
+            owl_class.add_parent_class(parent)
+            owl_specification.add_class_specification(owl_class)
+        self._triple_store = OWLTripleStore.from_owl_specification(owl_specification)
+
+    def test_terms_are_dictionary_encoded(self):
+        # three triples for the property and two for each of the classes, the repeated class
+        # adds nothing
+        self.assertEquals(7, len(self._triple_store))
+        self.assertEquals(4, self._triple_store.get_entity_count())
+        # 5 iris of the ontology and 6 of the rdf, rdfs and owl vocabularies
+        self.assertEquals(11, self._triple_store.get_term_count())
+        self.assertEquals(None, self._triple_store.get_entity_subject(3))
+
+    def test_match_by_subject_keeps_order(self):
+        fruta = self.iri('Fruta')
+        self.assertEquals([(fruta, OWLTripleBuilder.RDF_TYPE, OWLTripleBuilder.OWL_CLASS),
+                           (fruta, OWLTripleBuilder.RDFS_SUB_CLASS_OF, self.iri('Alimento'))],
+                          self._triple_store.match(fruta))
+
+    def test_match_by_predicate_and_object(self):
+        self.assertEquals([self.iri('Fruta'), self.iri('Verdura')],
+                          self._triple_store.get_subjects(OWLTripleBuilder.RDFS_SUB_CLASS_OF,
+                                                          self.iri('Alimento')))
+        self.assertEquals(2, len(self._triple_store.match(predicate = OWLTripleBuilder.RDF_TYPE,
+                                                          obj = OWLTripleBuilder.OWL_CLASS)))
+
+    def test_match_by_object(self):
+        self.assertEquals(set([(self.iri('permite_consumo_de'), OWLTripleBuilder.RDFS_RANGE),
+                               (self.iri('Fruta'), OWLTripleBuilder.RDFS_SUB_CLASS_OF),
+                               (self.iri('Verdura'), OWLTripleBuilder.RDFS_SUB_CLASS_OF)]),
+                          set((subject, predicate) for subject, predicate, _ in
+                              self._triple_store.match(obj = self.iri('Alimento'))))
+
+    def test_match_unknown_term(self):
+        self.assertEquals([], self._triple_store.match(self.iri('Carne')))
+        self.assertEquals([], self._triple_store.get_objects(self.iri('Carne'),
+                                                             OWLTripleBuilder.RDF_TYPE))
+
+    def test_entity_triple_range(self):
+        first, last = self._triple_store.get_entity_triple_range(1, 3)
+
+        self.assertEquals((3, 7), (first, last))
+        self.assertEquals(self.iri('Verdura'),
+                          list(self._triple_store.iter_triples(first, last))[2][0])
+
+    def iri(self, name):
+        return '<' + self.PREFIX + '#' + name + '>'
+
+
+if __name__ == '__main__':
+    unittest.main()
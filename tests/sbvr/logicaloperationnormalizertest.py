@@ -0,0 +1,77 @@
+import unittest
+from src.owl.owl_specification import *
+from src.sbvr.logicaloperationnormalizer import LogicalOperationNormalizer
+from tests.sbvrbuilders import build_logical_operation, build_rule
+
+
+class LogicalOperationNormalizerTest(unittest.TestCase):
+    """
+    Test cases for the normalization of logical operations.
+    """
+    PREFIX = 'http://example.org/onto'
+    VERB = 'permite_consumo_de'
+
+    def test_operators_are_sorted_and_repeated_ones_removed(self):
+        conjunction = build_logical_operation('conjunction', [
+            build_rule(self.VERB, 'Fruta'), build_rule(self.VERB, 'Carne'),
+            build_rule(self.VERB, 'Fruta')])
+        normalized = LogicalOperationNormalizer().normalize(conjunction)
+
+        self.assertEquals('conjunction', normalized.get_type())
+        self.assertEquals(['Carne', 'Fruta'], [rule.get_rule_range().get_range()
+                                               for rule in normalized.get_logical_operators()])
+
+    def test_single_members_are_collapsed(self):
+        rule = build_rule('consume', ['Fruta', 'Fruta'])
+        disjunction = build_logical_operation('disjunction', [rule, build_rule('consume', 'Fruta')])
+        normalized = LogicalOperationNormalizer().normalize(disjunction)
+
+        self.assertTrue(normalized.is_single_clause())
+        rule_range = normalized.get_logical_operators()[0].get_rule_range()
+        self.assertTrue(rule_range.is_noun_concept())
+        self.assertEquals('Fruta', rule_range.get_range())
+
+    def test_nested_operations_of_the_same_type_are_flattened(self):
+        nested = build_logical_operation('conjunction', [
+            build_rule(self.VERB, 'Carne'), build_logical_operation('conjunction', [
+                build_rule(self.VERB, 'Fruta'), build_logical_operation('single-clause', [
+                    build_rule(self.VERB, 'Verdura')])])])
+        disjunction = build_logical_operation('disjunction', [
+            build_rule(self.VERB, 'Carne'), build_rule(self.VERB, 'Fruta')])
+        nested.add_logical_operator(disjunction)
+        normalized = LogicalOperationNormalizer().normalize(nested)
+
+        operators = normalized.get_logical_operators()
+        self.assertEquals(['Carne', 'Fruta', 'Verdura'], [
+            operator.get_rule_range().get_range() for operator in operators[:3]])
+        self.assertEquals(4, len(operators))
+        self.assertEquals('disjunction', operators[3].get_type())
+
+    def test_equivalent_operations_are_the_same_object(self):
+        normalizer = LogicalOperationNormalizer()
+        conjunction = normalizer.normalize(build_logical_operation('conjunction', [
+            build_rule(self.VERB, ['Verdura', 'Fruta']), build_rule(self.VERB, 'Carne')]))
+        reordered = normalizer.normalize(build_logical_operation('conjunction', [
+            build_rule(self.VERB, 'Carne'), build_rule(self.VERB, ['Fruta', 'Verdura', 'Fruta']),
+            build_rule(self.VERB, 'Carne')]))
+
+        self.assertIs(conjunction, reordered)
+        self.assertIsNot(conjunction, normalizer.normalize(build_logical_operation('disjunction', [
+            build_rule(self.VERB, ['Verdura', 'Fruta']), build_rule(self.VERB, 'Carne')])))
+
+    def test_repeated_class_expressions_are_removed(self):
+        owl_class = OWLSpecification.OWLClassSpecification('Vegano')
+        for noun_concepts in (['Fruta', 'Verdura'], ['Verdura', 'Fruta'], ['Carne']):
+            owl_class.add_equivalence_rule(build_logical_operation('single-clause', [
+                build_rule(self.VERB, noun_concepts)]))
+        owl_specification = OWLSpecification(self.PREFIX)
+        owl_specification.add_class_specification(owl_class)
+        content = owl_specification.build_owl_content()
+
+        self.assertEquals(1, owl_specification.normalize())
+        self.assertEquals(2, len(owl_class.get_equivalence_rules()))
+        self.assertTrue(len(owl_specification.build_owl_content()) < len(content))
+
+
+if __name__ == '__main__':
+    unittest.main()
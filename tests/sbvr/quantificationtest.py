@@ -0,0 +1,38 @@
+import unittest
+from src.sbvr.rule import Rule
+from tests.sbvrbuilders import SBVRQuantificationBuilder
+
+
+class QuantificationTest(unittest.TestCase):
+    """
+    Test cases for the resolution of the quantification types and values.
+    """
+
+    def test_types_are_resolved_to_kinds_and_bounds(self):
+        for quantification_type, value, kind, bounds in (
+                ('at-least-N', '2', Rule.Quantification.AT_LEAST, (2, None)),
+                ('at-most-N', '3', Rule.Quantification.AT_MOST, (None, 3)),
+                ('exactly-N', '1', Rule.Quantification.EXACTLY, (1, 1)),
+                ('at-least-N-and-at-most-M', '1..4', Rule.Quantification.RANGE, (1, 4)),
+                ('existencial', None, Rule.Quantification.EXISTENTIAL, (1, None)),
+                ('universal', None, Rule.Quantification.UNIVERSAL, (None, None))):
+            quantification = self.build_quantification(quantification_type, value)
+            self.assertEquals(kind, quantification.get_kind())
+            self.assertEquals(bounds, quantification.get_bounds())
+
+    def test_cardinality_without_value_has_no_bounds(self):
+        self.assertEquals(None, self.build_quantification('at-least-N', '').get_bounds())
+
+    def test_unknown_types_and_invalid_values_are_rejected(self):
+        self.assertRaises(ValueError, self.build_quantification, 'some-N', '1')
+        self.assertRaises(ValueError, self.build_quantification, 'at-least-N', 'one')
+        self.assertRaises(ValueError, self.build_quantification, 'exactly-N', '-1')
+        self.assertRaises(ValueError, self.build_quantification, 'at-least-N-and-at-most-M', '4..1')
+
+    def build_quantification(self, quantification_type, value):
+        return SBVRQuantificationBuilder().set_quantification_type(quantification_type).\
+            set_quantification_value(value).build()
+
+
+if __name__ == '__main__':
+    unittest.main()
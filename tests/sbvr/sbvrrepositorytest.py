@@ -0,0 +1,174 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.sbvr.binary_verb_concept_rule import BinaryVerbConceptRule
+from src.sbvr.sbvrrepository import SBVRRepository
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+from tests.sbvrbuilders import SBVRTermBuilder, SBVRRuleBuilder, build_logical_operation, \
+    build_rule
+
+
+class SBVRRepositoryTest(unittest.TestCase):
+    """
+    Test cases for the sqlite store of SBVR terms.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._input_filename = os.path.join(self._directory, 'rules.xml')
+        with open(self._input_filename, 'w') as input_file:
+            SBVRWorkloadGenerator(600, necessity_ratio = 0.6, definition_ratio = 0.3,
+                                  depth = 3, fan_out = 3, seed = 5).write(input_file)
+        self._repository = SBVRRepository(os.path.join(self._directory, 'sbvr.sqlite'),
+                                          batch_size = 100)
+
+    def tearDown(self):
+        self._repository.close()
+        shutil.rmtree(self._directory)
+
+    def test_loaded_specification_transforms_like_the_xml(self):
+        self.assertEquals(600, self._repository.import_xml_file(self._input_filename))
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml_file(self._input_filename)
+        self.assertEquals(self.transform(sbvr_specification),
+                          self.transform(self._repository.load_all()))
+
+    def test_repository_persists_and_appends(self):
+        database_filename = os.path.join(self._directory, 'persisted.sqlite')
+        repository = SBVRRepository(database_filename)
+        repository.import_xml_file(self._input_filename)
+        repository.close()
+
+        repository = SBVRRepository(database_filename)
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml_file(self._input_filename)
+        repository.import_specification(sbvr_specification)
+        terms = repository.load_all().get_terms()
+        repository.close()
+        self.assertEquals(1200, len(terms))
+        self.assertEquals([term.get_name() for term in terms[:600]],
+                          [term.get_name() for term in terms[600:]])
+
+    def test_subtree_is_loaded_with_its_verbs(self):
+        self._repository.import_xml_file(self._input_filename)
+        terms = self._repository.load_all().get_terms()
+        parents = dict((term.get_name(), term.get_general_concept()) for term in terms
+                       if term.is_concept_type())
+        root = terms[0].get_name()
+
+        def in_subtree(name):
+            while name is not None:
+                if name == root:
+                    return True
+                name = parents.get(name)
+            return False
+
+        expected = [term.get_name() for term in terms
+                    if term.is_concept_type() and in_subtree(term.get_name())]
+        self.assertTrue(1 < len(expected) < len(parents))
+        self.assertEquals(sorted(expected), sorted(self._repository.get_subtree_names(root)))
+
+        subtree = self._repository.load_subtree(root, include_verbs = False).get_terms()
+        self.assertEquals(expected, [term.get_name() for term in subtree])
+
+        # the synonyms named by the subtree are loaded with it
+        synonyms = dict((term.get_name(), term.get_synonym()) for term in terms)
+        names = set(expected)
+        for name in expected:
+            while synonyms.get(name) and synonyms[name] not in names:
+                name = synonyms[name]
+                names.add(name)
+        self.assertTrue(len(names) > len(expected))
+
+        subtree_with_verbs = self._repository.load_subtree(root).get_terms()
+        concepts = [term.get_name() for term in subtree_with_verbs if term.is_concept_type()]
+        verbs = set(term.get_name() for term in subtree_with_verbs if term.is_verb_concept())
+        self.assertEquals([term.get_name() for term in terms
+                           if term.is_concept_type() and term.get_name() in names], concepts)
+        for term in subtree:
+            if term.get_necessity() is not None:
+                for rule in term.get_necessity().iter_rules():
+                    self.assertIn(rule.get_verb(), verbs)
+
+    def test_terms_are_loaded_by_name(self):
+        self._repository.import_xml_file(self._input_filename)
+        terms = self._repository.load_terms(['Concepto3', 'Concepto1', 'missing']).get_terms()
+        self.assertEquals(['Concepto1', 'Concepto3'], [term.get_name() for term in terms])
+
+    def test_subtree_is_loaded_with_its_synonyms_and_verb_synonyms(self):
+        # Fruta (under Alimento) is also called Fructa, and its necessity has the verb come,
+        # a synonym of consume
+        necessity = build_logical_operation('single-clause', [build_rule('come', 'Semilla')])
+        consume = BinaryVerbConceptRule()
+        for text in ('Persona', 'Comida'):
+            role_as_xml = ET.Element('sbvr-role')
+            role_as_xml.text = text
+            consume.add_role(BinaryVerbConceptRule.BinaryVerbConceptRuleRole(role_as_xml))
+        self.import_terms([
+            SBVRTermBuilder().set_name('Alimento').build(),
+            SBVRTermBuilder().set_name('Fruta').set_general_concept('Alimento').
+            set_synonym('Fructa').set_necessity(necessity).build(),
+            SBVRTermBuilder().set_name('Fructa').set_general_concept('Cosa').build(),
+            SBVRTermBuilder().set_name('Semilla').build(),
+            SBVRTermBuilder().set_name('come').set_concept_type('binary verb concept').
+            set_synonym('consume').build(),
+            SBVRTermBuilder().set_name('consume').set_concept_type('binary verb concept').
+            set_necessity(consume).build()])
+
+        terms = self._repository.load_subtree('Alimento', include_verbs = False).get_terms()
+        self.assertEquals(['Alimento', 'Fruta'], [term.get_name() for term in terms])
+        terms = self._repository.load_subtree('Alimento').get_terms()
+        self.assertEquals(['Alimento', 'Fruta', 'Fructa', 'come', 'consume'],
+                          [term.get_name() for term in terms])
+        self.assertTrue(terms[3].is_verb_synonym())
+        self.assertEquals(['Persona', 'Comida'],
+                          [role.get_text() for role in terms[4].get_necessity().get_roles()])
+
+    def test_rules_without_quantification_are_loaded_without_one(self):
+        quantified = build_rule('consume', 'Fruta', 'at-most-N', '2')
+        unquantified = SBVRRuleBuilder().set_verb('consume').set_quantification(None).build()
+        self.import_terms([SBVRTermBuilder().set_name('Vegano').set_necessity(
+            build_logical_operation('conjunction', [quantified, unquantified])).build()])
+
+        rules = self._repository.load_all().get_terms()[0].get_necessity().get_logical_operators()
+        self.assertEquals(('at-most-N', '2'), (rules[0].get_quantification().get_type(),
+                                               rules[0].get_quantification().get_value()))
+        self.assertEquals(None, rules[1].get_quantification())
+        self.assertEquals('AlimentoOrigenVegetal', rules[1].get_rule_range().get_range())
+
+    def test_terms_that_can_not_be_stored_are_rejected(self):
+        self.import_terms([SBVRTermBuilder().set_name('Alimento').build()])
+        rule = SBVRRuleBuilder().build()
+        for sbvr_term in (SBVRTermBuilder().set_name('Vegano').set_definition(rule).build(),
+                          SBVRTermBuilder().set_name('Vegano').set_necessity(rule).build()):
+            self.assertRaises(ValueError, self.import_terms,
+                              [SBVRTermBuilder().set_name('Fruta').build(), sbvr_term])
+            self.assertEquals(['Alimento'], [term.get_name()
+                                             for term in self._repository.load_all().get_terms()])
+
+    def import_terms(self, sbvr_terms):
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.get_terms().extend(sbvr_terms)
+        return self._repository.import_specification(sbvr_specification)
+
+    def transform(self, sbvr_specification):
+        output_filename = os.path.join(self._directory, 'ontology.owl')
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            SBVRToOWL(sbvr_specification, output_filename, self.PREFIX).transform()
+        finally:
+            sys.stdout = stdout
+        with open(output_filename) as output_file:
+            return output_file.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+from src.sbvr.sbvrterm import SBVRTerm
+from src.sbvr.logicaloperation import LogicalOperation
+from src.sbvr.rule import Rule
+
+
+class SBVRTermBuilder():
+    """
+    Builder for sbvr Terms object
+    """
+    _name = 'Alimento'
+    _definition = None
+    _general_concept = None
+    _concept_type = 'general concept'
+    _synonym = None
+    _necessity = None
+
+    def set_name(self, name):
+        self._name = name
+        return self
+
+    def set_definition(self, definition):
+        self._definition = definition
+        return self
+
+    def set_general_concept(self, general_concept):
+        self._general_concept = general_concept
+        return self
+
+    def set_concept_type(self, concept_type):
+        self._concept_type = concept_type
+        return self
+
+    def set_synonym(self, synonym):
+        self._synonym = synonym
+        return self
+
+    def set_necessity(self, necessity):
+        self._necessity = necessity
+        return self
+
+    def build(self):
+        term = SBVRTerm()
+        term.set_name(self._name)
+        term.set_definition(self._definition)
+        term.set_general_concept(self._general_concept)
+        term.set_concept_type(self._concept_type)
+        term.set_synonym(self._synonym)
+        term.set_necessity(self._necessity)
+        return term
+
+
+class SBVRQuantificationBuilder:
+    """
+    Builder for quantification objects.
+    """
+    _quantification_type = 'at-least-N'
+    _quantification_value = '1'
+
+    def set_quantification_type(self, quantification_type):
+        self._quantification_type = quantification_type
+        return self
+
+    def set_quantification_value(self, quantification_value):
+        self._quantification_value = quantification_value
+        return self
+
+    def build(self):
+        quantification = Rule.Quantification()
+        quantification.set_quantification_type(self._quantification_type)
+        quantification.set_quantification_value(self._quantification_value)
+        return quantification
+
+
+class SBVRRuleRangeBuilder:
+    """
+    Builder to use when creating rule ranges.
+    """
+    _range_noun_concept = 'AlimentoOrigenVegetal'
+    _disjunction = None
+    _conjunction = None
+
+    def set_range_noun_concept(self, noun_concept):
+        self._range_noun_concept = noun_concept
+        self._conjunction = None
+        self._disjunction = None
+        return self
+
+    def set_disjunction(self, disjunction):
+        self._range_noun_concept = None
+        self._conjunction = None
+        self._disjunction = disjunction
+        return self
+
+    def set_conjunction(self, conjunction):
+        self._range_noun_concept = None
+        self._disjunction = None
+        self._conjunction = conjunction
+        return self
+
+    def build(self):
+        rule_range = Rule.RuleRange()
+
+        if self._range_noun_concept != None:
+            rule_range.set_noun_concept(self._range_noun_concept)
+
+        if self._disjunction != None:
+            rule_range.set_disjunction(self._disjunction)
+
+        if self._conjunction != None:
+            rule_range.set_conjunction(self._conjunction)
+
+        return rule_range
+
+
+class SBVRRuleBuilder:
+    """
+    Builder for sbvr rules.
+    """
+    _quantification = None
+    _verb = None
+    _rule_range = None
+
+    def __init__(self):
+        self._quantification = SBVRQuantificationBuilder().build()
+        self._verb = 'solo_permite_consumo_de'
+        self._rule_range = SBVRRuleRangeBuilder().build()
+
+    def set_quantification(self, quantification):
+        self._quantification = quantification
+        return self
+
+    def set_verb(self, verb):
+        self._verb = verb
+        return self
+
+    def set_rule_range(self, rule_range):
+        self._rule_range = rule_range
+        return self
+
+    def build(self):
+        rule = Rule()
+        rule.set_quantification(self._quantification)
+        rule.set_verb(self._verb)
+        rule.set_rule_range(self._rule_range)
+        return rule
+
+
+class LogicalOperationBuilder:
+    """
+    Builder for sbvr logical operations (conjunction, disjunction or single clauses).
+    """
+    _type = None
+    _logical_operators = None
+
+    def __init__(self):
+        self._type = 'single-clause'
+        self._logical_operators = []
+        self._logical_operators.append(SBVRRuleBuilder().build())
+
+    def set_type(self, logical_operation_type):
+        self._type = logical_operation_type
+        return self
+
+    def set_logical_operators(self, logical_operators):
+        self._logical_operators = logical_operators
+        return self
+
+    def build(self):
+        logical_operation = LogicalOperation(self._type)
+        logical_operation.set_logical_operators(self._logical_operators)
+        return logical_operation
+
+
+def build_rule(verb, noun_concepts, quantification_type='at-least-N', quantification_value='1',
+               conjunction=False):
+    """
+    Builds a rule over a noun concept, or over the disjunction (or the conjunction) of a list
+    of noun concepts.
+    """
+    rule_range_builder = SBVRRuleRangeBuilder()
+    if not isinstance(noun_concepts, list):
+        rule_range_builder.set_range_noun_concept(noun_concepts)
+    elif conjunction:
+        rule_range_builder.set_conjunction(noun_concepts)
+    else:
+        rule_range_builder.set_disjunction(noun_concepts)
+    quantification = SBVRQuantificationBuilder().\
+        set_quantification_type(quantification_type).\
+        set_quantification_value(quantification_value).build()
+    return SBVRRuleBuilder().set_verb(verb).set_quantification(quantification).\
+        set_rule_range(rule_range_builder.build()).build()
+
+
+def build_logical_operation(logical_operation_type, logical_operators):
+    return LogicalOperationBuilder().set_type(logical_operation_type).\
+        set_logical_operators(list(logical_operators)).build()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.mapping.sbvrtermprofiler import SBVRTermProfiler
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+
+
+class SBVRTermProfilerTest(unittest.TestCase):
+    """
+    Test cases for the profiler of the most expensive terms of a transformation.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_heaps_keep_the_largest_measures(self):
+        term_profiler = SBVRTermProfiler(3)
+        for index, size in enumerate([5, 1, 9, 7, 3, 9]):
+            term = self.build_term('Concepto%d' % index)
+            term_profiler.record(SBVRTermProfiler.OUTPUT_BYTES, size, term)
+
+        top_terms = term_profiler.get_top_terms(SBVRTermProfiler.OUTPUT_BYTES)
+        self.assertEquals([9, 9, 7], [top_term['output_bytes'] for top_term in top_terms])
+        self.assertEquals(set(['Concepto2', 'Concepto5']),
+                          set(top_term['name'] for top_term in top_terms[:2]))
+        self.assertEquals([], term_profiler.get_top_terms(SBVRTermProfiler.PARSE))
+
+    def test_pathological_term_is_reported_with_its_stats(self):
+        xml = StringIO()
+        SBVRWorkloadGenerator(300, necessity_ratio = 0.5, seed = 2).write(xml)
+        root = ET.fromstring(xml.getvalue())
+        root.insert(0, ET.fromstring(
+            '<sbvr-term><sbvr-term-name>Patologico</sbvr-term-name>'
+            '<sbvr-term-definition></sbvr-term-definition>'
+            '<sbvr-term-general-concept></sbvr-term-general-concept>'
+            '<sbvr-term-concept-type>general concept</sbvr-term-concept-type>'
+            '<sbvr-term-synonym></sbvr-term-synonym><sbvr-term-necessity><sbvr-conjunction>' +
+            ''.join('<sbvr-logical-operator><sbvr-verb>verbo0</sbvr-verb>'
+                    '<sbvr-quantification type="at-least-N">1</sbvr-quantification>'
+                    '<sbvr-disjunction>%s</sbvr-disjunction></sbvr-logical-operator>' % ''.join(
+                        '<sbvr-concept>Concepto%d</sbvr-concept>' % concept for concept in range(200))
+                    for _ in range(20)) +
+            '</sbvr-conjunction></sbvr-term-necessity></sbvr-term>'))
+
+        term_profiler = SBVRTermProfiler(5)
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml(root, term_profiler)
+        transformer = SBVRToOWL(sbvr_specification, os.path.join(self._directory, 'ontology.owl'),
+                                self.PREFIX, term_profiler = term_profiler)
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            transformer.transform()
+        finally:
+            sys.stdout = stdout
+
+        for measure in SBVRTermProfiler.MEASURES:
+            self.assertEquals(5, len(term_profiler.get_top_terms(measure)))
+        top_term = term_profiler.get_top_terms(SBVRTermProfiler.OUTPUT_BYTES)[0]
+        self.assertEquals('Patologico', top_term['name'])
+        self.assertEquals(1, top_term['operations'])
+        self.assertEquals(20, top_term['operands'])
+        self.assertEquals(20 * 200, top_term['range_concepts'])
+        self.assertEquals(200, top_term['max_range_width'])
+        self.assertTrue('Patologico' in term_profiler.format_report())
+        self.assertEquals(sorted(SBVRTermProfiler.MEASURES), sorted(term_profiler.to_dict()))
+
+    def build_term(self, name):
+        sbvr_specification = SBVRSpecification()
+        return sbvr_specification.parse_sbvr_term(ET.fromstring(
+            '<sbvr-term><sbvr-term-name>%s</sbvr-term-name>'
+            '<sbvr-term-definition></sbvr-term-definition>'
+            '<sbvr-term-general-concept></sbvr-term-general-concept>'
+            '<sbvr-term-concept-type>general concept</sbvr-term-concept-type>'
+            '<sbvr-term-synonym></sbvr-term-synonym><sbvr-term-necessity></sbvr-term-necessity>'
+            '</sbvr-term>' % name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,21 @@
 import unittest
+import bz2
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+from StringIO import StringIO
 from src.sbvr.sbvrspecification import *
 from src.mapping.sbvrtoowl import *
+from src.owl.owl_writer import OWLWriter
+from src.owl.owl_output_options import OWLOutputOptions
+from src.owl.owl_compression import OWLCompression
 from src.sbvr.fact import *
 import xml.etree.ElementTree as ET
 from src.sbvr.logicaloperation import *
+from tests.sbvrbuilders import SBVRTermBuilder, SBVRQuantificationBuilder, \
+    SBVRRuleRangeBuilder, SBVRRuleBuilder, LogicalOperationBuilder
 
 
 
@@ -12,6 +24,14 @@ class SBVRToOWLTest(unittest.TestCase):
     Test cases for the SBVR To OWL core mappings.
     """
 
+    def make_temporary_directory(self):
+        """
+        Returns a new temporary directory, which is removed after the test.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return directory
+
     def test_extract_owl_classes_and_sub_classes_no_classes(self):
         xml = '''<?xml version="1.0"?> 
                  <sbvr-specification>
@@ -27,7 +47,7 @@ class SBVRToOWLTest(unittest.TestCase):
 
 
     def test_transform_with_simple_classes(self):
-        term = self.SBVRTermBuilder().build()
+        term = SBVRTermBuilder().build()
         sbvr_specification = SBVRSpecification()
         sbvr_specification.set_terms([term])
         transformer = SBVRToOWL(sbvr_specification, 'output.test', '')
@@ -45,7 +65,7 @@ class SBVRToOWLTest(unittest.TestCase):
 
 
     def test_transform_with_subclass(self):
-        term = self.SBVRTermBuilder().\
+        term = SBVRTermBuilder().\
                set_name('RegimenAlimentario').\
                set_general_concept('Alimento').\
                build()
@@ -67,8 +87,8 @@ class SBVRToOWLTest(unittest.TestCase):
 
 
     def test_transform_with_definition(self):
-        definition = self.SBVRRuleBuilder().build()
-        term = self.SBVRTermBuilder().\
+        definition = SBVRRuleBuilder().build()
+        term = SBVRTermBuilder().\
                set_name('RegimenAlimentario').\
                set_general_concept('Alimento').\
                set_definition(definition).\
@@ -94,14 +114,14 @@ class SBVRToOWLTest(unittest.TestCase):
         
 
     def test_transform_with_necessity(self):
-        logical_operator_1 = self.SBVRRuleBuilder().build()
+        logical_operator_1 = SBVRRuleBuilder().build()
         operators = [logical_operator_1]
-        necessity = self.LogicalOperationBuilder().\
+        necessity = LogicalOperationBuilder().\
                         set_type('single-clause').\
                         set_logical_operators(operators).\
                         build()
         
-        term = self.SBVRTermBuilder().\
+        term = SBVRTermBuilder().\
                set_name('RegimenAlimentario').\
                set_general_concept('Alimento').\
                set_necessity(necessity).\
@@ -126,17 +146,17 @@ class SBVRToOWLTest(unittest.TestCase):
         self.assertEquals(necessity, sub_class_of_expression)
 
     def test_transform_with_conjunction_necessity(self):
-        logical_operator_1 = self.SBVRRuleBuilder().build()
+        logical_operator_1 = SBVRRuleBuilder().build()
         
-        logical_operator_2 = self.SBVRRuleBuilder().set_quantification(\
-                                self.SBVRQuantificationBuilder().\
+        logical_operator_2 = SBVRRuleBuilder().set_quantification(\
+                                SBVRQuantificationBuilder().\
                                 set_quantification_type('at-most-N').\
                                 build()).\
                                 build()
         operators = [logical_operator_1, logical_operator_2]
-        necessity = self.LogicalOperationBuilder().set_logical_operators(operators).build()
+        necessity = LogicalOperationBuilder().set_logical_operators(operators).build()
 
-        term = self.SBVRTermBuilder().\
+        term = SBVRTermBuilder().\
                set_name('RegimenAlimentario').\
                set_general_concept('Alimento').\
                set_necessity(necessity).\
@@ -160,173 +180,177 @@ class SBVRToOWLTest(unittest.TestCase):
         sub_class_of_expression = owl_class.get_sub_class_of_expressions()[0]
         self.assertEquals(necessity, sub_class_of_expression)
 
+    def test_iter_owl_fragments(self):
+        class_term = SBVRTermBuilder().\
+                     set_name('RegimenAlimentario').\
+                     set_general_concept('Alimento').\
+                     build()
+        verb_term = SBVRTermBuilder().\
+                    set_name('permite_comer').\
+                    set_concept_type('binary verb concept').\
+                    set_synonym('permite_consumo_de').\
+                    build()
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms([class_term, verb_term])
+        transformer = SBVRToOWL(sbvr_specification, 'output.test', '')
+        transformer.build_owl_specification()
+        owl_specification = transformer.get_owl_specification()
 
-    class SBVRTermBuilder():
-        """
-        Builder for sbvr Terms object
-        """
-        _name = 'Alimento'
-        _definition = None
-        _general_concept = None
-        _concept_type = 'general concept'
-        _synonym = None
-        _necessity = None
-
-        def set_name(self, name):
-            self._name = name
-            return self
-
-        def set_definition(self, definition):
-            self._definition = definition
-            return self
-
-        def set_general_concept(self, general_concept):
-            self._general_concept = general_concept
-            return self
-
-        def set_concept_type(self, concept_type):
-            self._concept_type = concept_type
-            return self
-
-        def set_synonym(self, synonym):
-            self._synonym = synonym
-            return self
-
-        def set_necessity(self, necessity):
-            self._necessity = necessity
-            return self
-
-        def build(self):
-            term = SBVRTerm()
-            term.set_name(self._name)
-            term.set_definition(self._definition)
-            term.set_general_concept(self._general_concept)
-            term.set_concept_type(self._concept_type)
-            term.set_synonym(self._synonym)
-            term.set_necessity(self._necessity)
-            return term
-        
-    class SBVRQuantificationBuilder:
-        """ 
-        Builder for quantification objects.
-        """
-        _quantification_type = 'at-least-N'
-        _quantification_value = '1'
-        
-        def set_quantification_type(self, quantification_type):
-            self._quantification_type = quantification_type
-            return self
-        
-        def set_quantification_value(self, quantification_value):
-            self._quantification_value = quantification_value
-            return self
-        
-        def build(self):
-            quantification = Rule.Quantification()
-            quantification.set_quantification_type(self._quantification_type)
-            quantification.set_quantification_value(self._quantification_value)
-            return quantification
-
-
-    class SBVRRuleRangeBuilder:
-        """ 
-        Builder to use when creating rule ranges.
-        """
-        _range_noun_concept = 'AlimentoOrigenVegetal'
-        _disjunction = None
-        _conjunction = None
+        fragments = list(owl_specification.iter_owl_fragments())
+        self.assert_set_len(2, fragments)
+        self.assertEquals(owl_specification.get_object_properties()[0].to_owl(''), fragments[0])
+        self.assertEquals(owl_specification.get_classes()[0].to_owl(''), fragments[1])
+        self.assertEquals('\n' + '\n'.join(fragments), owl_specification.build_owl_content())
 
-        def set_range_noun_concept(self, noun_concept):
-            self._range_noun_concept = noun_concept
-            self._conjunction = None
-            self._disjunction = None
-            return self
+    def test_write_ontology_to_owl_file_streams_document(self):
+        term = SBVRTermBuilder().\
+               set_name('RegimenAlimentario').\
+               set_general_concept('Alimento').\
+               build()
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms([term])
+        output_filename = os.path.join(self.make_temporary_directory(), 'output.owl')
+        transformer = SBVRToOWL(sbvr_specification, output_filename, 'http://example.org/onto')
+        transformer.transform()
 
-        def set_disjunction(self, disjunction):
-            self._range_noun_concept = None
-            self._conjunction = None
-            self._disjunction = disjunction
-            return self
+        expected_content = OWLFile.XML_VERSION + '\n' + OWLFile.OWL_DOCTYPE + '\n' + \
+            OWLFile.OWL_RDF_NAMESPACES.format(owl_file_content = transformer.build_owl_content()) + '\n'
+        with open(output_filename) as output_file:
+            self.assertEquals(expected_content, output_file.read())
 
-        def set_conjunction(self, conjunction):
-            self._range_noun_concept = None
-            self._disjunction = None
-            self._conjunction = conjunction
-            return self
+    def test_parallel_fragments_are_identical(self):
+        terms = [SBVRTermBuilder().
+                 set_name('Clase%d' % index).
+                 set_general_concept('Clase%d' % (index // 2)).
+                 build() for index in range(1, 12)]
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms(terms)
+        transformer = SBVRToOWL(sbvr_specification, 'output.test', 'http://example.org/onto')
+        transformer.build_owl_specification()
+        owl_specification = transformer.get_owl_specification()
 
-        def build(self):
-            rule_range = Rule.RuleRange()
+        contents = []
+        for processes in (1, 3):
+            output_file = StringIO()
+            OWLWriter(output_file).write_document('http://example.org/onto',
+                owl_specification.iter_owl_fragments(processes = processes, batch_size = 2))
+            contents.append(output_file.getvalue())
+        self.assertEquals(contents[0], contents[1])
+
+    def test_transform_compact_output(self):
+        definition = LogicalOperationBuilder().build()
+        term = SBVRTermBuilder().\
+               set_name('RegimenAlimentario').\
+               set_general_concept('Alimento').\
+               set_synonym('Dieta').\
+               set_definition(definition).\
+               build()
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms([term, SBVRTermBuilder().build()])
+        output_directory = self.make_temporary_directory()
+
+        pretty_filename = os.path.join(output_directory, 'pretty.owl')
+        SBVRToOWL(sbvr_specification, pretty_filename, 'http://example.org/onto').transform()
+
+        compact_filename = os.path.join(output_directory, 'compact.owl')
+        output_options = OWLOutputOptions()
+        output_options.set_compact(True)
+        SBVRToOWL(sbvr_specification, compact_filename, 'http://example.org/onto',
+                  output_options).transform()
+
+        with open(compact_filename) as compact_file:
+            compact_content = compact_file.read()
+        self.assertEquals(1, compact_content.count('\n'))
+        self.assertTrue(len(compact_content) < os.path.getsize(pretty_filename))
+        self.assertEquals(self.xml_structure(ET.parse(pretty_filename).getroot()),
+                          self.xml_structure(ET.parse(compact_filename).getroot()))
+
+    def test_transform_compressed_output(self):
+        terms = [SBVRTermBuilder().
+                 set_name('Clase%d' % index).
+                 set_general_concept('Clase%d' % (index // 2)).
+                 build() for index in range(1, 50)]
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms(terms)
+        output_directory = self.make_temporary_directory()
+
+        plain_filename = os.path.join(output_directory, 'ontology.owl')
+        SBVRToOWL(sbvr_specification, plain_filename, 'http://example.org/onto').transform()
+        with open(plain_filename) as plain_file:
+            plain_content = plain_file.read()
+
+        for codec, open_compressed in ((OWLCompression.CODEC_GZIP, gzip.open),
+                                       (OWLCompression.CODEC_BZ2, bz2.BZ2File)):
+            compressed_filename = plain_filename + OWLCompression.EXTENSIONS[codec]
+            output_options = OWLOutputOptions()
+            output_options.set_compression(codec, 9)
+            SBVRToOWL(sbvr_specification, compressed_filename, 'http://example.org/onto',
+                      output_options).transform()
+
+            self.assertTrue(os.path.getsize(compressed_filename) < len(plain_content) / 10)
+            compressed_file = open_compressed(compressed_filename)
+            self.assertEquals(plain_content, compressed_file.read())
+            compressed_file.close()
+
+    def test_unknown_compression_codec(self):
+        self.assertRaises(ValueError, OWLOutputOptions().set_compression, 'rar')
+
+    def test_compression_level_out_of_range(self):
+        output_options = OWLOutputOptions()
+        for codec, level in ((OWLCompression.CODEC_GZIP, 10), (OWLCompression.CODEC_GZIP, -2),
+                             (OWLCompression.CODEC_BZ2, 0), (OWLCompression.CODEC_ZSTD, 23)):
+            self.assertRaises(ValueError, output_options.set_compression, codec, level)
+        self.assertRaises(ValueError, output_options.set_compression, None, 9)
+        output_options.set_compression(OWLCompression.CODEC_BZ2, 1)
+        self.assertEquals(1, output_options.get_compression_level())
+
+    def test_transform_closes_the_output_file_on_error(self):
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms([SBVRTermBuilder().set_name(None).build()])
+        output_filename = os.path.join(self.make_temporary_directory(), 'ontology.owl.gz')
+        output_options = OWLOutputOptions()
+        output_options.set_compression(OWLCompression.CODEC_GZIP)
+        transformer = SBVRToOWL(sbvr_specification, output_filename, 'http://example.org/onto',
+                                output_options)
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.assertRaises(TypeError, transformer.transform)
+        finally:
+            sys.stdout = stdout
+        # the compressed file is complete, with its trailer, once it is closed
+        compressed_file = gzip.open(output_filename)
+        self.assertEquals('', compressed_file.read())
+        compressed_file.close()
+
+    def test_transform_reduced_output(self):
+        terms = [SBVRTermBuilder().set_name(name).set_general_concept(general_concept).build()
+                 for name, general_concept in (('Manzana', 'Fruta'), ('Manzana', 'Alimento'),
+                                               ('Fruta', 'Alimento'))]
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.set_terms(terms)
+        output_options = OWLOutputOptions()
+        output_options.set_reduced(True)
+        transformer = SBVRToOWL(sbvr_specification, 'output.test', 'http://example.org/onto',
+                                output_options)
+        transformer.transform()
 
-            if self._range_noun_concept != None:
-                rule_range.set_noun_concept(self._range_noun_concept)
+        self.assertEquals(1, transformer.get_removed_sub_class_of_count())
+        with open('output.test') as output_file:
+            self.assertEquals(2, output_file.read().count('<rdfs:subClassOf'))
 
-            if self._disjunction != None:
-                rule_range.set_disjunction(self.disjunction)
+    def test_owl_writer_flushes_when_buffer_is_full(self):
+        output_file = StringIO()
+        owl_writer = OWLWriter(output_file, buffer_size = 8)
+        owl_writer.write('<a/>')
+        self.assertEquals('', output_file.getvalue())
 
-            if self._conjunction != None:
-                rule_range.set_conjunction(self.conjunction)
+        owl_writer.write('<b/>')
+        self.assertEquals('<a/><b/>', output_file.getvalue())
+        self.assertEquals(8, owl_writer.get_bytes_written())
 
-            return rule_range
 
 
-    class SBVRRuleBuilder:
-        """
-        Builder for sbvr rules.
-        """
-        _quantification = None
-        _verb = None
-        _rule_range = None
-
-        def __init__(self):
-            self._quantification = SBVRToOWLTest.SBVRQuantificationBuilder().build()
-            self._verb = 'solo_permite_consumo_de'
-            self._rule_range = SBVRToOWLTest.SBVRRuleRangeBuilder().build()
-            
-        def set_quantification(self, quantification):
-            self._quantification = quantification
-            return self
-        
-        def set_verb(self, verb):
-            self._verb = verb
-            return self
-            
-        def set_rule_range(self, rule_range):
-            self._rule_range = rule_range
-            return self
-
-        def build(self):
-            rule = Rule()
-            rule.set_quantification(self._quantification)
-            rule.set_verb(self._verb)
-            rule.set_rule_range(self._rule_range)
-            return rule
-    
-    class LogicalOperationBuilder:
-        """
-        Builder for sbvr logical operations (conjunction, disjunction or single clauses).
-        """
-        _type = None
-        _logical_operators = None
-
-        def __init__(self):
-            self._type = 'single-clause'
-            self._logical_operators = []
-            self._logical_operators.append(SBVRToOWLTest.SBVRRuleBuilder().build())
-            
-        def set_type(self, logical_operation_type):
-            self._type = logical_operation_type
-            return self
-        
-        def set_logical_operators(self, logical_operators):
-            self._logical_operators = logical_operators
-            return self
-            
-        def build(self):
-            logical_operation = LogicalOperation(self._type)
-            logical_operation.set_logical_operators(self._logical_operators)
-            return logical_operation
-    
-    
     # def test_extract_owl_classes_and_sub_classes_with_classes(self):
     #     xml = '''<?xml version="1.0"?> 
     #                <sbvr-specification>
@@ -544,6 +568,13 @@ class SBVRToOWLTest(unittest.TestCase):
         return sbvr_specification
 
 
+    def xml_structure(self, element):
+        """
+        Returns the tags, attributes and texts of the element tree, ignoring whitespace.
+        """
+        return [(node.tag, sorted(node.attrib.items()), (node.text or '').strip())
+                for node in element.iter()]
+
     def assert_set_len(self, expected_len, test_set):
         """
         Assert that the set is not None and it has the given size.
@@ -0,0 +1,176 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.mapping.sbvrwatcher import SBVRWatcher
+from src.owl.owl_output_options import OWLOutputOptions
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+
+
+class SBVRWatcherTest(unittest.TestCase):
+    """
+    Test cases for the watch mode, which writes the ontology again when its files are saved.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._input_filenames = []
+        for seed, term_count in ((1, 300), (2, 200)):
+            output_file = StringIO()
+            SBVRWorkloadGenerator(term_count, necessity_ratio = 0.5, definition_ratio = 0.3,
+                                  seed = seed).write(output_file)
+            filename = os.path.join(self._directory, 'rules%d.xml' % seed)
+            self._input_filenames.append(filename)
+            self.save(filename, output_file.getvalue())
+        self._output_filename = os.path.join(self._directory, 'ontology.owl')
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_changed_terms_are_rendered_again(self):
+        watcher = SBVRWatcher(self._input_filenames, self._output_filename, self.PREFIX,
+                              debounce = 0)
+        watcher.watch(max_writes = 1, report_file = None)
+        self.assertEquals(self.transform(), self.read_output())
+        self.assertEquals({'files': self._input_filenames, 'terms': 500, 'rendered': 500,
+                           'reused': 0}, self.get_counts(watcher.get_reports()[0]))
+
+        self.assertEquals(None, watcher.check())
+        with open(self._input_filenames[0]) as input_file:
+            content = input_file.read()
+        self.save(self._input_filenames[0], content.replace(
+            '<sbvr-term-name>Concepto3</sbvr-term-name>',
+            '<sbvr-term-name>Concepto3b</sbvr-term-name>'))
+        report = watcher.check()
+        self.assertEquals({'files': self._input_filenames[:1], 'terms': 500, 'rendered': 1,
+                           'reused': 299}, self.get_counts(report))
+        self.assertTrue(report['latency_seconds'] >= report['write_seconds'])
+        self.assertEquals(self.transform(), self.read_output())
+        self.assertIn('Concepto3b', self.read_output())
+
+    def test_writes_wait_for_the_debounce_time(self):
+        watcher = SBVRWatcher(self._input_filenames, self._output_filename, self.PREFIX,
+                              debounce = 0.2)
+        watcher.watch(max_writes = 1, report_file = None)
+        for filename in self._input_filenames:
+            with open(filename) as input_file:
+                self.save(filename, input_file.read() + '\n')
+            self.assertEquals(None, watcher.check())
+        time.sleep(0.25)
+        report = watcher.check()
+        self.assertEquals(self._input_filenames, report['files'])
+        self.assertEquals(500, report['reused'])
+        self.assertEquals(None, watcher.check())
+
+    def test_invalid_file_keeps_the_previous_output(self):
+        watcher = SBVRWatcher(self._input_filenames, self._output_filename, self.PREFIX,
+                              debounce = 0)
+        watcher.watch(max_writes = 1, report_file = None)
+        output = self.read_output()
+        self.save(self._input_filenames[1], '<sbvr-specification><sbvr-term>')
+        report_file = StringIO()
+        self.assertEquals(None, watcher.check(report_file))
+        self.assertTrue(report_file.getvalue().startswith('Not written'))
+        self.assertEquals(output, self.read_output())
+
+    def test_term_that_can_not_be_mapped_keeps_the_previous_output(self):
+        for output_options in (None, self.build_canonical_options()):
+            watcher = SBVRWatcher(self._input_filenames, self._output_filename, self.PREFIX,
+                                  output_options, debounce = 0)
+            watcher.watch(max_writes = 1, report_file = None)
+            output = self.read_output()
+            with open(self._input_filenames[1]) as input_file:
+                content = input_file.read()
+            self.save(self._input_filenames[1], content.replace(
+                '<sbvr-term-name>Concepto3</sbvr-term-name>', '', 1))
+            report_file = StringIO()
+            self.assertEquals(None, watcher.check(report_file))
+            self.assertTrue(report_file.getvalue().startswith('Not written'))
+            self.assertEquals(output, self.read_output())
+            self.assertFalse(os.path.exists(self._output_filename + SBVRWatcher.TEMPORARY_SUFFIX))
+
+            # the watch goes on, and writes the ontology once the file is fixed
+            self.save(self._input_filenames[1], content)
+            self.assertNotEquals(None, watcher.check())
+
+    def test_failed_write_is_tried_again_on_the_next_poll(self):
+        output_directory = os.path.join(self._directory, 'output')
+        os.mkdir(output_directory)
+        output_filename = os.path.join(output_directory, 'ontology.owl')
+        watcher = SBVRWatcher(self._input_filenames, output_filename, self.PREFIX, debounce = 0)
+        watcher.watch(max_writes = 1, report_file = None)
+        with open(self._input_filenames[0]) as input_file:
+            content = input_file.read()
+        self.save(self._input_filenames[0], content.replace(
+            '<sbvr-term-name>Concepto3</sbvr-term-name>',
+            '<sbvr-term-name>Concepto3b</sbvr-term-name>'))
+
+        # the output can not be written while its directory is missing
+        moved_directory = os.path.join(self._directory, 'moved')
+        os.rename(output_directory, moved_directory)
+        report_file = StringIO()
+        self.assertEquals(None, watcher.check(report_file))
+        self.assertEquals(None, watcher.check(report_file))
+        self.assertEquals(1, report_file.getvalue().count('Not written'))
+
+        # the next poll writes the saved change, without another save
+        os.rename(moved_directory, output_directory)
+        report = watcher.check(report_file)
+        self.assertEquals(self._input_filenames[:1], report['files'])
+        with open(output_filename) as output_file:
+            self.assertIn('Concepto3b', output_file.read())
+        self.assertEquals(None, watcher.check())
+
+    def test_whole_specification_options_transform_again(self):
+        output_options = self.build_canonical_options()
+        watcher = SBVRWatcher(self._input_filenames, self._output_filename, self.PREFIX,
+                              output_options, debounce = 0)
+        self.assertFalse(watcher.is_incremental())
+        watcher.watch(max_writes = 1, report_file = None)
+        self.assertEquals(self.transform(output_options), self.read_output())
+
+    def build_canonical_options(self):
+        output_options = OWLOutputOptions()
+        output_options.set_canonical(True)
+        return output_options
+
+    def save(self, filename, content):
+        """
+        Writes the given content to the file, moving its modification time forward, so the save
+        is seen even on file systems with coarse timestamps.
+        """
+        mtime = os.stat(filename).st_mtime + 1 if os.path.exists(filename) else time.time() - 60
+        with open(filename, 'w') as output_file:
+            output_file.write(content)
+        os.utime(filename, (mtime, mtime))
+
+    def read_output(self):
+        with open(self._output_filename) as output_file:
+            return output_file.read()
+
+    def get_counts(self, report):
+        return dict((key, report[key]) for key in ('files', 'terms', 'rendered', 'reused'))
+
+    def transform(self, output_options=None):
+        sbvr_specification = SBVRSpecification()
+        for filename in self._input_filenames:
+            sbvr_specification.from_xml_file(filename)
+        output_filename = os.path.join(self._directory, 'expected.owl')
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            SBVRToOWL(sbvr_specification, output_filename, self.PREFIX, output_options).transform()
+        finally:
+            sys.stdout = stdout
+        with open(output_filename) as output_file:
+            return output_file.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
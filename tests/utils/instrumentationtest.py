@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.owl.owl_output_options import OWLOutputOptions
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.instrumentation import Instrumentation
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+
+
+class InstrumentationTest(unittest.TestCase):
+    """
+    Test cases for the instrumentation of the stages of a transformation.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_stages_and_counters(self):
+        instrumentation = Instrumentation()
+        with instrumentation.stage('parse') as stage:
+            stage['items'] = 3
+        with instrumentation.stage('write'):
+            pass
+        counted = instrumentation.count_calls('calls', lambda value: value * 2)
+        self.assertEquals(4, counted(2))
+        counted(1)
+        instrumentation.count('bytes_written', 2 * 1048576)
+
+        self.assertEquals(['parse', 'write'], [stage['name'] for stage in instrumentation.get_stages()])
+        stage = instrumentation.get_stage('parse')
+        self.assertEquals(3, stage['items'])
+        for measure in ('wall_seconds', 'cpu_seconds', 'peak_memory_bytes'):
+            self.assertTrue(stage[measure] >= 0)
+        self.assertEquals({'calls': 2, 'bytes_written': 2 * 1048576}, instrumentation.get_counters())
+
+        report = json.loads(instrumentation.to_json())
+        self.assertEquals(2, len(report['stages']))
+        summary = instrumentation.get_summary()
+        self.assertTrue(summary.startswith('parse '))
+        self.assertTrue(' (3) | write ' in summary)
+        self.assertTrue('| 2.0MB written |' in summary)
+        self.assertEquals(1, len(summary.splitlines()))
+
+    def test_instrumented_transformation(self):
+        input_filename = os.path.join(self._directory, 'rules.xml')
+        with open(input_filename, 'w') as input_file:
+            SBVRWorkloadGenerator(200, seed = 1).write(input_file)
+        output_filename = os.path.join(self._directory, 'ontology.owl')
+
+        instrumentation = Instrumentation()
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml_file(input_filename, instrumentation)
+        output_options = OWLOutputOptions()
+        output_options.set_reduced(True)
+        self.transform(SBVRToOWL(sbvr_specification, output_filename, self.PREFIX, output_options,
+                                 instrumentation = instrumentation))
+
+        self.assertEquals(['parse', 'map', 'reduce', 'write'],
+                          [stage['name'] for stage in instrumentation.get_stages()])
+        self.assertEquals(200, instrumentation.get_stage('parse')['items'])
+        counters = instrumentation.get_counters()
+        self.assertEquals(os.path.getsize(output_filename), counters['bytes_written'])
+        self.assertEquals(len([term for term in sbvr_specification.get_terms() if term.is_concept_type()]),
+                          counters.get('render.OWLClassSpecification.OWL_CLASS_TEMPLATE', 0) +
+                          counters.get('render.OWLClassSpecification.OWL_SIMPLE_CLASS_TEMPLATE', 0))
+
+        # without instrumentation the output is the same
+        uninstrumented_filename = os.path.join(self._directory, 'uninstrumented.owl')
+        self.transform(SBVRToOWL(sbvr_specification, uninstrumented_filename, self.PREFIX,
+                                 output_options))
+        with open(output_filename) as output_file:
+            with open(uninstrumented_filename) as uninstrumented_file:
+                self.assertEquals(uninstrumented_file.read(), output_file.read())
+
+    def transform(self, transformer):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            transformer.transform()
+        finally:
+            sys.stdout = stdout
+
+
+if __name__ == '__main__':
+    unittest.main()
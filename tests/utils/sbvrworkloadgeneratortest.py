@@ -0,0 +1,90 @@
+import unittest
+import xml.etree.ElementTree as ET
+from StringIO import StringIO
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+
+
+class SBVRWorkloadGeneratorTest(unittest.TestCase):
+    """
+    Test cases for the generator of synthetic SBVR specifications.
+    """
+
+    def test_same_seed_writes_the_same_document(self):
+        self.assertEquals(self.write(SBVRWorkloadGenerator(500, seed = 1)),
+                          self.write(SBVRWorkloadGenerator(500, seed = 1)))
+        self.assertNotEquals(self.write(SBVRWorkloadGenerator(500, seed = 1)),
+                             self.write(SBVRWorkloadGenerator(500, seed = 2)))
+
+    def test_document_has_the_requested_mix_of_terms(self):
+        generator = SBVRWorkloadGenerator(1000, verb_ratio = 0.2, data_property_ratio = 0.25,
+                                          synonym_ratio = 0.5, necessity_ratio = 1,
+                                          definition_ratio = 0.5, seed = 3)
+        sbvr_specification = self.parse(generator)
+        terms = sbvr_specification.get_terms()
+        self.assertEquals(1000, len(terms))
+
+        concepts = [term for term in terms if term.is_concept_type()]
+        verbs = [term for term in terms if term.is_verb_concept()]
+        self.assertEquals(800, len(concepts))
+        self.assertEquals(200, len(verbs))
+        self.assertEquals(50, len([verb for verb in verbs if verb.is_verb_relating_concept_and_literal()]))
+
+        # synonyms come in pairs, and only the first term of a pair has rules
+        synonyms = dict((term.get_name(), term.get_synonym()) for term in concepts
+                        if term.get_synonym() is not None)
+        self.assertTrue(len(synonyms) > 200)
+        for name, synonym in synonyms.items():
+            self.assertEquals(name, synonyms[synonym])
+        self.assertEquals(len(concepts) - len(synonyms) // 2,
+                          len([term for term in concepts if term.get_necessity() is not None]))
+
+    def test_hierarchy_has_the_requested_depth_and_fan_out(self):
+        generator = SBVRWorkloadGenerator(200, verb_ratio = 0, depth = 3, fan_out = 2)
+        parents = dict((term.get_name(), term.get_general_concept())
+                       for term in self.parse(generator).get_terms())
+        children = {}
+        for name, parent in parents.items():
+            children[parent] = children.get(parent, 0) + 1
+            depth = 1
+            while parents[name] is not None:
+                name = parents[name]
+                depth += 1
+            self.assertTrue(depth <= 3)
+        self.assertEquals(200 // 7 + 1, children[None])
+        self.assertEquals(2, max(count for parent, count in children.items() if parent is not None))
+
+    def test_compound_operations_and_ranges_have_the_requested_widths(self):
+        generator = SBVRWorkloadGenerator(300, necessity_ratio = 1, definition_ratio = 1,
+                                          conjunction_width = 3, disjunction_width = 4)
+        root = ET.fromstring(self.write(generator))
+        widths = set()
+        for tag, width in (('sbvr-conjunction', 3), ('sbvr-disjunction', 4)):
+            for collection in root.iter(tag):
+                self.assertEquals(width, len(list(collection)))
+                widths.add(width)
+        self.assertEquals(set([3, 4]), widths)
+
+        generator = SBVRWorkloadGenerator(300, necessity_ratio = 1, conjunction_width = 0,
+                                          disjunction_width = 1)
+        root = ET.fromstring(self.write(generator))
+        self.assertEquals([], list(root.iter('sbvr-conjunction')) + list(root.iter('sbvr-disjunction')))
+
+    def test_invalid_options_are_rejected(self):
+        self.assertRaises(ValueError, SBVRWorkloadGenerator, 10, verb_ratio = 1.5)
+        self.assertRaises(ValueError, SBVRWorkloadGenerator, 10, verb_ratio = 1)
+        self.assertRaises(ValueError, SBVRWorkloadGenerator, 10, depth = 0)
+
+    def write(self, generator):
+        output_file = StringIO()
+        generator.write(output_file)
+        return output_file.getvalue()
+
+    def parse(self, generator):
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml(ET.fromstring(self.write(generator)))
+        return sbvr_specification
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+from src.mapping.sbvrtoowl import SBVRToOWL
+from src.owl.owl_output_options import OWLOutputOptions
+from src.sbvr.sbvrspecification import SBVRSpecification
+from src.utils.sbvrworkloadgenerator import SBVRWorkloadGenerator
+from src.utils.spillinglist import SpillingList
+
+
+class SpillingListTest(unittest.TestCase):
+    """
+    Test cases for the lists that spill to disk, and the transformation of specifications
+    spilled to disk.
+    """
+    PREFIX = 'http://example.org/onto'
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_items_are_kept_in_memory_under_the_budget(self):
+        spilling_list = SpillingList(SpillingList.get_rss() * 100, self._directory, check_interval = 1)
+        for index in range(10):
+            spilling_list.append(index)
+        self.assertFalse(spilling_list.is_spilled())
+        self.assertEquals(range(10), list(spilling_list))
+
+    def test_items_are_spilled_over_the_budget(self):
+        spilling_list = SpillingList(0, self._directory, batch_size = 3, check_interval = 2)
+        for index in range(10):
+            spilling_list.append(('item', index))
+        # the first two items spill at the first check, and the next ones in batches of three
+        self.assertTrue(spilling_list.is_spilled())
+        self.assertEquals(8, spilling_list.get_spilled_count())
+        self.assertEquals(10, len(spilling_list))
+        self.assertEquals([('item', index) for index in range(10)], list(spilling_list))
+        self.assertEquals(('item', 4), spilling_list[4])
+        self.assertEquals(('item', 9), spilling_list[-1])
+        self.assertRaises(IndexError, spilling_list.__getitem__, 10)
+
+        spilling_list.close()
+        self.assertEquals(0, len(spilling_list))
+        self.assertEquals([], os.listdir(self._directory))
+
+    def test_spilled_transformation_writes_the_same_output(self):
+        input_filename = os.path.join(self._directory, 'rules.xml')
+        with open(input_filename, 'w') as input_file:
+            SBVRWorkloadGenerator(3000, necessity_ratio = 0.5, definition_ratio = 0.3,
+                                  seed = 4).write(input_file)
+
+        expected_filename = os.path.join(self._directory, 'expected.owl')
+        self.transform(input_filename, expected_filename, OWLOutputOptions())
+
+        spill_directory = os.path.join(self._directory, 'spill')
+        os.mkdir(spill_directory)
+        output_options = OWLOutputOptions()
+        output_options.set_memory_budget(0, spill_directory)
+        output_filename = os.path.join(self._directory, 'spilled.owl')
+        sbvr_specification = self.transform(input_filename, output_filename, output_options)
+        self.assertEquals(3000, sbvr_specification.get_terms().get_spilled_count())
+        sbvr_specification.close()
+        self.assertEquals([], os.listdir(spill_directory))
+
+        with open(expected_filename) as expected_file:
+            with open(output_filename) as output_file:
+                self.assertEquals(expected_file.read(), output_file.read())
+
+    def test_memory_budget_rejects_in_memory_options(self):
+        for option, value in (('set_canonical', True), ('set_reduced', True),
+                              ('set_processes', 2),
+                              ('set_format', OWLOutputOptions.FORMAT_TURTLE)):
+            output_options = OWLOutputOptions()
+            output_options.set_memory_budget(0)
+            getattr(output_options, option)(value)
+            self.assertRaises(ValueError, SBVRToOWL, SBVRSpecification(),
+                              os.path.join(self._directory, 'ontology.owl'), self.PREFIX,
+                              output_options)
+
+    def transform(self, input_filename, output_filename, output_options):
+        sbvr_specification = SBVRSpecification()
+        if output_options.get_memory_budget() is not None:
+            sbvr_specification.set_memory_budget(output_options.get_memory_budget(),
+                                                 output_options.get_spill_directory())
+        sbvr_specification.from_xml_file(input_filename)
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            SBVRToOWL(sbvr_specification, output_filename, self.PREFIX, output_options).transform()
+        finally:
+            sys.stdout = stdout
+        return sbvr_specification
+
+
+if __name__ == '__main__':
+    unittest.main()
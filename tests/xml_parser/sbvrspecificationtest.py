@@ -729,6 +729,81 @@ class SBVRSpecificationTest(unittest.TestCase):
         self.assertEquals('Alimento', verb_term_necessity.get_roles()[1].get_text())
         self.assertEquals(None, verb_term_necessity.get_roles()[1].get_xsd_type())
 
+    def test_from_xml_term_with_nested_necessity(self):
+        xml = '''<?xml version="1.0"?>
+                 <sbvr-specification>
+                   <sbvr-term>
+                       <sbvr-term-name>Postulante</sbvr-term-name>
+                       <sbvr-term-definition></sbvr-term-definition>
+                       <sbvr-term-general-concept></sbvr-term-general-concept>
+                       <sbvr-term-concept-type>general concept</sbvr-term-concept-type>
+                       <sbvr-term-synonym></sbvr-term-synonym>
+                       <sbvr-term-necessity>
+                          <sbvr-conjunction>
+                             <sbvr-logical-operator>
+                                <sbvr-verb>tiene</sbvr-verb>
+                                <sbvr-quantification type="existencial"></sbvr-quantification>
+                                <sbvr-concept>Sexo</sbvr-concept>
+                             </sbvr-logical-operator>
+                             <sbvr-disjunction>
+                                <sbvr-logical-operator>
+                                   <sbvr-verb>esta</sbvr-verb>
+                                   <sbvr-quantification type="existencial"></sbvr-quantification>
+                                   <sbvr-concept>Habilitado</sbvr-concept>
+                                </sbvr-logical-operator>
+                                <sbvr-logical-operator>
+                                   <sbvr-verb>esta</sbvr-verb>
+                                   <sbvr-quantification type="existencial"></sbvr-quantification>
+                                   <sbvr-concept>Exceptuado</sbvr-concept>
+                                </sbvr-logical-operator>
+                             </sbvr-disjunction>
+                          </sbvr-conjunction>
+                       </sbvr-term-necessity>
+                   </sbvr-term>
+                 </sbvr-specification>'''
+
+        root = ET.fromstring(xml)
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml(root)
+
+        necessity = sbvr_specification.get_terms()[0].get_necessity()
+        self.assertTrue(necessity.is_conjunction())
+        self.assert_list_len(2, necessity.get_logical_operators())
+        self.assertEquals('Sexo', necessity.get_logical_operators()[0].get_rule_range().get_range())
+
+        disjunction = necessity.get_logical_operators()[1]
+        self.assertTrue(disjunction.is_disjunction())
+        self.assertEquals(['Habilitado', 'Exceptuado'],
+                          [rule.get_rule_range().get_range()
+                           for rule in disjunction.get_logical_operators()])
+
+    def test_from_xml_deeply_nested_necessity(self):
+        depth = 5000
+        operator = '''<sbvr-logical-operator>
+                         <sbvr-verb>tiene</sbvr-verb>
+                         <sbvr-quantification type="existencial"></sbvr-quantification>
+                         <sbvr-concept>Concepto%d</sbvr-concept>
+                      </sbvr-logical-operator>'''
+        tags = ['sbvr-conjunction' if level % 2 == 0 else 'sbvr-disjunction' for level in range(depth)]
+        xml = ''.join(['<sbvr-specification><sbvr-term>',
+                       '<sbvr-term-name>Postulante</sbvr-term-name>',
+                       '<sbvr-term-concept-type>general concept</sbvr-term-concept-type>',
+                       '<sbvr-term-synonym></sbvr-term-synonym>',
+                       '<sbvr-term-general-concept></sbvr-term-general-concept>',
+                       '<sbvr-term-necessity>'] +
+                      ['<%s>' % tag + operator % level for level, tag in enumerate(tags)] +
+                      ['</%s>' % tag for tag in reversed(tags)] +
+                      ['</sbvr-term-necessity></sbvr-term></sbvr-specification>'])
+
+        root = ET.fromstring(xml)
+        sbvr_specification = SBVRSpecification()
+        sbvr_specification.from_xml(root)
+
+        necessity = sbvr_specification.get_terms()[0].get_necessity()
+        self.assertEquals(depth, len(list(necessity.iter_operations())))
+        self.assertEquals(['Concepto%d' % level for level in range(depth)],
+                          [rule.get_rule_range().get_range() for rule in necessity.iter_rules()])
+
     def assert_list_len(self, expected_size, list):
         """
         Asserts that the list is not None and asserts the size of the list against the expected.